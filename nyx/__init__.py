@@ -719,19 +719,21 @@ class Interface(object):
       for panel in self:
         panel.set_paused(is_pause)
 
-      for panel in self.page_panels():
-        panel.redraw()
+      with nyx.curses.batch():
+        for panel in self.page_panels():
+          panel.redraw()
 
   def redraw(self, force = False):
     """
-    Renders our displayed content.
+    Renders our displayed content as a single frame.
     """
 
     occupied = 0
 
-    for panel in self.page_panels():
-      panel.redraw(force = force, top = occupied)
-      occupied += panel.get_height()
+    with nyx.curses.batch():
+      for panel in self.page_panels():
+        panel.redraw(force = force, top = occupied)
+        occupied += panel.get_height()
 
   def quit(self):
     """
@@ -28,7 +28,12 @@ if we want Windows support in the future too.
 
   is_wide_characters_supported - checks if curses supports wide character
 
+  wrap - lines a string is wrapped into
+
+  invalidate - requests that content be drawn with our next frame
+  batch - draws content the input thread invalidates as a single frame
   draw - renders subwindow that can be drawn into
+  canvas - offscreen subwindow that can be copied into others
 
   Subwindow - subwindow that can be drawn within
     |- addstr - draws a string
@@ -36,7 +41,9 @@ if we want Windows support in the future too.
     |- box - draws box with the given dimensions
     |- scrollbar - draws a left-hand scrollbar
     |- hline - draws a horizontal line
-    +- vline - draws a vertical line
+    |- vline - draws a vertical line
+    |- shift - moves content to the right
+    +- copy - draws the content of a canvas
 
   KeyInput - user keyboard input
     |- match - checks if this matches the given inputs
@@ -85,6 +92,7 @@ if we want Windows support in the future too.
 from __future__ import absolute_import
 
 import collections
+import contextlib
 import curses
 import curses.ascii
 import curses.textpad
@@ -107,6 +115,12 @@ CURSES_SCREEN = None
 CURSES_LOCK = threading.RLock()
 HALT_ACTIVITY = False
 
+# While curses is running content is drawn by a render thread, which coalesces
+# requests into frames that update the terminal once.
+
+_RENDERER = None
+_IN_FRAME = False  # drawing a frame, so draw() shouldn't update the terminal
+
 # Text colors and attributes. These are *very* commonly used so including
 # shorter aliases (so they can be referenced as just GREEN or BOLD).
 
@@ -149,6 +163,7 @@ ASCI_TO_CURSES = {
 
 DEFAULT_COLOR_ATTR = dict([(color, 0) for color in Color])
 COLOR_ATTR = None
+ENCODED_ATTR = {}  # attribute tuples => curses encoding, for our color override
 
 SCROLL_KEYS = (curses.KEY_UP, curses.KEY_DOWN, curses.KEY_PPAGE, curses.KEY_NPAGE, curses.KEY_HOME, curses.KEY_END)
 
@@ -173,20 +188,25 @@ def conf_handler(key, value):
 
     if value not in Color and value != 'None':
       raise ValueError('"%s" isn\'t a valid color' % value)
-  elif key == 'max_line_wrap':
+
+    ENCODED_ATTR.clear()
+  elif key in ('max_line_wrap', 'max_fps'):
     return max(1, value)
 
 
 CONFIG = stem.util.conf.config_dict('nyx', {
   'color_interface': True,
   'color_override': 'None',
+  'max_fps': 20,
   'max_line_wrap': 8,
 }, conf_handler)
 
 
 def start(function, acs_support = True, transparent_background = False, cursor = True):
   """
-  Starts a curses interface, delegating to the given function.
+  Starts a curses interface, delegating to the given function. Content other
+  threads :func:`~nyx.curses.invalidate` is drawn by a render thread until the
+  function returns.
 
   :param funtion: function to invoke when curses starts
   :param bool acs_support: uses wide characters for pipes
@@ -195,7 +215,7 @@ def start(function, acs_support = True, transparent_background = False, cursor =
   """
 
   def _wrapper(stdscr):
-    global CURSES_SCREEN
+    global CURSES_SCREEN, _RENDERER
 
     CURSES_SCREEN = stdscr
 
@@ -214,7 +234,14 @@ def start(function, acs_support = True, transparent_background = False, cursor =
       except curses.error:
         pass
 
-    function()
+    _RENDERER = _Renderer(CONFIG['max_fps'])
+    _RENDERER.start()
+
+    try:
+      function()
+    finally:
+      renderer, _RENDERER = _RENDERER, None
+      renderer.stop()
 
   curses.wrapper(_wrapper)
 
@@ -425,24 +452,31 @@ class _TextBacklog(object):
 
 def curses_attr(*attributes):
   """
-  Provides encoding for the given curses text attributes.
+  Provides encoding for the given curses text attributes. This is called
+  whenever we draw, so encodings are cached until our color override changes.
 
   :param list attributes: curses text attributes and colors
 
   :returns: **int** that can be used with curses
   """
 
+  try:
+    return ENCODED_ATTR[attributes]
+  except KeyError:
+    pass
+
   encoded = curses.A_NORMAL
+  override = get_color_override()
 
   for attr in attributes:
     if attr in Color:
-      override = get_color_override()
       encoded |= _color_attr()[override if override else attr]
     elif attr in Attr:
       encoded |= CURSES_ATTRIBUTES[attr]
     else:
       raise ValueError("'%s' isn't a valid curses text attribute" % attr)
 
+  ENCODED_ATTR[attributes] = encoded
   return encoded
 
 
@@ -619,6 +653,8 @@ def set_color_override(color = None):
   else:
     raise ValueError('"%s" isn\'t a valid color' % color)
 
+  ENCODED_ATTR.clear()  # also cleared by our conf_handler, but that's before the value is set
+
 
 def _color_attr():
   """
@@ -707,10 +743,94 @@ def is_wide_characters_supported():
   return False
 
 
+def wrap(msg, width, x = 0, min_x = 0):
+  """
+  Splits a string into the lines :func:`~nyx.curses._Subwindow.addstr_wrap`
+  draws it as, so callers can tell how tall content is without drawing it.
+
+  :param str msg: string to be wrapped
+  :param int width: width avaialble to render the string
+  :param int x: horizontal location of the first line
+  :param int min_x: horizontal position to wrap to on new lines
+
+  :returns: **list** of (x, msg) tuples for each line
+  """
+
+  lines = []
+
+  while msg:
+    draw_msg, msg = stem.util.str_tools.crop(msg, width - x, None, ending = None, get_remainder = True)
+
+    if not draw_msg:
+      draw_msg, msg = stem.util.str_tools.crop(msg, width - x), ''  # first word is longer than the line
+
+    lines.append((x, draw_msg))
+    msg = msg.lstrip()
+
+    if len(lines) >= CONFIG['max_line_wrap']:
+      break  # maximum number we'll wrap
+
+    x = min_x
+
+  return lines
+
+
+def invalidate(func):
+  """
+  Requests that a draw function be called with our next frame. While curses is
+  running frames are drawn by our render thread at up to **max_fps** times a
+  second, and a function requested several times before then is called once.
+  All content of a frame is then sent to the terminal together.
+
+  Requests from the thread that started curses (which handles user input) are
+  drawn right away, along with any that are pending, so it can present a
+  prompt or popup over them. Within a :func:`~nyx.curses.batch` these are
+  instead drawn together when it ends.
+
+  :param function func: function that draws content, such as through
+    :func:`~nyx.curses.draw`
+  """
+
+  renderer = _RENDERER
+
+  if not renderer:
+    _draw_frame([func])
+  else:
+    renderer.invalidate(func)
+
+    if threading.current_thread() is renderer.input_thread and not renderer.batch_depth:
+      renderer.render()
+
+
+@contextlib.contextmanager
+def batch():
+  """
+  Context in which content the input thread invalidates is drawn as a single
+  frame when we exit, rather than a frame for each request.
+  """
+
+  renderer = _RENDERER
+
+  if not renderer or threading.current_thread() is not renderer.input_thread:
+    yield
+    return
+
+  renderer.batch_depth += 1
+
+  try:
+    yield
+  finally:
+    renderer.batch_depth -= 1
+
+    if not renderer.batch_depth:
+      renderer.render()
+
+
 def draw(func, left = 0, top = 0, width = None, height = None, background = None, draw_if_resized = None):
   """
   Renders a subwindow. This calls the given draw function with a
-  :class:`~nyx.curses._Subwindow`.
+  :class:`~nyx.curses._Subwindow`. If we're drawing a frame then the terminal
+  is updated when it's done, otherwise this updates it right away.
 
   :param function func: draw function for rendering the subwindow
   :param int left: left position of the panel
@@ -724,47 +844,181 @@ def draw(func, left = 0, top = 0, width = None, height = None, background = None
   :returns: :class:`~nyx.curses.Dimension` for the space we drew within
   """
 
-  start = time.time()
+  with CURSES_LOCK:
+    if HALT_ACTIVITY:
+      return
 
-  while not CURSES_LOCK.acquire(False):
-    if (time.time() - start) > 1:
-      return  # if we've been blocked from drawing for a full second then abort
+    try:
+      dimensions = screen_size()
+      subwindow_width = max(0, dimensions.width - left)
+      subwindow_height = max(0, dimensions.height - top)
 
-    time.sleep(0.05)
+      if width:
+        subwindow_width = min(width, subwindow_width)
 
-  try:
+      if height:
+        subwindow_height = min(height, subwindow_height)
+
+      subwindow_dimensions = Dimensions(subwindow_width, subwindow_height)
+
+      if subwindow_dimensions == draw_if_resized:
+        return subwindow_dimensions  # draw size hasn't changed
+
+      # Curses tracks what's on the terminal, and only sends cells that change
+      # when we update it. However, windows as large as the screen are made
+      # with clearok set, which repaints everything when they're refreshed.
+
+      curses_subwindow = CURSES_SCREEN.subwin(subwindow_height, subwindow_width, top, left)
+      curses_subwindow.clearok(False)
+      curses_subwindow.erase()
+
+      if background:
+        curses_subwindow.bkgd(' ', curses_attr(background, HIGHLIGHT))
+
+      func(_Subwindow(subwindow_width, subwindow_height, curses_subwindow))
+      curses_subwindow.noutrefresh()
+
+      if not _IN_FRAME:
+        curses.doupdate()
+
+      return subwindow_dimensions
+    except curses.error:
+      return  # raw curses access, such as subwin, can raise in edge cases such as resizing
+
+
+def _draw_frame(funcs, on_error = None):
+  """
+  Calls the given draw functions, then updates the terminal with all of their
+  content at once. If provided, **on_error** is notified of draw functions that
+  raise an exception (with the function and exception), rather than
+  propagating it.
+  """
+
+  global _IN_FRAME
+
+  with CURSES_LOCK:
     if HALT_ACTIVITY:
       return
 
-    dimensions = screen_size()
-    subwindow_width = max(0, dimensions.width - left)
-    subwindow_height = max(0, dimensions.height - top)
+    is_nested, _IN_FRAME = _IN_FRAME, True
 
-    if width:
-      subwindow_width = min(width, subwindow_width)
+    try:
+      for func in funcs:
+        try:
+          func()
+        except Exception as exc:
+          if not on_error:
+            raise
+
+          on_error(func, exc)
+    finally:
+      _IN_FRAME = is_nested
+
+    if not is_nested:
+      try:
+        curses.doupdate()
+      except curses.error:
+        pass
 
-    if height:
-      subwindow_height = min(height, subwindow_height)
 
-    subwindow_dimensions = Dimensions(subwindow_width, subwindow_height)
+class _Renderer(threading.Thread):
+  """
+  Thread that draws content as it's requested. Requests are coalesced into
+  frames, each drawn at least our frame time after the last.
 
-    if subwindow_dimensions == draw_if_resized:
-      return subwindow_dimensions  # draw size hasn't changed
+  :var threading.Thread input_thread: thread that started us, whose requests
+    are drawn right away
+  :var int batch_depth: nested :func:`~nyx.curses.batch` contexts the input
+    thread is within
+  :var int frames: number of frames we've drawn
 
-    curses_subwindow = CURSES_SCREEN.subwin(subwindow_height, subwindow_width, top, left)
-    curses_subwindow.erase()
+  Draw functions that raise an exception on our thread are logged (once for
+  each type of exception they raise) and called again when next invalidated.
 
-    if background:
-      curses_subwindow.bkgd(' ', curses_attr(background, HIGHLIGHT))
+  :param int max_fps: maximum number of frames we draw per second
+  """
 
-    func(_Subwindow(subwindow_width, subwindow_height, curses_subwindow))
-    curses_subwindow.refresh()
+  def __init__(self, max_fps):
+    threading.Thread.__init__(self)
+    self.setDaemon(True)
 
-    return subwindow_dimensions
-  except curses.error:
-    return  # raw curses access, such as subwin, can raise in edge cases such as resizing
-  finally:
-    CURSES_LOCK.release()
+    self.input_thread = threading.current_thread()
+    self.batch_depth = 0
+    self.frames = 0
+
+    self._frame_time = 1.0 / max_fps
+    self._requests = collections.OrderedDict()  # draw functions of our next frame
+    self._cond = threading.Condition()
+    self._halt = False
+    self._logged_failures = set()  # (draw function, exception type) we've logged
+
+  def invalidate(self, func):
+    with self._cond:
+      self._requests[func] = True
+      self._cond.notify()
+
+  def render(self):
+    """
+    Draws a frame with our pending requests on the calling thread. Exceptions
+    from draw functions propagate unless we're drawing on our own thread.
+    """
+
+    with self._cond:
+      requests = list(self._requests)
+      self._requests = collections.OrderedDict()
+
+    if requests:
+      _draw_frame(requests, self._draw_failed if threading.current_thread() is self else None)
+      self.frames += 1
+
+  def _draw_failed(self, func, exc):
+    failure = (func, type(exc))
+
+    if failure not in self._logged_failures:
+      self._logged_failures.add(failure)
+      stem.util.log.error('Unable to draw %s: %s' % (func, exc))
+
+  def stop(self):
+    with self._cond:
+      self._halt = True
+      self._cond.notify()
+
+    self.join()
+
+  def run(self):
+    last_frame = 0
+
+    while True:
+      with self._cond:
+        while not self._halt:
+          if not self._requests:
+            self._cond.wait()
+          elif time.time() < last_frame + self._frame_time:
+            self._cond.wait(last_frame + self._frame_time - time.time())
+          else:
+            break
+
+        if self._halt:
+          return
+
+      last_frame = time.time()
+      self.render()
+
+
+def canvas(width, height):
+  """
+  Provides an offscreen subwindow. This retains its content between draws, so
+  callers can render something once then :func:`~nyx.curses._Subwindow.copy`
+  it into the subwindows they're given.
+
+  :param int width: canvas width
+  :param int height: canvas height
+
+  :returns: :class:`~nyx.curses._Subwindow` that isn't shown on the screen
+  """
+
+  width, height = max(1, width), max(1, height)
+  return _Subwindow(width, height, curses.newpad(height, width))
 
 
 class _Subwindow(object):
@@ -816,24 +1070,12 @@ class _Subwindow(object):
     :returns: **tuple** of the (x, y) position we drew to
     """
 
-    orig_y = y
-
-    while msg:
-      draw_msg, msg = stem.util.str_tools.crop(msg, width - x, None, ending = None, get_remainder = True)
-
-      if not draw_msg:
-        draw_msg, msg = stem.util.str_tools.crop(msg, width - x), ''  # first word is longer than the line
-
-      x = self.addstr(x, y, draw_msg, *attr)
-      msg = msg.lstrip()
+    lines = wrap(msg, width, x, min_x)
 
-      if (y - orig_y + 1) >= CONFIG['max_line_wrap']:
-        break  # maximum number we'll wrap
+    for line_y, (line_x, draw_msg) in enumerate(lines, y):
+      x = self.addstr(line_x, line_y, draw_msg, *attr)
 
-      if msg:
-        x, y = min_x, y + 1
-
-    return x, y
+    return x, y + max(0, len(lines) - 1)
 
   def box(self, left = 0, top = 0, width = None, height = None, *attr):
     """
@@ -949,6 +1191,40 @@ class _Subwindow(object):
       except:
         pass
 
+  def shift(self, columns = 1):
+    """
+    Moves our content to the right, blanking the columns this vacates on the
+    left. Content shifted past our right edge is discarded.
+
+    :param int columns: number of columns to shift by
+    """
+
+    for y in range(self.height):
+      for _ in range(min(columns, self.width)):
+        try:
+          self._curses_subwindow.insch(y, 0, ' ')
+        except:
+          pass
+
+  def copy(self, x, y, canvas):
+    """
+    Draws the content of a canvas into this subwindow, cropping whatever
+    doesn't fit.
+
+    :param int x: horizontal location
+    :param int y: vertical location
+    :param nyx.curses._Subwindow canvas: canvas to be drawn
+    """
+
+    width = min(canvas.width, self.width - x)
+    height = min(canvas.height, self.height - y)
+
+    if x >= 0 and y >= 0 and width > 0 and height > 0:
+      try:
+        canvas._curses_subwindow.overwrite(self._curses_subwindow, 0, 0, y, x, y + height - 1, x + width - 1)
+      except:
+        pass
+
 
 class KeyInput(object):
   """
@@ -15,35 +15,96 @@ runlevels.
 
   LogGroup - thread safe, deduplicated grouping of events
     |- add - adds an event to the group
+    |- merge - adds older events, interleaved by their timestamp
     |- pop - removes and returns an event
+    |- stats - rolling statistics of the events we've been given
+    |- stream - iterates over our events without holding our lock
     +- clone - deep copy of this LogGroup
 
+  LogStats - rolling counts of log events
+    |- add - counts an event
+    |- rates - events per minute of each runlevel
+    |- top - most frequent messages
+    +- clone - copy of these statistics
+
+  LogView - filtered entries of a LogGroup
+    |- entries - entries that match a filter
+    |- days - entries that match a filter, grouped by day
+    |- layout - positions and heights of the entries of each day
+    |- entry - entry at a position
+    +- seek - entries that fit within a number of lines
+
+  DuplicateGroup - log entries that are duplicates of each other
+    |- add - adds the newest entry of the group
+    |- remove - removes the oldest entry of the group
+    +- clone - copy of this DuplicateGroup
+
   LogEntry - individual log event
     |- is_duplicate_of - checks if a duplicate message of another LogEntry
+    |- compact - stores our message as a template and its parameters
     |- day_count - number of days since this even occured
     +- clone - deep copy of this LogEntry
 
+  LogArchive - searchable on-disk archive of log events
+    |- add - archives a given entry
+    |- flush - writes entries we've been given
+    |- prune - drops entries beyond our retention limits
+    |- entries - all archived entries
+    +- search - entries matching a full text search
+
+  LogQueue - bounded queue of log events
+    |- put - adds an event, handling overflow by our policy
+    |- get - removes and provides queued events
+    +- close - stops accepting events
+
+  TorLogFollower - notifies a listener of lines appended to tor's log file
+    +- stop - stops following the file
+
+  LogExport - writes a snapshot of log events to a file in the background
+    |- progress - fraction of the events we've processed
+    +- join - waits for the snapshot to be written
+
   LogFileOutput - writes log events to a file
-    +- write - persist a given message
+    |- write - persist a given message
+    +- close - writes queued messages and closes the file
 
   LogFilters - regex filtering of log events
     |- select - filters by this regex
     |- selection - current regex filter
     |- latest_selections - past regex selections
-    |- match - checks if a LogEntry matches this filter
+    |- match - checks if a message matches this filter
+    |- match_entry - checks if a LogEntry matches this filter
     +- clone - deep copy of this LogFilters
+
+.. data:: Overflow (enum)
+
+  Handling for entries we receive when a LogQueue is full.
+
+  =============== ===========
+  Overflow        Description
+  =============== ===========
+  **DROP_OLDEST** discards our oldest entry to make room
+  **SAMPLE**      keeps one of every sample_rate entries with each dedup key, in place of our oldest entry
+  **BLOCK**       waits for room
+  =============== ===========
 """
 
 import collections
 import datetime
+import gzip
+import itertools
+import json
+import mmap
 import os
 import re
+import shutil
+import sqlite3
 import time
 import threading
 
 import stem.util.conf
+import stem.util.enum
 import stem.util.log
-import stem.util.system
 
 import nyx
 
@@ -55,8 +116,38 @@ except ImportError:
 
 TOR_RUNLEVELS = ['DEBUG', 'INFO', 'NOTICE', 'WARN', 'ERR']
 NYX_RUNLEVELS = ['NYX_DEBUG', 'NYX_INFO', 'NYX_NOTICE', 'NYX_WARNING', 'NYX_ERROR']
+TOR_LOG_RUNLEVELS = dict([('[%s]' % runlevel.lower(), runlevel) for runlevel in TOR_RUNLEVELS])
+TOR_LOG_MONTHS = dict([(month, i) for i, month in enumerate(('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), 1)])
+TOR_LOG_CHUNK_SIZE = 4 * 1024 * 1024  # bytes we read from tor's log at a time
+TOR_LOG_POLL_RATE = 0.5  # seconds between checking tor's log file for additions
 TIMEZONE_OFFSET = time.altzone if time.localtime()[8] else time.timezone
 GROUP_BY_DAY = True
+Overflow = stem.util.enum.Enum(('DROP_OLDEST', 'drop_oldest'), ('SAMPLE', 'sample'), ('BLOCK', 'block'))
+RECENT_DUPLICATES = 10  # number of entries a duplicate group retains
+HEIGHT_BLOCK_SIZE = 256  # number of entries a LogView sums the height of together
+VIEW_CACHE_SIZE = 4  # filterings of its log group a LogView retains
+STATS_BUCKET_SIZE = 10  # seconds of events each LogStats count covers
+STATS_WINDOWS = (60, 600, 3600)  # seconds LogStats provides rates over
+STATS_TOP_SIZE = 100  # messages LogStats tracks the frequency of
+ARCHIVE_BATCH_SIZE = 500  # entries we write to our archive at a time
+ARCHIVE_PAGE_SIZE = 100  # archived entries we fetch at a time when searching
+ARCHIVE_PRUNE_RATE = 60  # seconds between dropping archived entries beyond our limits
+LOG_FILE_QUEUE_SIZE = 100000  # messages we queue to write before dropping them
+LOG_FILE_BATCH_SIZE = 1000  # messages we write to our log file at a time
+LOG_FILE_FLUSH_RATE = 1  # maximum seconds messages wait to be written
+LOG_FILE_BACKUPS = 5  # rotated log files we retain
+STREAM_BATCH_SIZE = 1000  # entries LogGroup.stream() reads under its lock at a time
+EXPORT_BATCH_SIZE = 1000  # entries LogExport writes at a time
+
+# Compacted log messages are stored as an interned template and the values
+# that vary, such as numbers, addresses, and fingerprints.
+
+TEMPLATE_PARAMETER = re.compile('0x[0-9a-fA-F]+|[0-9a-fA-F]{16,}|[0-9]+')
+TEMPLATE_SEPARATOR = '\x00'
+MAX_TEMPLATES = 50000
+
+_TEMPLATES = {}  # interned message templates
+_FILTER_GENERATION = itertools.count(1)  # identifies LogFilters regexes that entries matched
 
 
 def day_count(timestamp):
@@ -200,7 +291,7 @@ def _common_log_messages():
   message prefixes unless it starts with an asterisk, in which case it can
   appear anywhere in the message.
 
-  :returns: **dict** of the form {event_type => [msg1, msg2...]}
+  :returns: **dict** of the form {event_type => _DedupMatcher}
   """
 
   nyx_config, messages = stem.util.conf.get_config('nyx'), {}
@@ -208,41 +299,124 @@ def _common_log_messages():
   for conf_key in nyx_config.keys():
     if conf_key.startswith('dedup.'):
       event_type = conf_key[6:]
-      messages[event_type] = nyx_config.get(conf_key, [])
+      messages[event_type] = _DedupMatcher(nyx_config.get(conf_key, []))
 
   return messages
 
 
+class _DedupMatcher(object):
+  """
+  Matches messages against the common log messages of a runlevel. Rather than
+  checking each in turn, prefixes are indexed by their first few characters so
+  most messages need just a dictionary lookup and one startswith() check.
+
+  When several common messages match we provide the first listed, same as
+  checking them in order.
+  """
+
+  def __init__(self, common_messages):
+    prefixes = [(i, msg) for i, msg in enumerate(common_messages) if msg and msg[0] != '*']
+    self._substrings = [(i, msg) for i, msg in enumerate(common_messages) if msg and msg[0] == '*']
+
+    # length of our index keys, the shortest prefix we have
+
+    self._key_length = min([len(msg) for i, msg in prefixes]) if prefixes else 0
+    self._prefixes = {}  # first characters of the prefix => [(index, prefix)...]
+
+    for i, msg in prefixes:
+      self._prefixes.setdefault(msg[:self._key_length], []).append((i, msg))
+
+  def match(self, message):
+    """
+    Provides the common message this matches.
+
+    :param str message: message to be matched
+
+    :returns: **str** with the common message we match, **None** if there
+      isn't one
+    """
+
+    match_index, match = None, None
+
+    for i, prefix in self._prefixes.get(message[:self._key_length], ()):
+      if message.startswith(prefix):
+        match_index, match = i, prefix
+        break
+
+    for i, substring in self._substrings:
+      if match_index is not None and i > match_index:
+        break
+      elif substring[1:] in message:
+        return substring
+
+    return match
+
+
 class LogGroup(object):
   """
   Thread safe collection of LogEntry instancs, which maintains a certain size
   and supports deduplication.
   """
 
-  def __init__(self, max_size):
+  def __init__(self, max_size, compact = False):
     self._max_size = max_size
-    self._entries = []
+    self._compact = compact
+    self._entries = collections.deque()  # newest to oldest
     self._dedup_map = {}  # dedup key => most recent entry
+    self._added = 0  # number of entries we've ever had
+    self._merges = 0  # number of times older entries were merged into us
+    self._evicted = collections.deque(maxlen = max_size)  # (index, dedup key) of duplicates we've dropped
+    self._stats = LogStats()
     self._lock = threading.RLock()
 
   def add(self, entry):
+    with self._lock:
+      self._add(entry)
+      self._stats.add(entry)
+
+  def _add(self, entry):
+    if self._compact:
+      entry.compact()
+
     with self._lock:
       duplicate = self._dedup_map.get(entry.dedup_key, None)
 
       if duplicate:
+        entry._dedup_key = duplicate._dedup_key  # share rather than keep a copy of the key
+
         if not duplicate.duplicates:
-          duplicate.duplicates = [duplicate]
+          duplicate.duplicates = DuplicateGroup(duplicate)
 
         duplicate.is_duplicate = True
         entry.duplicates = duplicate.duplicates
-        entry.duplicates.insert(0, entry)
+        entry.duplicates.add(entry)
 
-      self._entries.insert(0, entry)
+      self._entries.appendleft(entry)
       self._dedup_map[entry.dedup_key] = entry
+      self._added += 1
 
       while len(self._entries) > self._max_size:
         self.pop()
 
+  def merge(self, entries):
+    """
+    Adds entries that may be older than ours, such as those from tor's log
+    file, interleaving them with ours by their timestamp. If this exceeds our
+    size the oldest entries are dropped.
+
+    :param list entries: **LogEntry** instances to add, oldest to newest
+    """
+
+    with self._lock:
+      merged = sorted(list(entries) + list(reversed(self._entries)), key = lambda entry: entry.timestamp)
+      self._entries.clear()
+      self._dedup_map = {}
+      self._merges += 1
+
+      for entry in merged[-self._max_size:]:
+        entry.is_duplicate, entry.duplicates = False, None
+        self._add(entry)  # older entries aren't part of our rates
+
   def pop(self):
     with self._lock:
       last_entry = self._entries.pop()
@@ -251,15 +425,77 @@ class LogGroup(object):
       # item in its duplicate group.
 
       if last_entry.is_duplicate:
-        last_entry.duplicates.pop()
+        last_entry.duplicates.remove(last_entry)
+        self._evicted.append((self._added - len(self._entries) - 1, last_entry.dedup_key))
 
-      if self._dedup_map.get(last_entry.dedup_key, None) == last_entry:
+      if self._dedup_map.get(last_entry.dedup_key, None) is last_entry:
         del self._dedup_map[last_entry.dedup_key]
 
+  def stats(self):
+    """
+    Provides rolling statistics for the entries we've been given.
+
+    :returns: copy of our :class:`~nyx.log.LogStats`
+    """
+
+    with self._lock:
+      return self._stats.clone()
+
+  def stream(self, batch_size = STREAM_BATCH_SIZE):
+    """
+    Iterates over our entries, oldest to newest. Unlike iterating over us this
+    only holds our lock while reading each batch, so we can be added to during
+    a long iteration (such as writing our entries to a file).
+
+    Entries added after we start are skipped, as are those that are evicted
+    before we reach them.
+
+    :param int batch_size: entries to read at a time
+
+    :returns: **iterator** for our :class:`~nyx.log.LogEntry`
+
+    :raises: **ValueError** if entries are merged into us during the iteration
+    """
+
+    with self._lock:
+      index, last_index, merges = self._added - len(self._entries), self._added - 1, self._merges  # number of entries added before our next one
+
+    while index <= last_index:
+      with self._lock:
+        if self._merges != merges:
+          raise ValueError('log entries were merged while being read')
+
+        oldest_index = self._added - len(self._entries)
+        index = max(index, oldest_index)  # skip entries that were evicted
+
+        if index > last_index:
+          return
+
+        start = index - oldest_index  # position from the oldest end of our deque
+        batch = list(itertools.islice(reversed(self._entries), start, start + min(batch_size, last_index - index + 1)))
+
+      for entry in batch:
+        yield entry
+
+      index += len(batch)
+
   def clone(self):
     with self._lock:
-      copy = LogGroup(self._max_size)
-      copy._entries = [entry.clone() for entry in self._entries]
+      copy = LogGroup(self._max_size, self._compact)
+      copy._added = self._added
+      duplicate_groups = {}  # id of our duplicate groups => their copy
+
+      for entry in self._entries:
+        entry_copy = entry.clone(clone_duplicates = False)
+
+        if entry.duplicates:
+          if id(entry.duplicates) not in duplicate_groups:
+            duplicate_groups[id(entry.duplicates)] = entry.duplicates.clone()
+
+          entry_copy.duplicates = duplicate_groups[id(entry.duplicates)]
+
+        copy._entries.append(entry_copy)
+
       return copy
 
   def __len__(self):
@@ -272,236 +508,1704 @@ class LogGroup(object):
         yield entry
 
 
-class LogEntry(object):
+class LogStats(object):
   """
-  Individual tor or nyx log entry.
+  Rolling counts of log entries. We provide the rate of each runlevel over
+  several windows, and the messages we receive most frequently. Counting an
+  entry takes constant time.
 
-  **Note:** Tor doesn't include the date in its timestamps so the year
-  component may be inaccurate. (:trac:`15607`)
+  Runlevels are tallied in :data:`~nyx.log.STATS_BUCKET_SIZE` second buckets,
+  which are summed when rates are requested. Frequent messages are tracked
+  with a space saving sketch, which counts a fixed number of messages. When a
+  new one arrives it replaces our least frequent, inheriting its count as an
+  error bound. Counters with the same value are grouped so that replacement
+  needn't search for the minimum.
 
-  :var int timestamp: unix timestamp for when the event occured
-  :var str type: event type
-  :var str message: event's message
-  :var str display_message: message annotated with our time and runlevel
+  This isn't thread safe. :class:`~nyx.log.LogGroup` counts entries while
+  holding its lock, and provides copies of its statistics.
 
-  :var str dedup_key: key that can be used for deduplication
-  :var bool is_duplicate: true if this matches other messages in the group and
-    isn't the first
-  :var list duplicates: messages that are identical to this one
+  :var int total: number of entries we've counted
   """
 
-  def __init__(self, timestamp, type, message):
-    self.timestamp = timestamp
-    self.type = type
-    self.message = message
+  def __init__(self):
+    self.total = 0
 
-    entry_time = time.localtime(self.timestamp)
-    self.display_message = '%02i:%02i:%02i [%s] %s' % (entry_time[3], entry_time[4], entry_time[5], self.type, self.message)
+    self._start = time.time()
+    self._bucket_count = max(STATS_WINDOWS) // STATS_BUCKET_SIZE
+    self._buckets = [{} for i in range(self._bucket_count)]  # runlevel => count within each bucket
+    self._bucket_index = int(self._start // STATS_BUCKET_SIZE)  # index of our current bucket
+    self._bucket = self._buckets[self._bucket_index % self._bucket_count]
 
-    self.is_duplicate = False
-    self.duplicates = None
+    self._top_counts = {}  # message key => [count, error]
+    self._top_by_count = {}  # count => set of message keys with it
+    self._top_min = 0  # lowest count among our messages
+
+  def add(self, entry):
+    """
+    Counts an entry. Entries are tallied as of their timestamp, or our latest
+    bucket if they're older than it.
+
+    :param nyx.log.LogEntry entry: entry to be counted
+    """
+
+    self.total += 1
+
+    if entry.timestamp // STATS_BUCKET_SIZE > self._bucket_index:
+      self._advance(entry.timestamp)
+
+    bucket = self._bucket
+    bucket[entry.type] = bucket.get(entry.type, 0) + 1
+
+    key = _stats_key(entry)
+    top_by_count = self._top_by_count
+    counter = self._top_counts.get(key)
+
+    if counter is None:
+      if len(self._top_counts) < STATS_TOP_SIZE:
+        counter = self._top_counts[key] = [0, 0]
+      else:
+        # take the place of one of our least frequent messages
+
+        least_frequent = top_by_count[self._top_min]
+        counter = self._top_counts.pop(least_frequent.pop())
+        counter[1] = counter[0]
+        self._top_counts[key] = counter
+        least_frequent.add(key)
 
-    if GROUP_BY_DAY:
-      self.dedup_key = '%s:%s:%s' % (self.type, self.day_count(), self._message_dedup_key())
+    count = counter[0]
+    counter[0] = count + 1
+    keys = top_by_count.get(count)
+    next_keys = top_by_count.get(count + 1)
+
+    if keys is not None and len(keys) == 1:
+      del top_by_count[count]  # move this key's group to its new count
+
+      if next_keys is None:
+        top_by_count[count + 1] = keys
+      else:
+        next_keys.add(key)
+
+      if count == self._top_min:
+        self._top_min = count + 1
     else:
-      self.dedup_key = '%s:%s' % (self.type, self._message_dedup_key())
+      if keys is not None:
+        keys.remove(key)
+      else:
+        self._top_min = 1
 
-  def _message_dedup_key(self):
+      if next_keys is None:
+        top_by_count[count + 1] = set([key])
+      else:
+        next_keys.add(key)
+
+  def rates(self, now = None):
     """
-    Provides key we can use for deduplication for the message portion of our entry.
+    Provides the number of entries we've received per minute for each
+    runlevel, over each of our :data:`~nyx.log.STATS_WINDOWS`. Windows longer
+    than we've been counting are averaged over the time we have, and windows
+    are only as precise as :data:`~nyx.log.STATS_BUCKET_SIZE`.
+
+    :param float now: time to provide the rates as of, current time if **None**
 
-    :returns: **str** key for deduplication purposes
+    :returns: **dict** mapping runlevels to a **list** with their rate over
+      each window
     """
 
-    if self.type == 'NYX_DEBUG' and 'runtime:' in self.message:
-      # most nyx debug messages show runtimes so try matching without that
-      return self.message[:self.message.find('runtime:')]
+    now = time.time() if now is None else now
+    elapsed = max(STATS_BUCKET_SIZE, now - self._start)
+    rates = {}
 
-    for common_msg in _common_log_messages().get(self.type, []):
-      # if it starts with an asterisk then check the whole message rather
-      # than just the start
+    self._advance(now)
 
-      if common_msg[0] == '*':
-        if common_msg[1:] in self.message:
-          return common_msg
-      else:
-        if self.message.startswith(common_msg):
-          return common_msg
+    for i, window in enumerate(STATS_WINDOWS):
+      totals = collections.Counter()
 
-    return self.message
+      # our current bucket is partially through, so windows cover that and
+      # the full buckets before it
 
-  def day_count(self):
+      for age in range(window // STATS_BUCKET_SIZE):
+        totals.update(self._buckets[(self._bucket_index - age) % self._bucket_count])
+
+      covered = window - STATS_BUCKET_SIZE + now % STATS_BUCKET_SIZE
+      minutes = min(covered, elapsed) / 60.0
+
+      for runlevel, count in totals.items():
+        rates.setdefault(runlevel, [0.0] * len(STATS_WINDOWS))[i] = count / minutes
+
+    return rates
+
+  def top(self, count):
     """
-    Provides the day this event occured on by local time.
+    Provides the messages we've received most frequently.
 
-    :reutrns: **int** with the day this occured on
+    :param int count: number of messages to provide
+
+    :returns: **list** of (runlevel, message, count, error) tuples, most
+      frequent first, where messages vary by their parameters with '*' and
+      a count could be overstated by up to its error
     """
 
-    return day_count(self.timestamp)
+    top = sorted(self._top_counts.items(), key = lambda item: item[1][0], reverse = True)[:count]
+    return [(runlevel, '*'.join(message) if isinstance(message, tuple) else message, counter[0], counter[1]) for (runlevel, message), counter in top]
 
   def clone(self):
-    copy = LogEntry(self.timestamp, self.type, self.message)
-    copy.is_duplicate = self.is_duplicate
-    copy.duplicates = None if self.duplicates is None else list(self.duplicates)
+    copy = LogStats()
+    copy.total = self.total
+    copy._start = self._start
+    copy._buckets = [dict(bucket) for bucket in self._buckets]
+    copy._bucket_index = self._bucket_index
+    copy._bucket = copy._buckets[copy._bucket_index % copy._bucket_count]
+    copy._top_counts = dict([(key, list(counter)) for key, counter in self._top_counts.items()])
+    copy._top_by_count = dict([(count, set(keys)) for count, keys in self._top_by_count.items()])
+    copy._top_min = self._top_min
 
     return copy
 
-  def __eq__(self, other):
-    if isinstance(other, LogEntry):
-      return hash(self) == hash(other)
-    else:
-      return False
+  def _advance(self, now):
+    """
+    Moves to the bucket for the given time, clearing those we pass.
+    """
 
-  def __hash__(self):
-    return hash(self.display_message)
+    index = int(now // STATS_BUCKET_SIZE)
 
+    if index <= self._bucket_index:
+      return
 
-class LogFileOutput(object):
+    for i in range(max(self._bucket_index + 1, index - self._bucket_count + 1), index + 1):
+      self._buckets[i % self._bucket_count].clear()
+
+    self._bucket_index = index
+    self._bucket = self._buckets[index % self._bucket_count]
+
+
+def _stats_key(entry):
   """
-  File where log messages we receive are written. If unable to do so then a
-  notification is logged and further write attempts are skipped.
+  Key for counting entries that are the same message, regardless of the day
+  they occurred or how their parameters vary.
   """
 
-  def __init__(self, path):
-    self._file = None
+  dedup_key = entry.dedup_key
 
-    if path:
-      try:
-        path_dir = os.path.dirname(path)
+  if isinstance(dedup_key, tuple):
+    return (dedup_key[0], dedup_key[2])  # runlevel and message template
+  elif GROUP_BY_DAY:
+    runlevel, _, message = dedup_key.split(':', 2)
+    return (runlevel, message)
+  else:
+    return tuple(dedup_key.split(':', 1))
 
-        if not os.path.exists(path_dir):
-          os.makedirs(path_dir)
 
-        self._file = open(path, 'a')
-        stem.util.log.notice('nyx %s opening log file (%s)' % (nyx.__version__, path))
-      except (IOError, OSError) as exc:
-        stem.util.log.error('Unable to write to log file: %s' % exc.strerror)
+class LogView(object):
+  """
+  Entries of a LogGroup that match a filter. Rather than filtering the whole
+  log each time we're asked, new entries are added as they arrive. We're only
+  rebuilt when the filter or LogGroup changes.
 
-  def write(self, msg):
-    if self._file:
-      try:
-        self._file.write(msg + '\n')
-        self._file.flush()
-      except IOError as exc:
-        stem.util.log.error('Unable to write to log file: %s' % exc.strerror)
-        self._file = None
+  Entries are indexed by the day they occured on, so they can be provided by
+  day without walking and regrouping the log.
 
+  Renderers can also have us cache the height of our entries. These are summed
+  in blocks, so the height of a range or the entries within a number of lines
+  can be found without measuring or walking everything we have.
 
-class LogFilters(object):
-  """
-  Regular expression filtering for log output. This is thread safe and tracks
-  the latest selections.
+  When our filter changes we retain how we were filtered before, so switching
+  back to a recent filter only needs to consider entries that have since
+  arrived.
   """
 
-  def __init__(self, initial_filters = None, max_filters = 5):
-    self._max_filters = max_filters
-    self._selected = None
-    self._past_filters = collections.OrderedDict()
-    self._lock = threading.RLock()
+  _STATE = ('_key', '_added', '_removed', '_start', '_evicted', '_entries', '_indices', '_days', '_newest', '_height_key', '_heights', '_block_heights')
+
+  def __init__(self):
+    self._cached = collections.OrderedDict()  # key => our state when filtered by it
+    self._key = None  # (log group, merges, regex, show duplicates) we're filtered by
+    self._added = 0  # how many entries of the log group we've processed
+    self._removed = 0  # positions we've dropped from the front of our lists
+    self._start = 0  # position of our oldest entry the log group still has
+    self._evicted = 0  # index of the log group's oldest entry when we last checked its evictions
+    self._entries = []  # matching entries, oldest to newest
+    self._indices = []  # index of each entry in the log group
+    self._days = []  # [day, position of its first entry], oldest to newest
+    self._newest = {}  # dedup key => position of its newest entry, if hiding duplicates
+    self._height_key = None  # renderer attributes our heights are for
+    self._height_func = None
+    self._heights = []  # height of each entry, None if not yet measured
+    self._block_heights = {}  # block => summed height of its entries
+
+  def entries(self, log_group, log_filter, show_duplicates):
+    """
+    Provides the entries of a log group that match the given filter.
 
-    if initial_filters:
-      # register these regexes as options, then blank our selection
+    :param nyx.log.LogGroup log_group: log to provide the entries of
+    :param nyx.log.LogFilters log_filter: regex filter entries must match
+    :param bool show_duplicates: includes duplicate entries if **True**
 
-      for regex in initial_filters:
-        self.select(regex)
+    :returns: **iterator** for matching **LogEntry**, newest to oldest
+    """
 
-      self.select(None)
+    self._update(log_group, log_filter, show_duplicates)
+    return self._range(self._start, self._end(), show_duplicates)
 
-  def select(self, regex):
-    with self._lock:
-      if regex is None:
-        self._selected = None
-        return
+  def days(self, log_group, log_filter, show_duplicates):
+    """
+    Provides the entries of a log group that match the given filter, grouped
+    by the day they occured on. Entries of a day are usually together, but if
+    they arrived out of order a day can be listed more than once.
 
-      if regex in self._past_filters:
-        del self._past_filters[regex]
+    :param nyx.log.LogGroup log_group: log to provide the entries of
+    :param nyx.log.LogFilters log_filter: regex filter entries must match
+    :param bool show_duplicates: includes duplicate entries if **True**
 
-      try:
-        self._past_filters[regex] = re.compile(regex)
-        self._selected = regex
+    :returns: **list** of (day, entries) tuples, newest to oldest, where
+      entries is an **iterator** for matching **LogEntry** of that day
+    """
 
-        if len(self._past_filters) > self._max_filters:
-          self._past_filters.popitem(False)
-      except re.error as exc:
-        stem.util.log.notice('Invalid regular expression pattern (%s): %s' % (exc, regex))
+    self._update(log_group, log_filter, show_duplicates)
+    return [(day, self._range(start, end, show_duplicates)) for day, start, end in self._day_ranges()]
 
-  def selection(self):
-    return self._selected
+  def layout(self, log_group, log_filter, show_duplicates, height_key, height_func):
+    """
+    Provides the positions and height of the entries of each day. Hidden
+    duplicates have a height of zero. Entries are measured when first needed,
+    and again if the height_key changes.
+
+    :param nyx.log.LogGroup log_group: log to provide the entries of
+    :param nyx.log.LogFilters log_filter: regex filter entries must match
+    :param bool show_duplicates: includes duplicate entries if **True**
+    :param object height_key: attributes entry heights depend on, such as
+      the width they're rendered with
+    :param function height_func: provides the height of a **LogEntry**
+
+    :returns: **list** of (day, start, end, height) tuples, newest to oldest,
+      where start and end are the range of positions for that day's entries
+    """
 
-  def latest_selections(self):
-    return list(reversed(list(self._past_filters.keys())))
+    self._update(log_group, log_filter, show_duplicates)
+    self._height_func = height_func
 
-  def match(self, message):
-    regex_filter = self._past_filters.get(self._selected)
-    return not regex_filter or bool(regex_filter.search(message))
+    if height_key != self._height_key:
+      self._height_key = height_key
+      self._heights = [None] * len(self._entries)
+      self._block_heights = {}
 
-  def clone(self):
-    with self._lock:
-      copy = LogFilters(max_filters = self._max_filters)
-      copy._selected = self._selected
-      copy._past_filters = self._past_filters
+    return [(day, start, end, self._range_height(start, end)) for day, start, end in self._day_ranges()]
 
-      return copy
+  def entry(self, position):
+    """
+    Provides the entry at a position of our :func:`~nyx.log.LogView.layout`.
 
+    :param int position: position of the entry
 
-def read_tor_log(path, read_limit = None):
-  """
-  Provides logging messages from a tor log file, from newest to oldest.
+    :returns: :class:`~nyx.log.LogEntry` at that position
+    """
 
-  :param str path: logging location to read from
-  :param int read_limit: maximum number of lines to read from the file
+    return self._entries[position - self._removed]
 
-  :returns: **iterator** for **LogEntry** for the file's contents
+  def seek(self, start, end, lines):
+    """
+    Finds how many entries of a range, starting with the newest, fit within a
+    number of lines. This uses the heights of our last
+    :func:`~nyx.log.LogView.layout`.
 
-  :raises:
-    * **ValueError** if the log file has unrecognized content
-    * **IOError** if unable to read the file
-  """
+    :param int start: position of the oldest entry to consider
+    :param int end: position after the newest entry to consider
+    :param int lines: number of lines the entries can take
 
-  start_time = time.time()
-  count, isdst = 0, time.localtime().tm_isdst
+    :returns: **tuple** of the form (position, height) where the entries from
+      position to end have the given height
+    """
 
-  for line in stem.util.system.tail(path, read_limit):
-    # entries look like:
-    # Jul 15 18:29:48.806 [notice] Parsing GEOIP file.
+    position, height = end, 0
 
-    line_comp = line.split()
+    while position > start:
+      block = (position - 1) // HEIGHT_BLOCK_SIZE
+      block_start, block_end = self._block_range(block)
 
-    # Checks that we have all the components we expect. This could happen if
-    # we're either not parsing a tor log or in weird edge cases (like being
-    # out of disk space).
+      if block_start >= start and position == block_end:
+        block_height = self._block_height(block)
 
-    if len(line_comp) < 4:
-      raise ValueError("Log located at %s has a line that doesn't match the format we expect: %s" % (path, line))
-    elif len(line_comp[3]) < 3 or line_comp[3][1:-1].upper() not in TOR_RUNLEVELS:
-      raise ValueError('Log located at %s has an unrecognized runlevel: %s' % (path, line_comp[3]))
+        if height + block_height <= lines:
+          position, height = block_start, height + block_height
+          continue
 
-    runlevel = line_comp[3][1:-1].upper()
-    msg = ' '.join(line_comp[4:])
-    current_year = str(datetime.datetime.now().year)
+      entry_height = self._entry_height(position - 1)
 
-    # Pretending it's the current year. We don't know the actual year (#15607)
-    # and this may fail due to leap years when picking Feb 29th (#5265).
+      if height + entry_height > lines:
+        break
 
-    try:
-      timestamp_str = current_year + ' ' + ' '.join(line_comp[:3])
-      timestamp_str = timestamp_str.split('.', 1)[0]  # drop fractional seconds
-      timestamp_comp = list(time.strptime(timestamp_str, '%Y %b %d %H:%M:%S'))
-      timestamp_comp[8] = isdst
+      position, height = position - 1, height + entry_height
 
-      timestamp = int(time.mktime(tuple(timestamp_comp)))  # converts local to unix time
+    return position, height
 
-      if timestamp > time.time():
-        # log entry is from before a year boundary
-        timestamp_comp[0] -= 1
-        timestamp = int(time.mktime(tuple(timestamp_comp)))
-    except ValueError:
-      raise ValueError("Log located at %s has a timestamp we don't recognize: %s" % (path, ' '.join(line_comp[:3])))
+  def _end(self):
+    return self._removed + len(self._entries)
 
-    count += 1
-    yield LogEntry(timestamp, runlevel, msg)
+  def _day_ranges(self):
+    """
+    Provides the (day, start, end) position ranges of each day, newest to
+    oldest.
+    """
 
-    if 'opening log file' in msg or 'opening new log file' in msg:
-      break  # this entry marks the start of this tor instance
+    ranges, end = [], self._end()
 
-  stem.util.log.info("Read %s entries from tor's log file: %s (read limit: %s, runtime: %0.3f)" % (count, path, read_limit if read_limit else 'none', time.time() - start_time))
+    for day, start in reversed(self._days):
+      start = max(start, self._start)
+      ranges.append((day, start, end))
+      end = start
+
+    return ranges
+
+  def _range(self, start, end, show_duplicates):
+    """
+    Provides our entries within a range of positions, newest to oldest.
+    Entries become duplicates as newer ones arrive, so we check that as
+    they're provided.
+    """
+
+    for i in range(end - 1 - self._removed, start - 1 - self._removed, -1):
+      entry = self._entries[i]
+
+      if show_duplicates or not entry.is_duplicate:
+        yield entry
+
+  def _entry_height(self, position):
+    i = position - self._removed
+    height = self._heights[i]
+
+    if height is None:
+      entry = self._entries[i]
+      height = 0 if (entry.is_duplicate and not self._key[3]) else self._height_func(entry)
+      self._heights[i] = height
+
+    return height
+
+  def _block_range(self, block):
+    """
+    Positions of the entries we have within a block.
+    """
+
+    return max(block * HEIGHT_BLOCK_SIZE, self._start), min((block + 1) * HEIGHT_BLOCK_SIZE, self._end())
+
+  def _block_height(self, block):
+    height = self._block_heights.get(block)
+
+    if height is None:
+      height = sum([self._entry_height(position) for position in range(*self._block_range(block))])
+      self._block_heights[block] = height
+
+    return height
+
+  def _range_height(self, start, end):
+    height, position = 0, start
+
+    while position < end:
+      block = position // HEIGHT_BLOCK_SIZE
+      block_start, block_end = self._block_range(block)
+
+      if position == block_start and end >= block_end:
+        height += self._block_height(block)
+        position = block_end
+      else:
+        height += sum([self._entry_height(p) for p in range(position, min(block_end, end))])
+        position = min(block_end, end)
+
+    return height
+
+  def _invalidate(self, position):
+    """
+    Remeasures an entry the next time we need its height.
+    """
+
+    self._heights[position - self._removed] = None
+    self._block_heights.pop(position // HEIGHT_BLOCK_SIZE, None)
+
+  def _update(self, log_group, log_filter, show_duplicates):
+    key = (log_group, log_group._merges, log_filter.selection(), show_duplicates)
+
+    with log_group._lock:
+      if key != self._key:
+        if self._key is not None and self._key[:2] == key[:2]:
+          self._cached[self._key] = [getattr(self, attr) for attr in LogView._STATE]
+
+          while len(self._cached) > VIEW_CACHE_SIZE:
+            self._cached.popitem(False)
+        else:
+          self._cached.clear()  # our log group has changed
+
+        state = self._cached.pop(key, None)
+
+        if state:
+          for attr, value in zip(LogView._STATE, state):
+            setattr(self, attr, value)
+        else:
+          self._key = key
+          self._added = log_group._added - len(log_group._entries)
+          self._removed, self._start, self._evicted = 0, 0, self._added
+          self._entries, self._indices, self._days, self._heights = [], [], [], []
+          self._newest, self._block_heights = {}, {}
+
+      new_entries = list(itertools.islice(log_group._entries, min(log_group._added - self._added, len(log_group._entries))))
+      first_index = log_group._added - len(new_entries)
+      self._added = log_group._added
+
+      for i, entry in enumerate(reversed(new_entries)):
+        is_match = (show_duplicates or not entry.is_duplicate) and log_filter.match_entry(entry)
+
+        if not show_duplicates:
+          # entries we showed are hidden when a newer duplicate arrives
+
+          shown_position = self._newest.pop(entry.dedup_key, None)
+
+          if shown_position is not None:
+            self._invalidate(shown_position)
+
+          if is_match:
+            self._newest[entry.dedup_key] = self._end()
+
+        if is_match:
+          day = entry.day_count()
+
+          if not self._days or self._days[-1][0] != day:
+            self._days.append([day, self._end()])
+
+          self._block_heights.pop(self._end() // HEIGHT_BLOCK_SIZE, None)
+          self._entries.append(entry)
+          self._indices.append(first_index + i)
+          self._heights.append(None)
+
+      # drop entries and days the log group no longer has
+
+      oldest_index = log_group._added - len(log_group._entries)
+      start = self._start
+
+      while self._start < self._end() and self._indices[self._start - self._removed] < oldest_index:
+        if not show_duplicates:
+          dedup_key = self._entries[self._start - self._removed].dedup_key
+
+          if self._newest.get(dedup_key) == self._start:
+            del self._newest[dedup_key]
+
+        self._start += 1
+
+      if self._start != start:
+        self._block_heights.pop(self._start // HEIGHT_BLOCK_SIZE, None)
+
+      while self._days:
+        day_end = self._days[1][1] if len(self._days) > 1 else self._end()
+
+        if day_end > self._start:
+          break
+
+        self._days.pop(0)
+
+      dropped = self._start - self._removed
+
+      if dropped > 1000 and dropped > len(self._entries) // 2:
+        del self._entries[:dropped]
+        del self._indices[:dropped]
+        del self._heights[:dropped]
+
+        for block in [b for b in self._block_heights if b < self._start // HEIGHT_BLOCK_SIZE]:
+          del self._block_heights[block]
+
+        self._removed = self._start
+
+      if not show_duplicates:
+        # Shown entries note how many duplicates they're hiding, so remeasure
+        # them when an older duplicate is dropped.
+
+        for index, dedup_key in reversed(log_group._evicted):
+          if index < self._evicted:
+            break
+
+          shown_position = self._newest.get(dedup_key)
+
+          if shown_position is not None:
+            self._invalidate(shown_position)
+
+      self._evicted = oldest_index
+
+
+class DuplicateGroup(object):
+  """
+  Log entries that are duplicates of each other. Rather than listing every
+  member this only retains the most recent few (and the timestamps of the
+  rest), so adding and removing entries is constant time regardless of how
+  noisy a message is.
+
+  :var int count: number of entries in the group
+  :var int first_timestamp: unix timestamp of the oldest entry in the group
+  :var int last_timestamp: unix timestamp for when this message last occured
+  :var collections.deque recent: most recent entries of the group, newest first
+  """
+
+  def __init__(self, entry):
+    self.count = 1
+    self.first_timestamp = entry.timestamp
+    self.last_timestamp = entry.timestamp
+    self.recent = collections.deque([entry], RECENT_DUPLICATES)
+    self._timestamps = collections.deque([entry.timestamp])  # of each entry, oldest first
+
+  def add(self, entry):
+    """
+    Adds the newest entry of this group.
+
+    :param nyx.log.LogEntry entry: entry to be added
+    """
+
+    self.count += 1
+    self.last_timestamp = entry.timestamp
+    self.recent.appendleft(entry)
+    self._timestamps.append(entry.timestamp)
+
+  def remove(self, entry):
+    """
+    Removes the oldest entry of this group.
+
+    :param nyx.log.LogEntry entry: entry to be removed
+    """
+
+    self.count -= 1
+    self._timestamps.popleft()
+    self.first_timestamp = self._timestamps[0]
+
+    if self.recent and self.recent[-1] is entry:
+      self.recent.pop()
+
+  def clone(self):
+    copy = DuplicateGroup(self.recent[0])
+    copy.count = self.count
+    copy.first_timestamp = self.first_timestamp
+    copy.last_timestamp = self.last_timestamp
+    copy.recent = collections.deque(self.recent, RECENT_DUPLICATES)
+    copy._timestamps = collections.deque(self._timestamps)
+
+    return copy
+
+
+class LogEntry(object):
+  """
+  Individual tor or nyx log entry.
+
+  **Note:** Tor doesn't include the date in its timestamps so the year
+  component may be inaccurate. (:trac:`15607`)
+
+  :var int timestamp: unix timestamp for when the event occured
+  :var str type: event type
+  :var str message: event's message
+  :var str display_message: message annotated with our time and runlevel
+
+  :var str,tuple dedup_key: key that can be used for deduplication
+  :var bool is_duplicate: true if this matches other messages in the group and
+    isn't the first
+  :var DuplicateGroup duplicates: messages that are identical to this one
+  """
+
+  # We can have a great many of these so they're kept small. Our display
+  # message, dedup key, and day are only determined when first needed.
+  #
+  # When compacted our _message is the template's parameters instead.
+  #
+  # Our _filter_matches is a bitset of the LogFilters regexes we match,
+  # cached by LogFilters.match_entry().
+
+  __slots__ = ('timestamp', 'type', 'is_duplicate', 'duplicates', '_message', '_template', '_display_message', '_dedup_key', '_day_count', '_filter_matches')
+
+  def __init__(self, timestamp, type, message):
+    self.timestamp = timestamp
+    self.type = type
+
+    self.is_duplicate = False
+    self.duplicates = None
+
+    self._message = message
+    self._template = None
+    self._display_message = None
+    self._dedup_key = None
+    self._day_count = None
+    self._filter_matches = None
+
+  @property
+  def message(self):
+    if self._template is None:
+      return self._message
+    elif len(self._template) == 1:
+      return self._template[0]
+
+    message = [self._template[0]]
+
+    for param, part in zip(self._message.split(TEMPLATE_SEPARATOR), self._template[1:]):
+      message += [param, part]
+
+    return ''.join(message)
+
+  @property
+  def display_message(self):
+    if self._display_message is not None:
+      return self._display_message
+
+    entry_time = time.localtime(self.timestamp)
+    display_message = '%02i:%02i:%02i [%s] %s' % (entry_time[3], entry_time[4], entry_time[5], self.type, self.message)
+
+    if self._template is None:
+      self._display_message = display_message  # compacted entries are formatted each time
+
+    return display_message
+
+  @property
+  def dedup_key(self):
+    if self._dedup_key is None:
+      message_key = self._message_dedup_key()
+
+      if message_key is None and self._template is not None:
+        # key compacted entries by their template and parameters so we don't
+        # need a copy of their message
+
+        self._dedup_key = (self.type, self.day_count() if GROUP_BY_DAY else None, self._template, self._message)
+      else:
+        if message_key is None:
+          message_key = self.message
+
+        if GROUP_BY_DAY:
+          self._dedup_key = '%s:%s:%s' % (self.type, self.day_count(), message_key)
+        else:
+          self._dedup_key = '%s:%s' % (self.type, message_key)
+
+    return self._dedup_key
+
+  def _message_dedup_key(self):
+    """
+    Provides key we can use for deduplication for the message portion of our entry.
+
+    :returns: **str** key for deduplication purposes, **None** if our message
+      is only a duplicate of identical messages
+    """
+
+    message = self._message if self._template is None else self.message
+
+    if self.type == 'NYX_DEBUG' and 'runtime:' in message:
+      # most nyx debug messages show runtimes so try matching without that
+      return message[:message.find('runtime:')]
+
+    matcher = _common_log_messages().get(self.type, None)
+    return matcher.match(message) if matcher else None
+
+  def compact(self):
+    """
+    Stores our message as an interned template and the parameters that vary,
+    formatting it again when needed. This saves memory when we have many
+    similar messages, at the cost of our display message no longer being
+    cached.
+
+    Once we have :data:`~nyx.log.MAX_TEMPLATES` templates further messages with
+    a new template are left as-is.
+    """
+
+    if self._template is not None or TEMPLATE_SEPARATOR in self._message:
+      return
+
+    template = tuple(TEMPLATE_PARAMETER.split(self._message))
+    interned_template = _TEMPLATES.get(template, None)
+
+    if interned_template is None:
+      if len(_TEMPLATES) >= MAX_TEMPLATES:
+        return
+
+      interned_template = _TEMPLATES.setdefault(template, template)
+
+    self._message = TEMPLATE_SEPARATOR.join(TEMPLATE_PARAMETER.findall(self._message))
+    self._template = interned_template
+    self._display_message = None
+
+  def day_count(self):
+    """
+    Provides the day this event occured on by local time.
+
+    :reutrns: **int** with the day this occured on
+    """
+
+    if self._day_count is None:
+      self._day_count = day_count(self.timestamp)
+
+    return self._day_count
+
+  def clone(self, clone_duplicates = True):
+    copy = LogEntry(self.timestamp, self.type, self._message)
+    copy.is_duplicate = self.is_duplicate
+    copy._template = self._template
+    copy._display_message = self._display_message
+    copy._dedup_key = self._dedup_key
+    copy._day_count = self._day_count
+    copy._filter_matches = self._filter_matches
+
+    if clone_duplicates and self.duplicates is not None:
+      copy.duplicates = self.duplicates.clone()
+
+    return copy
+
+  def __eq__(self, other):
+    if isinstance(other, LogEntry):
+      return hash(self) == hash(other)
+    else:
+      return False
+
+  def __hash__(self):
+    return hash(self.display_message)
+
+
+class LogArchive(object):
+  """
+  On-disk archive of log entries, searchable through SQLite's full text
+  search. Entries are written in batches, and those beyond our retention
+  limits are periodically dropped. If the archive becomes unusable then a
+  notification is logged and further writes are skipped.
+
+  :param str path: sqlite database to archive entries within
+  :param int max_entries: maximum number of entries we retain
+  :param int max_age: maximum age in days of entries we retain
+  """
+
+  def __init__(self, path, max_entries = None, max_age = None):
+    self._max_entries = max_entries
+    self._max_age = max_age
+    self._pending = []  # (timestamp, type, message) tuples not yet written
+    self._last_flushed = time.time()
+    self._last_pruned = 0
+    self._conn = None
+    self._lock = threading.RLock()
+
+    try:
+      self._conn = sqlite3.connect(path, check_same_thread = False)
+
+      try:
+        self._conn.execute('CREATE VIRTUAL TABLE IF NOT EXISTS log USING fts5(message, type, timestamp UNINDEXED)')
+      except sqlite3.OperationalError:
+        self._conn.execute('CREATE VIRTUAL TABLE IF NOT EXISTS log USING fts4(message, type, timestamp, notindexed=timestamp)')  # sqlite without fts5
+
+      self._prune()
+    except sqlite3.Error as exc:
+      stem.util.log.notice('Unable to archive log entries at %s: %s' % (path, exc))
+      self._conn = None
+
+  def add(self, entry):
+    """
+    Archives a log entry. These are written when we've accumulated a batch of
+    :data:`~nyx.log.ARCHIVE_BATCH_SIZE` entries, or by
+    :func:`~nyx.log.LogArchive.flush`.
+
+    :param nyx.log.LogEntry entry: entry to be archived
+    """
+
+    if self._conn:
+      with self._lock:
+        self._pending.append((entry.timestamp, entry.type, entry.message))
+
+        if len(self._pending) >= ARCHIVE_BATCH_SIZE:
+          self.flush()
+
+  def flush(self, max_wait = 0):
+    """
+    Writes entries we've been given.
+
+    :param float max_wait: only write if we haven't done so within this many
+      seconds
+    """
+
+    with self._lock:
+      if not self._conn or not self._pending or time.time() - self._last_flushed < max_wait:
+        return
+
+      try:
+        with self._conn:
+          self._conn.executemany('INSERT INTO log(timestamp, type, message) VALUES (?,?,?)', self._pending)
+      except sqlite3.Error as exc:
+        stem.util.log.notice('Unable to archive log entries: %s' % exc)
+        self._conn = None
+
+      self._pending = []
+      self._last_flushed = time.time()
+
+  def prune(self):
+    """
+    Drops entries beyond our retention limits if we haven't done so within
+    :data:`~nyx.log.ARCHIVE_PRUNE_RATE` seconds. This isn't done when entries
+    are added so their callers aren't delayed.
+    """
+
+    with self._lock:
+      if not self._conn or time.time() - self._last_pruned < ARCHIVE_PRUNE_RATE:
+        return
+
+      try:
+        self._prune()
+      except sqlite3.Error as exc:
+        stem.util.log.notice('Unable to prune the log archive: %s' % exc)
+        self._conn = None
+
+  def search(self, query):
+    """
+    Provides archived entries that match a full text search query, such as
+    '**circuit AND failed**' or '**type:WARN**'. Entries are fetched a page at
+    a time as they're iterated over.
+
+    :param str query: full text search query
+
+    :returns: **iterator** for matching **LogEntry**, newest to oldest
+
+    :raises: **ValueError** if the query is malformed or we're unable to
+      read the archive
+    """
+
+    self.flush()
+    return self._results(query, self._search(query, None))  # fetch first page so malformed queries raise here
+
+  def entries(self):
+    """
+    Provides all of our archived entries. Like searches these are fetched a
+    page at a time.
+
+    :returns: **tuple** of the form (count, iterator), with the number of
+      entries we have and an iterator for each **LogEntry**, oldest to newest
+
+    :raises: **ValueError** if we're unable to read the archive
+    """
+
+    self.flush()
+
+    if not self._conn:
+      raise ValueError('Log archive is unavailable')
+
+    try:
+      with self._lock:
+        count = self._conn.execute('SELECT count(*) FROM log').fetchone()[0]
+    except sqlite3.Error as exc:
+      raise ValueError('Unable to read the log archive: %s' % exc)
+
+    return count, self._results(None, self._search(None, None, oldest_first = True), oldest_first = True)
+
+  def _results(self, query, results, oldest_first = False):
+    while results:
+      for rowid, timestamp, entry_type, message in results:
+        yield LogEntry(timestamp, entry_type, message)
+
+      results = self._search(query, rowid, oldest_first) if len(results) == ARCHIVE_PAGE_SIZE else None
+
+  def _search(self, query, from_rowid, oldest_first = False):
+    if not self._conn:
+      raise ValueError('Log archive is unavailable')
+
+    sql = 'SELECT rowid, timestamp, type, message FROM log'
+    conditions, params = [], []
+
+    if query is not None:
+      conditions.append('log MATCH ?')
+      params.append(query)
+
+    if from_rowid is not None:
+      conditions.append('rowid > ?' if oldest_first else 'rowid < ?')
+      params.append(from_rowid)
+
+    if conditions:
+      sql += ' WHERE ' + ' AND '.join(conditions)
+
+    try:
+      with self._lock:
+        order = 'ASC' if oldest_first else 'DESC'
+        return self._conn.execute(sql + ' ORDER BY rowid %s LIMIT %i' % (order, ARCHIVE_PAGE_SIZE), params).fetchall()
+    except sqlite3.Error as exc:
+      if query is None:
+        raise ValueError('Unable to read the log archive: %s' % exc)
+
+      raise ValueError("Unable to search the log archive for '%s': %s" % (query, exc))
+
+  def _prune(self):
+    """
+    Drops entries beyond our retention limits. Entries are archived in the
+    order they arrive, so their rowid reflects their age.
+    """
+
+    with self._conn:
+      if self._max_entries:
+        self._conn.execute('DELETE FROM log WHERE rowid <= (SELECT max(rowid) FROM log) - ?', (self._max_entries,))
+
+      if self._max_age:
+        expired_rowid = self._expired_rowid(time.time() - self._max_age * 86400)
+
+        if expired_rowid is not None:
+          self._conn.execute('DELETE FROM log WHERE rowid <= ?', (expired_rowid,))
+
+    self._last_pruned = time.time()
+
+  def _expired_rowid(self, cutoff):
+    """
+    Provides the rowid of our newest entry from before the cutoff, or **None**
+    if there isn't one. Timestamps aren't indexed, but rowids reflect age so we
+    can binary search for this rather than scanning the table.
+    """
+
+    oldest = self._conn.execute('SELECT rowid FROM log ORDER BY rowid ASC LIMIT 1').fetchone()
+    newest = self._conn.execute('SELECT rowid FROM log ORDER BY rowid DESC LIMIT 1').fetchone()
+
+    if not oldest:
+      return None
+
+    low, high, expired_rowid = oldest[0], newest[0], None
+
+    while low <= high:
+      middle = (low + high) // 2
+      rowid, timestamp = self._conn.execute('SELECT rowid, timestamp FROM log WHERE rowid >= ? ORDER BY rowid LIMIT 1', (middle,)).fetchone()
+
+      if timestamp < cutoff:
+        expired_rowid, low = rowid, rowid + 1
+      else:
+        high = middle - 1  # no entries between the middle and this rowid
+
+    return expired_rowid
+
+
+class LogQueue(object):
+  """
+  Bounded queue of log entries, so bursts of events don't hold up the thread
+  that delivers them. When full we handle further entries according to our
+  :data:`~nyx.log.Overflow` policy.
+
+  :var int dropped: number of entries we've discarded
+
+  :param int max_size: maximum number of entries we queue
+  :param nyx.log.Overflow overflow: handling for entries when we're full
+  :param int sample_rate: when sampling, keep one of this many entries with
+    each dedup key
+  """
+
+  def __init__(self, max_size, overflow = Overflow.DROP_OLDEST, sample_rate = 10):
+    self.dropped = 0
+
+    self._max_size = max_size
+    self._overflow = overflow
+    self._sample_rate = sample_rate
+    self._entries = collections.deque()
+    self._sampled = {}  # dedup key => entries we've received with it while full
+    self._cond = threading.Condition()
+    self._is_closed = False
+
+  def put(self, entry):
+    """
+    Queues an entry, handling it by our overflow policy if we're full. Entries
+    are discarded once we're closed.
+
+    :param nyx.log.LogEntry entry: entry to be queued
+    """
+
+    with self._cond:
+      if self._overflow == Overflow.BLOCK:
+        while len(self._entries) >= self._max_size and not self._is_closed:
+          self._cond.wait()
+
+      if self._is_closed:
+        self.dropped += 1
+        return
+      elif len(self._entries) >= self._max_size:
+        if self._overflow == Overflow.SAMPLE:
+          received = self._sampled.get(entry.dedup_key, 0)
+          self._sampled[entry.dedup_key] = received + 1
+
+          if received % self._sample_rate:
+            self.dropped += 1
+            return
+
+        self._entries.popleft()
+        self.dropped += 1
+
+      self._entries.append(entry)
+      self._cond.notify_all()
+
+  def get(self):
+    """
+    Removes and provides our queued entries, waiting for some if we're empty.
+
+    :returns: **list** of :class:`~nyx.log.LogEntry`, oldest first, which is
+      only empty if we've been closed
+    """
+
+    with self._cond:
+      while not self._entries and not self._is_closed:
+        self._cond.wait()
+
+      entries = list(self._entries)
+      self._entries.clear()
+      self._sampled.clear()
+      self._cond.notify_all()
+
+      return entries
+
+  def close(self):
+    """
+    Stops accepting entries, releasing anything waiting on us.
+    """
+
+    with self._cond:
+      self._is_closed = True
+      self._cond.notify_all()
+
+  def __len__(self):
+    return len(self._entries)
+
+
+class TorLogFollower(object):
+  """
+  Follows a tor log file, notifying a listener of entries as they're appended.
+  We check the file's size, reading only what's been added, and reopen it if
+  it's rotated or truncated.
+
+  Content already in the file is left for prepopulation, which should read
+  only up to our offset so entries aren't provided twice.
+
+  :var int offset: byte offset of the file we started following from, this is
+    **None** if we were unable to read it
+
+  :param str path: tor log file to follow
+  :param function listener: notified of each :class:`~nyx.log.LogEntry`
+    appended to the file
+  :param float poll_rate: seconds between checking the file for additions
+  """
+
+  def __init__(self, path, listener, poll_rate = TOR_LOG_POLL_RATE):
+    self._path = path
+    self._listener = listener
+    self._poll_rate = poll_rate
+    self._parser = _TorLogParser(path)
+    self._file = None
+    self._partial_line = b''  # end of the file that isn't yet a full line
+    self.offset = None
+    self._halt = False
+    self._halt_cond = threading.Condition()
+
+    try:
+      self._file = open(path, 'rb')
+      self.offset = _line_start(self._file, os.fstat(self._file.fileno()).st_size)
+      self._file.seek(self.offset)  # prior content is for prepopulation
+    except IOError as exc:
+      stem.util.log.info('Unable to read log located at %s: %s' % (path, exc))
+
+    self._thread = threading.Thread(target = self._run)
+    self._thread.setDaemon(True)
+    self._thread.start()
+
+  def stop(self):
+    """
+    Stops following the file.
+    """
+
+    with self._halt_cond:
+      self._halt = True
+      self._halt_cond.notify_all()
+
+    self._thread.join()
+
+  def _run(self):
+    while True:
+      with self._halt_cond:
+        if not self._halt:
+          self._halt_cond.wait(self._poll_rate)
+
+        if self._halt:
+          break
+
+      self._read()
+
+    if self._file:
+      self._file.close()
+
+  def _read(self):
+    """
+    Notifies our listener of lines appended since we last read.
+    """
+
+    try:
+      if self._file is None:
+        self._file = open(self._path, 'rb')
+        self._partial_line = b''
+      else:
+        file_stat, our_stat = os.stat(self._path), os.fstat(self._file.fileno())
+
+        if file_stat.st_ino != our_stat.st_ino or file_stat.st_size < self._file.tell():
+          # File was rotated or truncated. Finish reading what was appended
+          # to our prior file, then start on the new one.
+
+          if file_stat.st_ino != our_stat.st_ino:
+            self._notify(self._file.read())
+
+          self._file.close()
+          self._file = open(self._path, 'rb')
+          self._partial_line = b''
+
+      self._notify(self._file.read())
+    except (IOError, OSError):
+      pass  # file is missing, such as mid-rotation, so try again later
+
+  def _notify(self, content):
+    if not content:
+      return
+
+    now = time.time()
+
+    if self._parser.day != day_count(now):
+      self._parser = _TorLogParser(self._path)  # refresh the year and dst we assume
+
+    lines = (self._partial_line + content).split(b'\n')
+    self._partial_line = lines.pop()
+
+    for line in lines:
+      if not line.strip():
+        continue
+
+      try:
+        self._listener(self._parser.parse(line.decode('utf-8', 'replace'), now))
+      except ValueError as exc:
+        stem.util.log.info(str(exc))
+
+
+class LogExport(object):
+  """
+  Snapshot of log entries, written to a file by a background thread. Entries
+  are written as they're read so large logs aren't copied in memory. Our
+  format depends on the path's extension...
+
+    ========== ===========
+    Extension  Format
+    ========== ===========
+    **.jsonl** JSON Lines with each entry's timestamp, runlevel, message, and number of hidden duplicates
+    **.gz**    gzip compressed, for instance 'nyx.log.gz' or 'nyx.jsonl.gz'
+    other      plain text, as entries are displayed
+    ========== ===========
+
+  :var str path: location we're writing to
+  :var int processed: number of entries we've read
+  :var int written: number of entries we've written
+  :var bool is_done: **True** once we've finished
+  :var str error: reason we failed, **None** unless we did
+
+  :param str path: location to write to, which is overwritten if it exists
+  :param iterator entries: :class:`~nyx.log.LogEntry` to write
+  :param int total: number of entries we'll be given, if known
+  :param nyx.log.LogFilters log_filter: only write matching entries if set
+  :param bool show_duplicates: includes duplicate entries if **True**
+
+  :raises: **IOError** if unable to write to the path
+  """
+
+  def __init__(self, path, entries, total = None, log_filter = None, show_duplicates = True):
+    self.path = os.path.abspath(os.path.expanduser(path))
+    self.processed = 0
+    self.written = 0
+    self.is_done = False
+    self.error = None
+
+    self._total = total
+    self._filter = log_filter
+    self._show_duplicates = show_duplicates
+    self._is_jsonl = self.path.endswith(('.jsonl', '.jsonl.gz'))
+
+    base_dir = os.path.dirname(self.path)
+
+    try:
+      if not os.path.exists(base_dir):
+        os.makedirs(base_dir)
+    except OSError:
+      raise IOError("unable to make directory '%s'" % base_dir)
+
+    try:
+      self._file = gzip.open(self.path, 'wb') if self.path.endswith('.gz') else open(self.path, 'wb')
+    except (IOError, OSError) as exc:
+      raise IOError("unable to write to '%s': %s" % (self.path, exc))
+
+    self._thread = threading.Thread(target = self._run, args = (entries,))
+    self._thread.setDaemon(True)
+    self._thread.start()
+
+  def progress(self):
+    """
+    Provides the fraction of our entries we've processed.
+
+    :returns: **float** from zero to one, **None** if our total is unknown
+    """
+
+    return min(1.0, float(self.processed) / self._total) if self._total else None
+
+  def join(self, timeout = None):
+    """
+    Waits for our snapshot to be written.
+
+    :param float timeout: maximum seconds to wait, no limit if **None**
+    """
+
+    self._thread.join(timeout)
+
+  def _run(self, entries):
+    batch = []
+
+    try:
+      for entry in entries:
+        self.processed += 1
+
+        if not self._show_duplicates and entry.is_duplicate:
+          continue
+        elif self._filter and not self._filter.match_entry(entry):
+          continue
+
+        batch.append(self._format(entry))
+
+        if len(batch) >= EXPORT_BATCH_SIZE:
+          self._write(batch)
+          batch = []
+
+      self._write(batch)
+    except (IOError, OSError, ValueError) as exc:
+      self.error = "unable to write to '%s': %s" % (self.path, exc)
+    finally:
+      self._file.close()
+      self.is_done = True
+
+  def _format(self, entry):
+    if not self._is_jsonl:
+      return entry.display_message
+
+    if entry.duplicates and not self._show_duplicates:
+      duplicates = entry.duplicates.count - 1
+    else:
+      duplicates = 0
+
+    return json.dumps({
+      'timestamp': entry.timestamp,
+      'runlevel': entry.type,
+      'message': entry.message,
+      'duplicates': duplicates,
+    }, sort_keys = True)
+
+  def _write(self, lines):
+    if lines:
+      self._file.write(('\n'.join(lines) + '\n').encode('utf-8'))
+      self.written += len(lines)
+
+
+class LogFileOutput(object):
+  """
+  File where log messages we receive are written. Messages are queued and
+  written in batches by a background thread, so logging doesn't wait on the
+  disk. If our queue is full further messages are dropped, and if unable to
+  write then a notification is logged and further write attempts are skipped.
+
+  :var int dropped: number of messages dropped because our queue was full
+
+  :param str path: location to write messages to
+  :param int max_size: bytes after which we rotate the file, unlimited if zero
+  :param bool compress: gzip the files we rotate
+  """
+
+  def __init__(self, path, max_size = 0, compress = False):
+    self.dropped = 0
+
+    self._path = path
+    self._max_size = max_size
+    self._compress = compress
+    self._file = None
+    self._queue = collections.deque()  # messages that have yet to be written
+    self._queue_cond = threading.Condition()
+    self._thread = None
+    self._halt = False
+
+    if path:
+      try:
+        path_dir = os.path.dirname(path)
+
+        if not os.path.exists(path_dir):
+          os.makedirs(path_dir)
+
+        self._file = open(path, 'a')
+        stem.util.log.notice('nyx %s opening log file (%s)' % (nyx.__version__, path))
+
+        self._thread = threading.Thread(target = self._run)
+        self._thread.setDaemon(True)
+        self._thread.start()
+      except (IOError, OSError) as exc:
+        stem.util.log.error('Unable to write to log file: %s' % exc.strerror)
+
+  def write(self, msg):
+    if self._file:
+      with self._queue_cond:
+        if len(self._queue) >= LOG_FILE_QUEUE_SIZE:
+          self.dropped += 1
+        else:
+          self._queue.append(msg)
+
+          if len(self._queue) == LOG_FILE_BATCH_SIZE:
+            self._queue_cond.notify()
+
+  def close(self):
+    """
+    Writes the messages we have queued and closes our file.
+    """
+
+    with self._queue_cond:
+      self._halt = True
+      self._queue_cond.notify()
+
+    if self._thread:
+      self._thread.join()
+
+  def _run(self):
+    """
+    Writes our queued messages when we have a batch of them, or they've waited
+    for :data:`~nyx.log.LOG_FILE_FLUSH_RATE` seconds.
+    """
+
+    reported_drops = 0
+
+    while True:
+      with self._queue_cond:
+        if not self._halt and len(self._queue) < LOG_FILE_BATCH_SIZE:
+          self._queue_cond.wait(LOG_FILE_FLUSH_RATE)
+
+        messages, self._queue = self._queue, collections.deque()
+        is_halted, dropped = self._halt, self.dropped
+
+      if messages and self._file:
+        try:
+          self._file.write('\n'.join(messages) + '\n')
+          self._file.flush()
+
+          if self._max_size and self._file.tell() >= self._max_size:
+            self._rotate()
+        except (IOError, OSError) as exc:
+          stem.util.log.error('Unable to write to log file: %s' % exc.strerror)
+          self._file = None
+
+      if dropped > reported_drops:
+        stem.util.log.notice('Unable to keep up with writing to our log file, dropped %i messages' % (dropped - reported_drops))
+        reported_drops = dropped
+
+      if is_halted:
+        if self._file:
+          self._file.close()
+          self._file = None
+
+        return
+
+  def _rotate(self):
+    """
+    Moves our file aside, retaining :data:`~nyx.log.LOG_FILE_BACKUPS` of
+    those we've rotated, and starts a new one.
+    """
+
+    self._file.close()
+    self._file = None
+    suffix = '.gz' if self._compress else ''
+
+    for i in range(LOG_FILE_BACKUPS, 0, -1):
+      backup_path = '%s.%i%s' % (self._path, i, suffix)
+
+      if os.path.exists(backup_path):
+        if i == LOG_FILE_BACKUPS:
+          os.remove(backup_path)
+        else:
+          os.rename(backup_path, '%s.%i%s' % (self._path, i + 1, suffix))
+
+    if self._compress:
+      with open(self._path, 'rb') as log_file:
+        with gzip.open(self._path + '.1.gz', 'wb') as compressed_file:
+          shutil.copyfileobj(log_file, compressed_file)
+
+      os.remove(self._path)
+    else:
+      os.rename(self._path, self._path + '.1')
+
+    self._file = open(self._path, 'a')
+
+
+class LogFilters(object):
+  """
+  Regular expression filtering for log output. This is thread safe and tracks
+  the latest selections.
+
+  Entries are checked against all of our regexes at once, with a bitset of
+  those they match cached on the entry. Changing our selection between these
+  regexes then doesn't require matching anything again.
+  """
+
+  def __init__(self, initial_filters = None, max_filters = 5):
+    self._max_filters = max_filters
+    self._selected = None
+    self._past_filters = collections.OrderedDict()  # regex => (compiled regex, bit)
+    self._generation = 0  # identifies our regexes within the matches entries cache
+    self._lock = threading.RLock()
+
+    if initial_filters:
+      # register these regexes as options, then blank our selection
+
+      for regex in initial_filters:
+        self.select(regex)
+
+      self.select(None)
+
+  def select(self, regex):
+    with self._lock:
+      if regex is None:
+        self._selected = None
+        return
+
+      if regex in self._past_filters:
+        self._past_filters[regex] = self._past_filters.pop(regex)  # now our latest selection
+        self._selected = regex
+        return
+
+      try:
+        compiled_regex = re.compile(regex)
+      except re.error as exc:
+        stem.util.log.notice('Invalid regular expression pattern (%s): %s' % (exc, regex))
+        return
+
+      if len(self._past_filters) >= self._max_filters:
+        _, (_, bit) = self._past_filters.popitem(False)
+      else:
+        bit = 1 << len(self._past_filters)
+
+      self._past_filters[regex] = (compiled_regex, bit)
+      self._selected = regex
+      self._generation = next(_FILTER_GENERATION)
+
+  def selection(self):
+    return self._selected
+
+  def latest_selections(self):
+    return list(reversed(list(self._past_filters.keys())))
+
+  def match(self, message):
+    regex_filter = self._past_filters.get(self._selected)
+    return not regex_filter or bool(regex_filter[0].search(message))
+
+  def match_entry(self, entry):
+    """
+    Checks if an entry matches our selected regex. The first time an entry is
+    checked we match it against all of our regexes, and cache the results.
+
+    :param nyx.log.LogEntry entry: entry to be checked
+
+    :returns: **True** if the entry matches our selection, **False** otherwise
+    """
+
+    regex_filter = self._past_filters.get(self._selected)
+
+    if not regex_filter:
+      return True
+
+    matches = entry._filter_matches
+
+    if matches is None or matches >> self._max_filters != self._generation:
+      with self._lock:
+        message = entry.display_message
+        matches = self._generation << self._max_filters
+
+        for compiled_regex, bit in self._past_filters.values():
+          if compiled_regex.search(message):
+            matches |= bit
+
+        entry._filter_matches = matches
+
+    return bool(matches & regex_filter[1])
+
+  def clone(self):
+    with self._lock:
+      copy = LogFilters(max_filters = self._max_filters)
+      copy._selected = self._selected
+      copy._past_filters = collections.OrderedDict(self._past_filters)
+      copy._generation = self._generation
+
+      return copy
+
+
+def read_tor_log(path, read_limit = None, end = None):
+  """
+  Provides logging messages from a tor log file, from newest to oldest.
+
+  :param str path: logging location to read from
+  :param int read_limit: maximum number of lines to read from the file
+  :param int end: byte offset to read up to, such as where a
+    :class:`~nyx.log.TorLogFollower` began, or the whole file if **None**
+
+  :returns: **iterator** for **LogEntry** for the file's contents
+
+  :raises:
+    * **ValueError** if the log file has unrecognized content
+    * **IOError** if unable to read the file
+  """
+
+  start_time, count = time.time(), 0
+  parser = _TorLogParser(path)
+
+  for line in itertools.islice(_read_lines_backwards(path, end), read_limit):
+    entry = parser.parse(line, start_time)
+    count += 1
+    yield entry
+
+    if 'opening log file' in entry.message or 'opening new log file' in entry.message:
+      break  # this entry marks the start of this tor instance
+
+  stem.util.log.info("Read %s entries from tor's log file: %s (read limit: %s, runtime: %0.3f)" % (count, path, read_limit if read_limit else 'none', time.time() - start_time))
+
+
+class _TorLogParser(object):
+  """
+  Parser for the lines of a tor log file, caching when the days they're from
+  began.
+
+  :var int day: day count when this parser was made
+  """
+
+  def __init__(self, path):
+    self.day = day_count(time.time())
+
+    self._path = path
+    self._isdst = time.localtime().tm_isdst
+    self._current_year = datetime.datetime.now().year
+    self._day_timestamps = {}  # (month, day) => unix time of that day's start, this year and last
+
+  def parse(self, line, now):
+    """
+    Parses a line from tor's log file.
+
+    :param str line: line to be parsed
+    :param float now: unix time entries can't be newer than, or they're from
+      the prior year
+
+    :returns: :class:`~nyx.log.LogEntry` for this line
+
+    :raises: **ValueError** if the line doesn't match tor's log format
+    """
+
+    # entries look like:
+    # Jul 15 18:29:48.806 [notice] Parsing GEOIP file.
+
+    line_comp = line.split()
+
+    # Checks that we have all the components we expect. This could happen if
+    # we're either not parsing a tor log or in weird edge cases (like being
+    # out of disk space).
+
+    if len(line_comp) < 4:
+      raise ValueError("Log located at %s has a line that doesn't match the format we expect: %s" % (self._path, line))
+
+    runlevel = TOR_LOG_RUNLEVELS.get(line_comp[3])
+
+    if runlevel is None:
+      if len(line_comp[3]) < 3 or line_comp[3][1:-1].upper() not in TOR_RUNLEVELS:
+        raise ValueError('Log located at %s has an unrecognized runlevel: %s' % (self._path, line_comp[3]))
+
+      runlevel = line_comp[3][1:-1].upper()
+
+    msg = ' '.join(line_comp[4:])
+
+    # Pretending it's the current year. We don't know the actual year (#15607)
+    # and this may fail due to leap years when picking Feb 29th (#5265).
+
+    try:
+      day_key = (line_comp[0], line_comp[1])
+      day_start = self._day_timestamps.get(day_key)
+
+      if day_start is None:
+        day_start = _tor_log_day(line_comp[0], line_comp[1], self._current_year, self._isdst)
+        self._day_timestamps[day_key] = day_start
+
+      hour, minute, second = [int(comp) for comp in line_comp[2].split('.', 1)[0].split(':')]
+
+      if not (0 <= hour < 24 and 0 <= minute < 60 and 0 <= second < 62):
+        raise ValueError()
+
+      timestamp = day_start[0] + hour * 3600 + minute * 60 + second
+
+      if timestamp > now:
+        # log entry is from before a year boundary
+        timestamp = day_start[1] + hour * 3600 + minute * 60 + second
+    except ValueError:
+      raise ValueError("Log located at %s has a timestamp we don't recognize: %s" % (self._path, ' '.join(line_comp[:3])))
+
+    return LogEntry(timestamp, runlevel, msg)
+
+
+def _tor_log_day(month, day, year, isdst):
+  """
+  Unix time for the start of a day in tor's log, this year and the prior one.
+
+  :raises: **ValueError** if this isn't a valid day
+  """
+
+  month = TOR_LOG_MONTHS.get(month.lower())
+
+  if month is None:
+    raise ValueError()
+
+  day = int(day)
+  datetime.date(year, month, day)  # checks that this is a valid date
+
+  this_year = int(time.mktime((year, month, day, 0, 0, 0, 0, 0, isdst)))
+  last_year = int(time.mktime((year - 1, month, day, 0, 0, 0, 0, 0, isdst)))
+
+  return this_year, last_year
+
+
+def _line_start(log_file, offset):
+  """
+  Provides the offset where the line containing this position begins, so a
+  line that's still being written is read in full once it's done.
+  """
+
+  end = offset
+
+  while end > 0:
+    start = max(0, end - 4096)
+    log_file.seek(start)
+    newline = log_file.read(end - start).rfind(b'\n')
+
+    if newline != -1:
+      return start + newline + 1
+
+    end = start
+
+  return 0
+
+
+def _read_lines_backwards(path, end = None):
+  """
+  Provides the lines of a file, from its end to its start. The file is memory
+  mapped and split into lines a large chunk at a time.
+
+  :raises: **IOError** if unable to read the file
+  """
+
+  with open(path, 'rb') as log_file:
+    size = os.fstat(log_file.fileno()).st_size
+
+    if end is not None:
+      size = min(size, end)
+
+    if not size:
+      return  # can't memory map an empty file
+
+    content = mmap.mmap(log_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+    try:
+      end, partial_line = size, b''
+
+      while end > 0:
+        start = max(0, end - TOR_LOG_CHUNK_SIZE)
+        chunk, end = content[start:end] + partial_line, start
+
+        if start > 0:
+          if b'\n' not in chunk:
+            partial_line = chunk
+            continue
+
+          partial_line, chunk = chunk.split(b'\n', 1)
+
+        for line in reversed(chunk.splitlines()):
+          yield line.decode('utf-8', 'replace')
+    finally:
+      content.close()
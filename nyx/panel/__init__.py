@@ -96,6 +96,9 @@ class Panel(object):
     self._last_draw_top = 0
     self._last_draw_size = nyx.curses.Dimensions(0, 0)
 
+    self._force_redraw = False  # redraw requested regardless of our dimensions
+    self._redraw_lock = threading.Lock()
+
   def get_top(self):
     """
     Provides our top position in the overall screen.
@@ -153,7 +156,9 @@ class Panel(object):
 
   def redraw(self, force = True, top = None):
     """
-    Renders our panel's content to the screen.
+    Renders our panel's content to the screen. This is drawn with the next
+    frame of our interface (see :func:`~nyx.curses.invalidate`), so redraws
+    that are requested in quick succession are only drawn once.
 
     :param bool force: if **False** only redraws content if the panel's
       dimensions have changed
@@ -166,6 +171,22 @@ class Panel(object):
     if not self._visible:
       return  # not currently visible
 
+    with self._redraw_lock:
+      self._force_redraw = self._force_redraw or force
+
+    nyx.curses.invalidate(self._render)
+
+  def _render(self):
+    """
+    Draws our content, as requested by :func:`~nyx.panel.Panel.redraw`.
+    """
+
+    with self._redraw_lock:
+      force, self._force_redraw = self._force_redraw, False
+
+    if not self._visible:
+      return  # hidden since our redraw was requested
+
     if not force and self._last_draw_top == self._top:
       draw_dimension = self._last_draw_size
     else:
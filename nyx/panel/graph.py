@@ -14,25 +14,33 @@ Downloaded (0.0 B/sec):           Uploaded (0.0 B/sec):
          25s  50   1m   1.6  2.0           25s  50   1m   1.6  2.0
 """
 
+import collections
 import copy
 import functools
+import json
+import math
+import os
 import threading
 import time
 
+import stem
+import stem.util
+
 import nyx.curses
 import nyx.panel
 import nyx.popups
 import nyx.tracker
 
-from nyx import nyx_interface, tor_controller, join, show_message
+from nyx import nyx_interface, tor_controller, join, input_prompt, show_message
 from nyx.curses import RED, GREEN, CYAN, BOLD, HIGHLIGHT
 from nyx.menu import MenuItem, Submenu, RadioMenuItem, RadioGroup
-from stem.control import EventType, Listener
+from stem.control import EventType
 from stem.util import conf, enum, log, str_tools, system
 
-GraphStat = enum.Enum(('BANDWIDTH', 'bandwidth'), ('CONNECTIONS', 'connections'), ('SYSTEM_RESOURCES', 'resources'))
+GraphStat = enum.Enum(('BANDWIDTH', 'bandwidth'), ('CONNECTIONS', 'connections'), ('SYSTEM_RESOURCES', 'resources'), ('CIRCUITS', 'circuits'))
 Interval = enum.Enum(('EACH_SECOND', 'each second'), ('FIVE_SECONDS', '5 seconds'), ('THIRTY_SECONDS', '30 seconds'), ('MINUTELY', 'minutely'), ('FIFTEEN_MINUTE', '15 minute'), ('THIRTY_MINUTE', '30 minute'), ('HOURLY', 'hourly'), ('DAILY', 'daily'))
 Bounds = enum.Enum(('GLOBAL_MAX', 'global_max'), ('LOCAL_MAX', 'local_max'), ('TIGHT', 'tight'))
+ExportFormat = enum.Enum(('CSV', 'csv'), ('JSONL', 'jsonl'))
 
 INTERVAL_SECONDS = {
   Interval.EACH_SECOND: 1,
@@ -52,6 +60,14 @@ DEFAULT_CONTENT_HEIGHT = 4  # space needed for labeling above and below the grap
 WIDE_LABELING_GRAPH_COL = 50  # minimum graph columns to use wide spacing for x-axis labels
 TITLE_UPDATE_RATE = 30
 
+# Circuit build times are bucketed logarithmically from 10 ms to two minutes,
+# each bucket being 20% wider than the last.
+
+BUILD_TIME_MIN = 0.01
+BUILD_TIME_MAX = 120
+BUILD_TIME_GROWTH = 1.2
+BUILD_TIME_QUANTILES = (0.5, 0.9)
+
 
 def conf_handler(key, value):
   if key == 'graph_height':
@@ -124,6 +140,7 @@ class GraphData(object):
   :var int latest_value: last value we recorded
   :var int total: sum of all values we've recorded
   :var int tick: number of events we've processed
+  :var float last_updated: unix timestamp when we last recorded a value
   :var dict values: mapping of intervals to an array of samplings from newest to oldest
   """
 
@@ -132,6 +149,7 @@ class GraphData(object):
       self.latest_value = clone.latest_value
       self.total = clone.total
       self.tick = clone.tick
+      self.last_updated = clone.last_updated
       self.values = copy.deepcopy(clone.values)
 
       self._category = category
@@ -142,6 +160,7 @@ class GraphData(object):
       self.latest_value = 0
       self.total = 0
       self.tick = 0
+      self.last_updated = time.time()
       self.values = dict([(i, CONFIG['max_graph_width'] * [0]) for i in Interval])
 
       self._category = category
@@ -156,6 +175,7 @@ class GraphData(object):
     self.latest_value = new_value
     self.total += new_value
     self.tick += 1
+    self.last_updated = time.time()
 
     for interval in Interval:
       interval_seconds = INTERVAL_SECONDS[interval]
@@ -235,15 +255,17 @@ class GraphCategory(object):
       self.secondary = GraphData(clone.secondary, category = self)
       self.start_time = clone.start_time
       self._title_stats = list(clone._title_stats)
-      self._primary_header_stats = list(clone._primary_header_stats)
-      self._secondary_header_stats = list(clone._secondary_header_stats)
+      self._header_stats_cache = dict(clone._header_stats_cache)
     else:
       self.primary = GraphData(category = self, is_primary = True)
       self.secondary = GraphData(category = self, is_primary = False)
       self.start_time = time.time()
       self._title_stats = []
-      self._primary_header_stats = []
-      self._secondary_header_stats = []
+
+      # Header stats are formatted when drawn, and only once per tick. Until
+      # we've received an event they're blank.
+
+      self._header_stats_cache = {True: (0, []), False: (0, [])}  # is_primary => (tick, stats)
 
   def stat_type(self):
     """
@@ -278,14 +300,32 @@ class GraphCategory(object):
   def _header(self, width, is_primary):
     if is_primary:
       header = CONFIG['attr.graph.header.primary'].get(self.stat_type(), '')
-      header_stats = self._primary_header_stats
+      data = self.primary
     else:
       header = CONFIG['attr.graph.header.secondary'].get(self.stat_type(), '')
-      header_stats = self._secondary_header_stats
+      data = self.secondary
+
+    tick, header_stats = self._header_stats_cache[is_primary]
+
+    if tick != data.tick:
+      header_stats = self._header_stats(data)
+      self._header_stats_cache[is_primary] = (data.tick, header_stats)
 
     header_stats = join(header_stats, '', width - len(header) - 4).rstrip()
     return '%s (%s):' % (header, header_stats) if header_stats else '%s:' % header
 
+  def _header_stats(self, data):
+    """
+    Provides the stats shown in a subgraph's header. This is only called when
+    we're drawn, and at most once per tick.
+
+    :param GraphData data: subgraph to provide stats for
+
+    :returns: **list** of strings to be shown
+    """
+
+    return []
+
   def _y_axis_label(self, value, is_primary):
     return str(value)
 
@@ -297,7 +337,8 @@ class BandwidthStats(GraphCategory):
 
   def __init__(self, clone = None):
     GraphCategory.__init__(self, clone)
-    self._title_last_updated = None
+    self._title_last_updated = clone._title_last_updated if clone else None
+    self._last_event_time = clone._last_event_time if clone else None
 
     if not clone:
       # fill in past bandwidth information
@@ -329,32 +370,33 @@ class BandwidthStats(GraphCategory):
         self.secondary.total = int(write_total)
         self.start_time = start_time
 
+      self._header_stats_cache = {True: (self.primary.tick, []), False: (self.secondary.tick, [])}
+
   def stat_type(self):
     return GraphStat.BANDWIDTH
 
   def _y_axis_label(self, value, is_primary):
     return _size_label(value, 0)
 
+  def title(self, width):
+    if not self._title_last_updated or time.time() - self._title_last_updated > TITLE_UPDATE_RATE:
+      self._title_stats = _bandwidth_title_stats()
+      self._title_last_updated = time.time()
+
+    return GraphCategory.title(self, width)
+
   def bandwidth_event(self, event):
     self.primary.update(event.read)
     self.secondary.update(event.written)
+    self._last_event_time = time.time()
 
-    self._primary_header_stats = [
-      '%-14s' % ('%s/sec' % _size_label(self.primary.latest_value)),
-      '- avg: %s/sec' % _size_label(self.primary.total / (time.time() - self.start_time)),
-      ', total: %s' % _size_label(self.primary.total),
+  def _header_stats(self, data):
+    return [
+      '%-14s' % ('%s/sec' % _size_label(data.latest_value)),
+      '- avg: %s/sec' % _size_label(data.total / (self._last_event_time - self.start_time)),
+      ', total: %s' % _size_label(data.total),
     ]
 
-    self._secondary_header_stats = [
-      '%-14s' % ('%s/sec' % _size_label(self.secondary.latest_value)),
-      '- avg: %s/sec' % _size_label(self.secondary.total / (time.time() - self.start_time)),
-      ', total: %s' % _size_label(self.secondary.total),
-    ]
-
-    if not self._title_last_updated or time.time() - self._title_last_updated > TITLE_UPDATE_RATE:
-      self._title_stats = _bandwidth_title_stats()
-      self._title_last_updated = time.time()
-
 
 class ConnectionStats(GraphCategory):
   """
@@ -365,26 +407,12 @@ class ConnectionStats(GraphCategory):
     return GraphStat.CONNECTIONS
 
   def bandwidth_event(self, event):
-    inbound_count, outbound_count = 0, 0
-
-    controller = tor_controller()
-    or_ports = controller.get_ports(Listener.OR, [])
-    dir_ports = controller.get_ports(Listener.DIR, [])
-    control_ports = controller.get_ports(Listener.CONTROL, [])
-
-    for entry in nyx.tracker.get_connection_tracker().get_value():
-      if entry.local_port in or_ports or entry.local_port in dir_ports:
-        inbound_count += 1
-      elif entry.local_port in control_ports:
-        pass  # control connection
-      else:
-        outbound_count += 1
-
-    self.primary.update(inbound_count)
-    self.secondary.update(outbound_count)
+    counts = nyx.tracker.get_connection_tracker().get_counts()
+    self.primary.update(counts.inbound)
+    self.secondary.update(counts.outbound)
 
-    self._primary_header_stats = [str(self.primary.latest_value), ', avg: %i' % self.primary.average()]
-    self._secondary_header_stats = [str(self.secondary.latest_value), ', avg: %i' % self.secondary.average()]
+  def _header_stats(self, data):
+    return [str(data.latest_value), ', avg: %i' % data.average()]
 
 
 class ResourceStats(GraphCategory):
@@ -403,8 +431,95 @@ class ResourceStats(GraphCategory):
     self.primary.update(resources.cpu_sample * 100)  # decimal percentage to whole numbers
     self.secondary.update(resources.memory_bytes)
 
-    self._primary_header_stats = ['%0.1f%%' % self.primary.latest_value, ', avg: %0.1f%%' % self.primary.average()]
-    self._secondary_header_stats = [str_tools.size_label(self.secondary.latest_value, 1), ', avg: %s' % str_tools.size_label(self.secondary.average(), 1)]
+  def _header_stats(self, data):
+    if data is self.primary:
+      return ['%0.1f%%' % data.latest_value, ', avg: %0.1f%%' % data.average()]
+    else:
+      return [str_tools.size_label(data.latest_value, 1), ', avg: %s' % str_tools.size_label(data.average(), 1)]
+
+
+class CircuitStats(GraphCategory):
+  """
+  Tracks the rate at which tor builds circuits, and how often they fail. Build
+  times are kept in a fixed size histogram so we can show their quantiles.
+  """
+
+  def __init__(self, clone = None):
+    GraphCategory.__init__(self, clone)
+
+    if clone:
+      self._build_times = _Histogram(clone._build_times)
+      self._build_timeout = clone._build_timeout
+      self._built_count = clone._built_count
+      self._failed_count = clone._failed_count
+    else:
+      self._build_times = _Histogram()
+      self._build_timeout = None  # milliseconds, from BUILDTIMEOUT_SET events
+      self._built_count = 0  # circuits built since our last tick
+      self._failed_count = 0  # circuits that failed since our last tick
+
+      controller = tor_controller()
+      controller.add_event_listener(self.circuit_event, EventType.CIRC)
+
+      try:
+        controller.add_event_listener(self.build_timeout_event, EventType.BUILDTIMEOUT_SET)
+      except stem.ProtocolError:
+        log.info("Tor doesn't support BUILDTIMEOUT_SET events, so the circuit graph won't include its build timeout")
+
+  def stat_type(self):
+    return GraphStat.CIRCUITS
+
+  def circuit_event(self, event):
+    """
+    Called when a circuit's status changes.
+    """
+
+    if event.status == stem.CircStatus.BUILT:
+      self._built_count += 1
+
+      if event.created:
+        self._build_times.add(event.arrived_at - stem.util.datetime_to_unix(event.created))
+    elif event.status == stem.CircStatus.FAILED:
+      self._failed_count += 1
+
+  def build_timeout_event(self, event):
+    """
+    Called when tor changes its circuit build timeout. When tor discards its
+    build time history we do too.
+    """
+
+    if event.set_type in (stem.TimeoutSetType.RESET, stem.TimeoutSetType.DISCARD):
+      self._build_times.clear()
+
+    self._build_timeout = event.timeout
+
+  def bandwidth_event(self, event):
+    built_count, failed_count = self._built_count, self._failed_count
+    self._built_count -= built_count
+    self._failed_count -= failed_count
+
+    self.primary.update(built_count)
+    self.secondary.update(failed_count)
+
+  def title(self, width):
+    self._title_stats = []
+
+    for quantile in BUILD_TIME_QUANTILES:
+      build_time = self._build_times.quantile(quantile)
+
+      if build_time is not None:
+        self._title_stats.append('p%i: %s' % (quantile * 100, _build_time_label(build_time)))
+
+    if self._build_timeout:
+      self._title_stats.append('timeout: %s' % _build_time_label(self._build_timeout / 1000.0))
+
+    return GraphCategory.title(self, width)
+
+  def _header_stats(self, data):
+    return ['%i/sec' % data.latest_value, ', avg: %0.1f/sec' % data.average(), ', total: %i' % data.total]
+
+  def _y_axis_label(self, value, is_primary):
+    return '%0.1f' % value if value < 10 else '%i' % value
 
 
 class GraphPanel(nyx.panel.Panel):
@@ -426,10 +541,12 @@ class GraphPanel(nyx.panel.Panel):
     self._stats = {
       GraphStat.BANDWIDTH: BandwidthStats(),
       GraphStat.SYSTEM_RESOURCES: ResourceStats(),
+      GraphStat.CIRCUITS: CircuitStats(),
     }
 
     self._stats_lock = threading.RLock()
     self._stats_paused = None
+    self._subgraph_cache = (_SubgraphCache(), _SubgraphCache())
 
     if CONFIG['show_connections']:
       self._stats[GraphStat.CONNECTIONS] = ConnectionStats()
@@ -536,6 +653,7 @@ class GraphPanel(nyx.panel.Panel):
       [ ] <Stat 2>
       [ ] <Stat 2>
           Resize...
+          Export...
           Interval (Submenu)
           Bounds (Submenu)
     """
@@ -548,10 +666,40 @@ class GraphPanel(nyx.panel.Panel):
       RadioMenuItem('None', stat_group, None),
       [RadioMenuItem(str_tools._to_camel_case(opt, divider = ' '), stat_group, opt) for opt in sorted(self.stat_options())],
       MenuItem('Resize...', self._resize_graph),
+      MenuItem('Export...', self._show_export_prompt),
       Submenu('Interval', [RadioMenuItem(opt, interval_group, opt) for opt in Interval]),
       Submenu('Bounds', [RadioMenuItem(opt, bounds_group, opt) for opt in Bounds]),
     ])
 
+  def _show_export_prompt(self):
+    """
+    Lets user enter a path to export the displayed graph's values to, canceling
+    if left blank. Paths ending with '.jsonl' or '.json' are written as JSON
+    Lines, and anything else as CSV.
+    """
+
+    if not self._displayed_stat:
+      show_message('No graph is being displayed to export', HIGHLIGHT, max_wait = 2)
+      return
+
+    path_input = input_prompt('Path to export graph to: ')
+
+    if path_input:
+      export_format = ExportFormat.JSONL if path_input.endswith(('.jsonl', '.json')) else ExportFormat.CSV
+
+      if nyx_interface().is_paused() and self._stats_paused:
+        stat = self._stats_paused[self._displayed_stat]
+      else:
+        stat = self._stats[self._displayed_stat]
+
+      try:
+        with self._stats_lock:
+          export(stat, self._update_interval, path_input, export_format)
+
+        show_message('Exported: %s' % path_input, HIGHLIGHT, max_wait = 2)
+      except IOError as exc:
+        show_message('Unable to export graph: %s' % exc, HIGHLIGHT, max_wait = 2)
+
   def _draw(self, subwindow):
     if not self._displayed_stat:
       return
@@ -573,8 +721,8 @@ class GraphPanel(nyx.panel.Panel):
 
       subwindow.addstr(0, 0, stat.title(subwindow.width), HIGHLIGHT)
 
-      _draw_subgraph(subwindow, stat.primary, 0, subgraph_width, subgraph_height, bounds_type, interval, PRIMARY_COLOR)
-      _draw_subgraph(subwindow, stat.secondary, subgraph_width, subgraph_width, subgraph_height, bounds_type, interval, SECONDARY_COLOR)
+      _draw_subgraph(subwindow, stat.primary, 0, subgraph_width, subgraph_height, bounds_type, interval, PRIMARY_COLOR, cache = self._subgraph_cache[0])
+      _draw_subgraph(subwindow, stat.secondary, subgraph_width, subgraph_width, subgraph_height, bounds_type, interval, SECONDARY_COLOR, cache = self._subgraph_cache[1])
 
       if stat.stat_type() == GraphStat.BANDWIDTH and accounting_stats:
         _draw_accounting_stats(subwindow, DEFAULT_CONTENT_HEIGHT + subgraph_height - 2, accounting_stats)
@@ -606,32 +754,146 @@ class GraphPanel(nyx.panel.Panel):
         self.redraw()
 
 
-def _draw_subgraph(subwindow, data, x, width, height, bounds_type, interval, color, fill_char = ' '):
+def export(stat, interval, path, export_format = ExportFormat.CSV):
   """
-  Renders subgraph including its title, labeled axis, and content.
+  Saves the values of a graph to the given path, oldest first. This overwrites
+  the file if it already exists.
+
+  :param GraphCategory stat: graph to be exported
+  :param Interval interval: sampling interval to export the values of
+  :param str path: path where to save the values
+  :param ExportFormat export_format: format to save the values as
+
+  :raises: **IOError** if unsuccessful
+  """
+
+  path = os.path.abspath(os.path.expanduser(path))
+  base_dir = os.path.dirname(path)
+
+  try:
+    if not os.path.exists(base_dir):
+      os.makedirs(base_dir)
+  except OSError:
+    raise IOError("unable to make directory '%s'" % base_dir)
+
+  with open(path, 'w') as export_file:
+    try:
+      export_file.writelines(export_lines(stat, interval, export_format))
+    except Exception as exc:
+      raise IOError("unable to write to '%s': %s" % (path, exc))
+
+
+def export_lines(stat, interval, export_format = ExportFormat.CSV):
   """
+  Provides the values of a graph as lines of CSV or JSON, oldest first. Each
+  has the unix timestamp when its sampling interval ended along with the value
+  of both subgraphs.
+
+  :param GraphCategory stat: graph to be exported
+  :param Interval interval: sampling interval to export the values of
+  :param ExportFormat export_format: format to provide the values as
+
+  :returns: **generator** for our lines, including their trailing newline
+  """
+
+  stat_type = stat.stat_type()
+  primary_label = CONFIG['attr.graph.header.primary'].get(stat_type, 'primary').lower()
+  secondary_label = CONFIG['attr.graph.header.secondary'].get(stat_type, 'secondary').lower()
+
+  # Values are replaced rather than modified when updated so these stay
+  # consistent, even as new events arrive.
+
+  interval_seconds = INTERVAL_SECONDS[interval]
+  primary_values, secondary_values = stat.primary.values[interval], stat.secondary.values[interval]
+  newest_timestamp = stat.primary.last_updated - stat.primary.tick % interval_seconds
+  columns = min(len(primary_values), len(secondary_values), stat.primary.tick // interval_seconds)
+
+  if export_format == ExportFormat.CSV:
+    yield 'timestamp,%s,%s\n' % (primary_label, secondary_label)
+
+  for i in range(columns - 1, -1, -1):
+    timestamp = int(newest_timestamp - i * interval_seconds)
+
+    if export_format == ExportFormat.JSONL:
+      yield json.dumps(collections.OrderedDict((('timestamp', timestamp), (primary_label, primary_values[i]), (secondary_label, secondary_values[i])))) + '\n'
+    else:
+      yield '%i,%s,%s\n' % (timestamp, primary_values[i], secondary_values[i])
+
 
-  columns = width - 8  # y-axis labels can be at most six characters wide with a space on either side
-  min_bound, max_bound = data.bounds(bounds_type, interval, columns)
+def _draw_subgraph(subwindow, data, x, width, height, bounds_type, interval, color, fill_char = ' ', cache = None):
+  """
+  Renders subgraph including its title, labeled axis, and content.
+  """
 
-  x_axis_labels = _x_axis_labels(interval, columns)
-  y_axis_labels = _y_axis_labels(height, data, min_bound, max_bound)
+  if cache is None:
+    cache = _SubgraphCache()
 
-  x_axis_offset = max([len(label) for label in y_axis_labels.values()])
-  columns = max(columns, width - x_axis_offset - 2)
+  graph = cache.update(data, width, height, bounds_type, interval, color, fill_char)
 
   subwindow.addstr(x, 1, data.header(width), color, BOLD)
 
-  for x_offset, label in x_axis_labels.items():
-    subwindow.addstr(x + x_offset + x_axis_offset, height, label, color)
+  for x_offset, label in cache.x_axis_labels.items():
+    subwindow.addstr(x + x_offset + cache.x_axis_offset, height, label, color)
 
-  for y, label in y_axis_labels.items():
+  for y, label in cache.y_axis_labels.items():
     subwindow.addstr(x, y, label, color)
 
-  for col in range(columns):
-    column_count = int(data.values[interval][col]) - min_bound
-    column_height = int(min(height - 2, (height - 2) * column_count / (max(1, max_bound) - min_bound)))
-    subwindow.vline(x + col + x_axis_offset + 1, height - column_height, column_height, color, HIGHLIGHT, char = fill_char)
+  subwindow.copy(x + cache.x_axis_offset + 1, 2, graph)
+
+
+class _SubgraphCache(object):
+  """
+  Rendered content of a subgraph. Each tick only adds a column, so rather than
+  redrawing everything we shift our prior columns over and draw just the new
+  one. We only fully render when the bounds, interval, or dimensions change.
+
+  :var dict x_axis_labels: mapping of x-axis positions to their label
+  :var dict y_axis_labels: mapping of y-axis positions to their label
+  :var int x_axis_offset: width of our y-axis labels
+  """
+
+  def __init__(self):
+    self.x_axis_labels = {}
+    self.y_axis_labels = {}
+    self.x_axis_offset = 0
+
+    self._canvas = None
+    self._data = None
+    self._key = None
+    self._samples = 0
+
+  def update(self, data, width, height, bounds_type, interval, color, fill_char):
+    """
+    Brings our rendered content up to date with the given data.
+
+    :returns: :class:`~nyx.curses._Subwindow` canvas with the graph's columns
+    """
+
+    columns = width - 8  # y-axis labels can be at most six characters wide with a space on either side
+    min_bound, max_bound = data.bounds(bounds_type, interval, columns)
+
+    key = (width, height, bounds_type, interval, min_bound, max_bound, color, fill_char)
+    samples = data.tick // INTERVAL_SECONDS[interval]
+    new_columns = samples - self._samples
+
+    if self._canvas is None or data is not self._data or key != self._key or not (0 <= new_columns < self._canvas.width):
+      self.x_axis_labels = _x_axis_labels(interval, columns)
+      self.y_axis_labels = _y_axis_labels(height, data, min_bound, max_bound)
+      self.x_axis_offset = max([len(label) for label in self.y_axis_labels.values()])
+
+      columns = max(columns, width - self.x_axis_offset - 2)
+      self._canvas = nyx.curses.canvas(columns, height - 2)
+      new_columns = columns
+    elif new_columns:
+      self._canvas.shift(new_columns)
+
+    for col in range(new_columns):
+      column_count = int(data.values[interval][col]) - min_bound
+      column_height = int(min(height - 2, (height - 2) * column_count / (max(1, max_bound) - min_bound)))
+      self._canvas.vline(col, height - 2 - column_height, column_height, color, HIGHLIGHT, char = fill_char)
+
+    self._data, self._key, self._samples = data, key, samples
+    return self._canvas
 
 
 def _x_axis_labels(interval, columns):
@@ -692,6 +954,80 @@ def _y_axis_labels(subgraph_height, data, min_bound, max_bound):
   return y_axis_labels
 
 
+class _Histogram(object):
+  """
+  Streaming histogram of circuit build times. Buckets grow logarithmically so
+  this uses a fixed amount of memory, and provides quantiles within our bucket
+  precision.
+
+  :var int count: number of values we've recorded
+  """
+
+  def __init__(self, clone = None):
+    if clone:
+      self.count = clone.count
+      self._buckets = list(clone._buckets)
+    else:
+      self.count = 0
+      self._buckets = [0] * (int(math.log(BUILD_TIME_MAX / BUILD_TIME_MIN, BUILD_TIME_GROWTH)) + 2)
+
+  def add(self, value):
+    """
+    Records a value.
+
+    :param float value: value to be recorded
+    """
+
+    if value < BUILD_TIME_MIN:
+      index = 0
+    else:
+      index = min(len(self._buckets) - 1, int(math.log(value / BUILD_TIME_MIN, BUILD_TIME_GROWTH)) + 1)
+
+    self._buckets[index] += 1
+    self.count += 1
+
+  def quantile(self, quantile):
+    """
+    Provides the approximate value at a given quantile.
+
+    :param float quantile: quantile to provide, from zero to one
+
+    :returns: **float** for the value at this quantile, **None** if we
+      haven't recorded any values
+    """
+
+    if not self.count:
+      return None
+
+    target, seen = max(1, quantile * self.count), 0
+
+    for index, bucket_count in enumerate(self._buckets):
+      seen += bucket_count
+
+      if seen >= target:
+        break
+
+    # middle of our bucket, the first being everything below our minimum
+
+    return BUILD_TIME_MIN * BUILD_TIME_GROWTH ** max(0, index - 0.5)
+
+  def clear(self):
+    """
+    Discards the values we've recorded.
+    """
+
+    self.count = 0
+    self._buckets = [0] * len(self._buckets)
+
+
+def _build_time_label(seconds):
+  """
+  Provides a short label for a circuit build time.
+  """
+
+  return '%i ms' % (seconds * 1000) if seconds < 1 else '%0.1fs' % seconds
+
+
 def _draw_accounting_stats(subwindow, y, accounting):
   if tor_controller().is_alive():
     hibernate_color = CONFIG['attr.hibernate_color'].get(accounting.status, RED)
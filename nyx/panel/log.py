@@ -8,7 +8,7 @@ regular expressions.
 """
 
 import functools
-import os
+import threading
 import time
 
 import stem.response.events
@@ -30,16 +30,34 @@ def conf_handler(key, value):
     return max(0, value)
   elif key == 'max_log_size':
     return max(1000, value)
+  elif key in ('archive_log_max_entries', 'archive_log_max_age', 'write_logs_max_size'):
+    return max(0, value)
+  elif key in ('log_queue_size', 'log_queue_sample_rate'):
+    return max(1, value)
+  elif key == 'log_queue_overflow':
+    if value not in nyx.log.Overflow:
+      log.warn("'%s' isn't a valid log queue overflow policy, options are: %s" % (value, ', '.join(nyx.log.Overflow)))
+      return CONFIG['log_queue_overflow']  # keep the default
 
 
 CONFIG = conf.config_dict('nyx', {
+  'archive_log': False,
+  'archive_log_max_age': 30,
+  'archive_log_max_entries': 1000000,
   'attr.log_color': {},
+  'compact_log': False,
   'deduplicate_log': True,
+  'follow_tor_log': False,
+  'log_queue_overflow': 'drop_oldest',
+  'log_queue_sample_rate': 10,
+  'log_queue_size': 10000,
   'logged_events': 'NOTICE,WARN,ERR,NYX_NOTICE,NYX_WARNING,NYX_ERROR',
   'logging_filter': [],
   'max_log_size': 1000,
   'prepopulate_log': True,
   'prepopulate_read_limit': 5000,
+  'write_logs_compress': False,
+  'write_logs_max_size': 0,
   'write_logs_to': '',
 }, conf_handler)
 
@@ -54,13 +72,9 @@ EVENT_ALIASES = {
 }
 
 UPDATE_RATE = 0.7
-
-# The height of the drawn content is estimated based on the last time we redrew
-# the panel. It's chiefly used for scrolling and the bar indicating its
-# position. Letting the estimate be too inaccurate results in a display bug, so
-# redraws the display if it's off by this threshold.
-
-CONTENT_HEIGHT_REDRAW_THRESHOLD = 3
+FOLLOWED_EVENTS = ('DEBUG', 'INFO')  # runlevels read from tor's log file when following it
+STATS_TOP_SHOWN = 20  # most frequent messages shown with our log statistics
+ARCHIVE_FLUSH_RATE = 2  # maximum seconds before archiving the events we receive
 
 # Log buffer so we start collecting stem/nyx events when imported. This is used
 # to make our LogPanel when curses initializes.
@@ -93,10 +107,23 @@ class LogPanel(nyx.panel.DaemonPanel):
       logged_events = ['NOTICE', 'WARN', 'ERR', 'NYX_NOTICE', 'NYX_WARNING', 'NYX_ERROR']
       log.warn("Your --log argument had the following events tor doesn't recognize: %s" % ', '.join(invalid_events))
 
-    self._event_log = nyx.log.LogGroup(CONFIG['max_log_size'])
+    self._event_log = nyx.log.LogGroup(CONFIG['max_log_size'], CONFIG['compact_log'])
     self._event_log_paused = None
-    self._event_types = nyx.log.listen_for_events(self._register_tor_event, logged_events)
-    self._log_file = nyx.log.LogFileOutput(CONFIG['write_logs_to'])
+    self._event_view = nyx.log.LogView()  # entries we display
+    self._event_queue = nyx.log.LogQueue(CONFIG['log_queue_size'], CONFIG['log_queue_overflow'], CONFIG['log_queue_sample_rate'])
+    self._follower = None
+
+    if CONFIG['follow_tor_log']:
+      log_location = nyx.log.log_file_path(tor_controller())
+
+      if log_location:
+        self._follower = nyx.log.TorLogFollower(log_location, self._register_followed_event)
+      else:
+        log.notice("Tor isn't logging to a file, so we'll receive its events over the control port instead")
+
+    self._event_types = self._listen_for_events(logged_events)
+    self._log_file = nyx.log.LogFileOutput(CONFIG['write_logs_to'], CONFIG['write_logs_max_size'] * 1024 * 1024, CONFIG['write_logs_compress'])
+    self._archive = None
     self._filter = nyx.log.LogFilters(initial_filters = CONFIG['logging_filter'])
     self._show_duplicates = not CONFIG['deduplicate_log']
 
@@ -104,23 +131,34 @@ class LogPanel(nyx.panel.DaemonPanel):
     self._has_new_event = False
     self._last_day = nyx.log.day_count(time.time())
 
+    self._prepopulated = None  # entries read from tor's log file, if reading it
+    self._export = None  # snapshot we're saving, if any
+
+    if CONFIG['archive_log']:
+      archive_path = nyx.data_directory('log_archive.sqlite')
+
+      if archive_path:
+        self._archive = nyx.log.LogArchive(archive_path, CONFIG['archive_log_max_entries'], CONFIG['archive_log_max_age'])
+
     # fetches past tor events from log file, if available
 
     if CONFIG['prepopulate_log']:
       log_location = nyx.log.log_file_path(tor_controller())
 
       if log_location:
-        try:
-          for entry in reversed(list(nyx.log.read_tor_log(log_location, CONFIG['prepopulate_read_limit']))):
-            if entry.type in self._event_types:
-              self._event_log.add(entry)
-        except IOError as exc:
-          log.info('Unable to read log located at %s: %s' % (log_location, exc))
-        except ValueError as exc:
-          log.info(str(exc))
+        self._prepopulated = 0
+        prepopulate_thread = threading.Thread(target = self._prepopulate, args = (log_location,))
+        prepopulate_thread.setDaemon(True)
+        prepopulate_thread.start()
 
     self._last_content_height = len(self._event_log)  # height of the rendered content when last drawn
 
+    # tor events are queued by stem's event thread, and registered by ours
+
+    self._event_thread = threading.Thread(target = self._process_events)
+    self._event_thread.setDaemon(True)
+    self._event_thread.start()
+
     # merge NYX_LOGGER into us, and listen for its future events
 
     for event in NYX_LOGGER:
@@ -128,6 +166,68 @@ class LogPanel(nyx.panel.DaemonPanel):
 
     NYX_LOGGER.emit = self._register_nyx_event
 
+  def _prepopulate(self, log_location):
+    """
+    Reads past tor events from its log file, merging them with those we've
+    received since starting. This is done in the background so large logs
+    don't delay our startup.
+    """
+
+    entries = []
+
+    try:
+      end = self._follower.offset if self._follower else None  # the follower provides what comes after this
+
+      for entry in nyx.log.read_tor_log(log_location, CONFIG['prepopulate_read_limit'], end):
+        if entry.type in self._event_types:
+          entries.append(entry)
+
+        self._prepopulated += 1
+
+        if self._prepopulated % 1000 == 0:
+          self._has_new_event = True  # redraw to show our progress
+    except IOError as exc:
+      log.info('Unable to read log located at %s: %s' % (log_location, exc))
+    except ValueError as exc:
+      log.info(str(exc))
+    except Exception as exc:
+      log.warn('Unable to prepopulate our log from %s: %s' % (log_location, exc))
+    finally:
+      entries.reverse()  # merge whatever we've read so far
+      self._event_log.merge(entries)
+      self._prepopulated = None
+      self._has_new_event = True
+
+  def _listen_for_events(self, event_types):
+    """
+    Listens for these event types. If we're following tor's log file then its
+    DEBUG and INFO events are read from there rather than the control port.
+
+    :returns: **list** of event types we're now listening to
+    """
+
+    if not self._follower:
+      return nyx.log.listen_for_events(self._register_tor_event, event_types)
+
+    followed = [event_type for event_type in event_types if event_type in FOLLOWED_EVENTS]
+    listening = nyx.log.listen_for_events(self._register_tor_event, [event_type for event_type in event_types if event_type not in FOLLOWED_EVENTS])
+
+    return sorted(listening + followed)
+
+  def _process_events(self):
+    """
+    Registers the tor events we've queued until our queue is closed.
+    """
+
+    while True:
+      entries = self._event_queue.get()
+
+      if not entries:
+        break
+
+      for entry in entries:
+        self._register_event(entry)
+
   def _show_filter_prompt(self):
     """
     Prompts the user to add a new regex filter.
@@ -138,6 +238,30 @@ class LogPanel(nyx.panel.DaemonPanel):
     if regex_input:
       self._filter.select(regex_input)
 
+  def _show_search_prompt(self):
+    """
+    Prompts the user for a search of our log archive, and presents its results.
+    """
+
+    query = input_prompt('Search log archive: ')
+
+    if query:
+      try:
+        results = self._archive.search(query)
+      except ValueError as exc:
+        show_message(str(exc), HIGHLIGHT, max_wait = 2)
+        return
+
+      nyx.popups.show_log_search(query, results, CONFIG['attr.log_color'])
+
+  def _show_stats(self):
+    """
+    Presents the rates of our runlevels and our most frequent messages.
+    """
+
+    stats = self._event_log.stats()
+    nyx.popups.show_log_stats(stats.rates(), stats.top(STATS_TOP_SHOWN), stats.total, CONFIG['attr.log_color'])
+
   def _show_event_selection_prompt(self):
     """
     Prompts the user to select the events being listened for.
@@ -146,21 +270,25 @@ class LogPanel(nyx.panel.DaemonPanel):
     event_types = nyx.popups.select_event_types(self._event_types)
 
     if event_types and event_types != self._event_types:
-      self._event_types = nyx.log.listen_for_events(self._register_tor_event, event_types)
+      self._event_types = self._listen_for_events(event_types)
       self.redraw()
 
-  def _show_snapshot_prompt(self):
+  def _show_snapshot_prompt(self, from_archive = False):
     """
     Lets user enter a path to take a snapshot, canceling if left blank.
     """
 
-    path_input = input_prompt('Path to save log snapshot: ')
+    if self._export:
+      show_message('Already saving a snapshot to %s' % self._export.path, HIGHLIGHT, max_wait = 2)
+      return
+
+    path_input = input_prompt('Path to save log %s: ' % ('archive' if from_archive else 'snapshot'))
 
     if path_input:
       try:
-        self.save_snapshot(path_input)
-        show_message('Saved: %s' % path_input, HIGHLIGHT, max_wait = 2)
-      except IOError as exc:
+        self.save_snapshot(path_input, from_archive)
+        show_message('Saving: %s' % path_input, HIGHLIGHT, max_wait = 2)
+      except (IOError, ValueError) as exc:
         show_message('Unable to save snapshot: %s' % exc, HIGHLIGHT, max_wait = 2)
 
   def _clear(self):
@@ -168,41 +296,42 @@ class LogPanel(nyx.panel.DaemonPanel):
     Clears the contents of the event log.
     """
 
-    self._event_log = nyx.log.LogGroup(CONFIG['max_log_size'])
+    self._event_log = nyx.log.LogGroup(CONFIG['max_log_size'], CONFIG['compact_log'])
     self.redraw()
 
-  def save_snapshot(self, path):
+  def save_snapshot(self, path, from_archive = False):
     """
-    Saves the log events currently being displayed to the given path. This
-    takes filers into account. This overwrites the file if it already exists.
+    Saves the log events currently being displayed to the given path, or those
+    of our archive. This takes filters into account, and overwrites the file if
+    it already exists. Events are written in the background, with our progress
+    shown in our title. Paths ending with '.jsonl' are written as JSON Lines,
+    and those ending with '.gz' are compressed.
 
     :param str path: path where to save the log snapshot
+    :param bool from_archive: saves our archive rather than the events we're
+      displaying
 
-    :raises: **IOError** if unsuccessful
-    """
+    :returns: :class:`~nyx.log.LogExport` writing the snapshot
 
-    path = os.path.abspath(os.path.expanduser(path))
-
-    # make dir if the path doesn't already exist
+    :raises:
+      * **IOError** if unable to write to the path
+      * **ValueError** if unable to read our archive
+    """
 
-    base_dir = os.path.dirname(path)
+    event_filter = self._filter.clone()
 
-    try:
-      if not os.path.exists(base_dir):
-        os.makedirs(base_dir)
-    except OSError as exc:
-      raise IOError("unable to make directory '%s'" % base_dir)
+    if from_archive:
+      if not self._archive:
+        raise ValueError('Log archiving is disabled')
 
-    event_log = list(self._event_log)
-    event_filter = self._filter.clone()
+      total, entries = self._archive.entries()
+      self._export = nyx.log.LogExport(path, entries, total, event_filter)
+    else:
+      event_log = self._event_log_paused if nyx_interface().is_paused() else self._event_log
+      self._export = nyx.log.LogExport(path, event_log.stream(), len(event_log), event_filter, self._show_duplicates)
 
-    with open(path, 'w') as snapshot_file:
-      try:
-        for entry in reversed(event_log):
-          if event_filter.match(entry.display_message):
-            snapshot_file.write(entry.display_message + '\n')
-      except Exception as exc:
-        raise IOError("unable to write to '%s': %s" % (path, exc))
+    self.redraw()
+    return self._export
 
   def set_paused(self, is_pause):
     if is_pause:
@@ -240,14 +369,21 @@ class LogPanel(nyx.panel.DaemonPanel):
       if key_press.match('c'):
         self._clear()
 
-    return (
+    key_handlers = [
       nyx.panel.KeyHandler('arrows', 'scroll up and down', _scroll, key_func = lambda key: key.is_scroll()),
       nyx.panel.KeyHandler('a', 'save snapshot of the log', self._show_snapshot_prompt),
       nyx.panel.KeyHandler('e', 'change logged events', self._show_event_selection_prompt),
       nyx.panel.KeyHandler('f', 'log regex filter', _pick_filter, 'enabled' if self._filter.selection() else 'disabled'),
       nyx.panel.KeyHandler('u', 'duplicate log entries', _toggle_deduplication, 'visible' if self._show_duplicates else 'hidden'),
       nyx.panel.KeyHandler('c', 'clear event log', _clear_log),
-    )
+      nyx.panel.KeyHandler('t', 'log statistics', self._show_stats),
+    ]
+
+    if self._archive:
+      key_handlers.append(nyx.panel.KeyHandler('/', 'search log archive', self._show_search_prompt))
+      key_handlers.append(nyx.panel.KeyHandler('x', 'save log archive', functools.partial(self._show_snapshot_prompt, True)))
+
+    return tuple(key_handlers)
 
   def submenu(self):
     """
@@ -255,6 +391,9 @@ class LogPanel(nyx.panel.DaemonPanel):
 
       Events...
       Snapshot...
+      Archive Snapshot... (if archiving)
+      Search... (if archiving)
+      Statistics...
       Clear
       Show / Hide Duplicates
       Filter (Submenu)
@@ -266,6 +405,9 @@ class LogPanel(nyx.panel.DaemonPanel):
     return Submenu('Log', [
       MenuItem('Events...', self._show_event_selection_prompt),
       MenuItem('Snapshot...', self._show_snapshot_prompt),
+      MenuItem('Archive Snapshot...', functools.partial(self._show_snapshot_prompt, True)) if self._archive else [],
+      MenuItem('Search...', self._show_search_prompt) if self._archive else [],
+      MenuItem('Statistics...', self._show_stats),
       MenuItem('Clear', self._clear),
       MenuItem(duplicates_label, functools.partial(setattr, self, '_show_duplicates'), duplicates_arg),
       Submenu('Filter', [
@@ -275,56 +417,63 @@ class LogPanel(nyx.panel.DaemonPanel):
       ]),
     ])
 
-  def _draw(self, subwindow, is_correction = False):
-    scroll = self._scroller.location(self._last_content_height, subwindow.height - 1)
+  def stop(self):
+    """
+    Halts our updates, registers the events we've queued, and writes out log
+    messages we've buffered or a snapshot we're saving.
+    """
+
+    nyx.panel.DaemonPanel.stop(self)
+
+    if self._export:
+      self._export.join()
+
+    if self._follower:
+      self._follower.stop()
 
+    self._event_queue.close()
+    self._event_thread.join()
+    self._log_file.close()
+
+    if self._archive:
+      self._archive.flush()
+
+  def _draw(self, subwindow):
     event_filter = self._filter.clone()
     event_types = list(self._event_types)
-    last_content_height = self._last_content_height
     show_duplicates = self._show_duplicates
+    page_height = subwindow.height - 1
 
     event_log = self._event_log_paused if nyx_interface().is_paused() else self._event_log
-    event_log = list(filter(lambda entry: event_filter.match(entry.display_message), event_log))
-    event_log = list(filter(lambda entry: not entry.is_duplicate or show_duplicates, event_log))
 
-    is_scrollbar_visible = last_content_height > subwindow.height - 1
+    # Entries are narrower when we have a scrollbar, so we keep it (or its
+    # absence) unless the height of our content no longer warrants that.
 
-    if is_scrollbar_visible:
-      subwindow.scrollbar(1, scroll, last_content_height)
+    is_scrollbar_visible = self._last_content_height > page_height
+    event_layout = _layout(self._event_view, event_log, event_filter, show_duplicates, subwindow.width, 2 if is_scrollbar_visible else 0)
+    content_height = sum([height for _, _, height, _ in event_layout])
 
-    x, y = 2 if is_scrollbar_visible else 0, 1 - scroll
-    y = _draw_entries(subwindow, x, y, event_log, show_duplicates)
+    if (content_height > page_height) != is_scrollbar_visible:
+      is_scrollbar_visible = not is_scrollbar_visible
+      event_layout = _layout(self._event_view, event_log, event_filter, show_duplicates, subwindow.width, 2 if is_scrollbar_visible else 0)
+      content_height = sum([height for _, _, height, _ in event_layout])
 
-    # drawing the title after the content, so we'll clear content from the top line
+    scroll = self._scroller.location(content_height, page_height)
 
-    _draw_title(subwindow, event_types, event_filter)
+    if is_scrollbar_visible:
+      subwindow.scrollbar(1, scroll, content_height)
 
-    # redraw the display if...
-    # - last_content_height was off by too much
-    # - we're off the bottom of the page
+    x, y = 2 if is_scrollbar_visible else 0, 1 - scroll
+    _draw_entries(subwindow, x, y, self._event_view, event_layout, show_duplicates)
 
-    new_content_height = y + scroll - 1
-    content_height_delta = abs(last_content_height - new_content_height)
-    force_redraw, force_redraw_reason = True, ''
+    # drawing the title after the content, so we'll clear content from the top line
 
-    if content_height_delta >= CONTENT_HEIGHT_REDRAW_THRESHOLD:
-      force_redraw_reason = 'estimate was off by %i' % content_height_delta
-    elif new_content_height > subwindow.height and scroll + subwindow.height - 1 > new_content_height:
-      force_redraw_reason = 'scrolled off the bottom of the page'
-    elif not is_scrollbar_visible and new_content_height > subwindow.height - 1:
-      force_redraw_reason = "scroll bar wasn't previously visible"
-    elif is_scrollbar_visible and new_content_height <= subwindow.height - 1:
-      force_redraw_reason = "scroll bar shouldn't be visible"
-    else:
-      force_redraw = False
+    export = self._export
+    _draw_title(subwindow, event_types, event_filter, self._prepopulated, len(self._event_queue), self._event_queue.dropped, export.progress() if export else None)
 
-    self._last_content_height = new_content_height
+    self._last_content_height = content_height
     self._has_new_event = False
 
-    if force_redraw and not is_correction:
-      log.debug('redrawing the log panel with the corrected content height (%s)' % force_redraw_reason)
-      self._draw(subwindow, True)
-
   def _update(self):
     """
     Redraws the display, coalescing updates if events are rapidly logged (for
@@ -334,7 +483,21 @@ class LogPanel(nyx.panel.DaemonPanel):
 
     current_day = nyx.log.day_count(time.time())
 
-    if self._has_new_event or self._last_day != current_day:
+    if self._archive:
+      self._archive.flush(ARCHIVE_FLUSH_RATE)
+      self._archive.prune()
+
+    export = self._export
+
+    if export and export.is_done:
+      if export.error:
+        log.warn('Unable to save log snapshot: %s' % export.error)
+      else:
+        log.notice('Saved %i log entries to %s' % (export.written, export.path))
+
+      self._export = None
+
+    if self._has_new_event or self._last_day != current_day or export:
       self._last_day = current_day
       self.redraw()
 
@@ -346,7 +509,11 @@ class LogPanel(nyx.panel.DaemonPanel):
     elif isinstance(event, stem.response.events.LogEvent):
       msg = event.message
 
-    self._register_event(nyx.log.LogEntry(event.arrived_at, event.type, msg))
+    self._event_queue.put(nyx.log.LogEntry(event.arrived_at, event.type, msg))
+
+  def _register_followed_event(self, entry):
+    if entry.type in FOLLOWED_EVENTS:
+      self._event_queue.put(entry)  # others arrive over the control port
 
   def _register_nyx_event(self, record):
     self._register_event(nyx.log.LogEntry(int(record.created), 'NYX_%s' % record.levelname, record.msg))
@@ -358,15 +525,20 @@ class LogPanel(nyx.panel.DaemonPanel):
     self._event_log.add(event)
     self._log_file.write(event.display_message)
 
+    if self._archive:
+      self._archive.add(event)
+
     # notifies the display that it has new content
 
-    if self._filter.match(event.display_message):
+    if self._filter.match_entry(event):
       self._has_new_event = True
 
 
-def _draw_title(subwindow, event_types, event_filter):
+def _draw_title(subwindow, event_types, event_filter, prepopulated = None, queued = 0, dropped = 0, saving = None):
   """
-  Panel title with the event types we're logging and our regex filter if set.
+  Panel title with the event types we're logging, our regex filter if set, our
+  progress reading tor's log file or saving a snapshot, and events we've yet to
+  register or dropped.
   """
 
   subwindow.addstr(0, 0, ' ' * subwindow.width)  # clear line
@@ -375,38 +547,94 @@ def _draw_title(subwindow, event_types, event_filter):
   if event_filter.selection():
     title_comp.append('filter: %s' % event_filter.selection())
 
+  if prepopulated is not None:
+    title_comp.append('reading log: %i/%i' % (prepopulated, CONFIG['prepopulate_read_limit']))
+
+  if saving is not None:
+    title_comp.append('saving snapshot: %i%%' % (saving * 100))
+
+  if queued:
+    title_comp.append('queued: %i' % queued)
+
+  if dropped:
+    title_comp.append('dropped: %i' % dropped)
+
   title_comp_str = join(title_comp, ', ', subwindow.width - 10)
   title = 'Events (%s):' % title_comp_str if title_comp_str else 'Events:'
 
   subwindow.addstr(0, 0, title, HIGHLIGHT)
 
 
-def _draw_entries(subwindow, x, y, event_log, show_duplicates):
+def _layout(event_view, event_log, event_filter, show_duplicates, width, x):
   """
-  Presents a list of log entries, grouped by the day they appeared.
+  Positions and heights of the log entries we'd draw, grouped by the day they
+  appeared.
+
+  :returns: **list** of (start, end, height, is_boxed) tuples for each day,
+    newest to oldest, with the height including the box around prior days
   """
 
-  day_to_entries, today = {}, nyx.log.day_count(time.time())
+  today = nyx.log.day_count(time.time())
 
-  for entry in event_log:
-    day_to_entries.setdefault(entry.day_count(), []).append(entry)
+  def entry_height(entry):
+    entry_width = width if entry.day_count() == today else width - 1
+    return _entry_height(entry, x + 1, entry_width, show_duplicates)
 
-  for day in sorted(day_to_entries.keys(), reverse = True):
-    if day == today:
-      for entry in day_to_entries[day]:
-        y = _draw_entry(subwindow, x + 1, y, subwindow.width, entry, show_duplicates)
-    else:
-      original_y, y = y, y + 1
+  height_key = (width, x, today)
+  event_layout = []
 
-      for entry in day_to_entries[day]:
-        y = _draw_entry(subwindow, x + 1, y, subwindow.width - 1, entry, show_duplicates)
+  for day, start, end, height in event_view.layout(event_log, event_filter, show_duplicates, height_key, entry_height):
+    is_boxed = day != today
 
-      subwindow.box(x, original_y, subwindow.width - x, y - original_y + 1, YELLOW, BOLD)
-      time_label = time.strftime(' %B %d, %Y ', time.localtime(day_to_entries[day][0].timestamp))
-      subwindow.addstr(x + 2, original_y, time_label, YELLOW, BOLD)
+    if is_boxed and height:
+      height += 2
+
+    event_layout.append((start, end, height, is_boxed))
+
+  return event_layout
+
+
+def _draw_entries(subwindow, x, y, event_view, event_layout, show_duplicates):
+  """
+  Presents the log entries that are on screen, grouped by the day they
+  appeared.
+
+  :param nyx.log.LogView event_view: entries we're presenting
+  :param list event_layout: days of entries as provided by :func:`_layout`
+  """
+
+  for start, end, height, is_boxed in event_layout:
+    if not height:
+      continue  # all of this day's entries are hidden duplicates
+    elif y + height <= 0:
+      y += height  # day is above the panel
+      continue
+    elif y >= subwindow.height:
+      break  # day is below the panel
 
+    original_y = y
+    width = subwindow.width - 1 if is_boxed else subwindow.width
+
+    if is_boxed:
       y += 1
 
+    position, skipped_height = event_view.seek(start, end, max(0, -y))
+    y += skipped_height
+
+    while position > start and y < subwindow.height:
+      position -= 1
+      entry = event_view.entry(position)
+
+      if show_duplicates or not entry.is_duplicate:
+        y = _draw_entry(subwindow, x + 1, y, width, entry, show_duplicates)
+
+    if is_boxed:
+      subwindow.box(x, original_y, subwindow.width - x, height, YELLOW, BOLD)
+      time_label = time.strftime(' %B %d, %Y ', time.localtime(event_view.entry(end - 1).timestamp))
+      subwindow.addstr(x + 2, original_y, time_label, YELLOW, BOLD)
+
+    y = original_y + height
+
   return y
 
 
@@ -415,17 +643,63 @@ def _draw_entry(subwindow, x, y, width, entry, show_duplicates):
   Presents an individual log entry with line wrapping.
   """
 
+  entry_lines = _entry_lines(entry, x, width, show_duplicates)
+
+  for line_x, line_y, msg, attr in entry_lines:
+    subwindow.addstr(line_x, y + line_y, msg, *attr)
+
+  return y + (entry_lines[-1][1] + 1 if entry_lines else 1)
+
+
+def _entry_height(entry, x, width, show_duplicates):
+  """
+  Number of lines we draw an entry with.
+  """
+
+  lines = entry.display_message.splitlines()
+
+  if len(lines) == 1 and len(lines[0]) <= width - x and not _duplicate_label(entry, show_duplicates):
+    return 1  # fits on a single line, the usual case
+
+  entry_lines = _entry_lines(entry, x, width, show_duplicates)
+  return entry_lines[-1][1] + 1 if entry_lines else 1
+
+
+def _entry_lines(entry, x, width, show_duplicates):
+  """
+  Wraps an entry into the (x, y, msg, attr) of each string we draw, with y
+  being relative to the entry's first line.
+  """
+
   color = CONFIG['attr.log_color'].get(entry.type, WHITE)
   boldness = BOLD if entry.type in ('ERR', 'ERROR') else NORMAL  # emphasize ERROR messages
-  min_x = x + 2
+  duplicate_label = _duplicate_label(entry, show_duplicates)
+  min_x, y, entry_lines = x + 2, 0, []
 
-  for line in entry.display_message.splitlines():
-    x, y = subwindow.addstr_wrap(x, y, line, width, min_x, boldness, color)
+  messages = [(line, (boldness, color)) for line in entry.display_message.splitlines()]
 
-  if entry.duplicates and len(entry.duplicates) != 1 and not show_duplicates:
-    duplicate_count = len(entry.duplicates) - 1
-    plural = 's' if duplicate_count > 1 else ''
-    duplicate_msg = ' [%i duplicate%s hidden]' % (duplicate_count, plural)
-    x, y = subwindow.addstr_wrap(x, y, duplicate_msg, width, min_x, GREEN, BOLD)
+  if duplicate_label:
+    messages.append((duplicate_label, (GREEN, BOLD)))
+
+  for msg, attr in messages:
+    wrapped = nyx.curses.wrap(msg, width, x, min_x)
+
+    for line_y, (line_x, line) in enumerate(wrapped, y):
+      entry_lines.append((line_x, line_y, line, attr))
 
-  return y + 1
+    if wrapped:
+      x, y = wrapped[-1][0] + len(wrapped[-1][1]), y + len(wrapped) - 1
+
+  return entry_lines
+
+
+def _duplicate_label(entry, show_duplicates):
+  """
+  Notice of how many duplicates of this entry are hidden, **None** if not
+  applicable.
+  """
+
+  if entry.duplicates and entry.duplicates.count != 1 and not show_duplicates:
+    duplicate_count = entry.duplicates.count - 1
+    plural = 's' if duplicate_count > 1 else ''
+    return ' [%i duplicate%s hidden]' % (duplicate_count, plural)
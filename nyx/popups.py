@@ -9,7 +9,9 @@ Popup dialogs provided by our interface.
   show_help - keybindings provided by the current page
   show_about - basic information about our application
   show_counts - listing of counts with bar graphs
+  show_log_stats - rates of log runlevels and their most frequent messages
   show_descriptor - presents descriptors for a relay
+  show_log_search - presents log entries that match a search
 
   select_from_list - selects from a list of options
   select_sort_order - selects attributes by which to sort by
@@ -23,6 +25,7 @@ from __future__ import absolute_import
 import curses
 import math
 import operator
+import time
 
 import nyx
 import nyx.arguments
@@ -167,6 +170,66 @@ def show_counts(title, counts, fill_char = ' '):
     nyx.curses.key_input()
 
 
+def show_log_stats(rates, top, total, colors):
+  """
+  Provides a dialog with the rate of each log runlevel over several windows,
+  and our most frequent messages. Pressing any key closes the dialog.
+
+  :param dict rates: mapping of runlevels to their events per minute over
+    each of :data:`~nyx.log.STATS_WINDOWS`
+  :param list top: (runlevel, message, count, error) tuples of our most
+    frequent messages
+  :param int total: number of events that have been counted
+  :param dict colors: mapping of event types to their color
+  """
+
+  runlevel_order = nyx.log.TOR_RUNLEVELS + nyx.log.NYX_RUNLEVELS
+  runlevels = sorted(rates, key = lambda runlevel: (runlevel_order.index(runlevel) if runlevel in runlevel_order else len(runlevel_order), runlevel))
+  window_labels = [stem.util.str_tools.time_label(window) for window in nyx.log.STATS_WINDOWS]
+  top_y = len(runlevels) + 4
+
+  def _render_no_stats(subwindow):
+    subwindow.box()
+    subwindow.addstr(0, 0, 'Log Statistics:', HIGHLIGHT)
+    subwindow.addstr(2, 1, NO_STATS_MSG, CYAN, BOLD)
+
+  def _render(subwindow):
+    subwindow.box()
+    subwindow.addstr(0, 0, 'Log Statistics (events per minute):', HIGHLIGHT)
+
+    x = subwindow.addstr(2, 1, 'Runlevel'.ljust(12), BOLD)
+
+    for label in window_labels:
+      x = subwindow.addstr(x, 1, label.rjust(10), BOLD)
+
+    for y, runlevel in enumerate(runlevels, 2):
+      x = subwindow.addstr(2, y, runlevel.ljust(12), colors.get(runlevel, WHITE), BOLD)
+
+      for rate in rates[runlevel]:
+        x = subwindow.addstr(x, y, ('%0.1f' % rate).rjust(10))
+
+    subwindow.addstr(2, top_y - 1, 'Most Frequent:', BOLD)
+
+    for y, (runlevel, message, count, error) in enumerate(top, top_y):
+      if y >= subwindow.height - 3:
+        break
+
+      x = subwindow.addstr(2, y, ('%i%%' % (count * 100 // max(1, total))).rjust(4), GREEN, BOLD)
+      x = subwindow.addstr(x + 1, y, runlevel.ljust(12), colors.get(runlevel, WHITE), BOLD)
+      subwindow.addstr(x, y, message[:subwindow.width - x - 2])
+
+    subwindow.addstr(2, subwindow.height - 2, 'Press any key...')
+
+  with nyx.curses.CURSES_LOCK:
+    if not rates:
+      nyx.curses.draw(_render_no_stats, top = _top(), width = len(NO_STATS_MSG) + 4, height = 3)
+    else:
+      height = min(top_y + len(top) + 3, nyx.curses.screen_size().height - _top())
+      nyx.curses.draw(_render, top = _top(), width = 80, height = height)
+
+    nyx.curses.key_input()
+
+
 def show_descriptor(fingerprint, color, is_close_key):
   """
   Provides a dialog showing descriptors for a relay.
@@ -252,6 +315,60 @@ def show_descriptor(fingerprint, color, is_close_key):
         return key
 
 
+def show_log_search(query, entries, colors):
+  """
+  Presents log entries that match a search. Entries are read from the given
+  iterator as the user scrolls to them.
+
+  :param str query: search that was performed
+  :param iterator entries: **LogEntry** instances that match the search
+  :param dict colors: mapping of event types to their color
+  """
+
+  loaded, is_complete = [], [False]
+  scroller = nyx.curses.Scroller()
+  height = nyx.curses.screen_size().height - _top()
+
+  def _load(count):
+    while not is_complete[0] and len(loaded) < count:
+      try:
+        loaded.append(next(entries))
+      except StopIteration:
+        is_complete[0] = True
+
+  def _render(subwindow):
+    location = scroller.location()
+
+    for y, entry in enumerate(loaded[location:location + subwindow.height - 2], 1):
+      date = time.strftime('%Y-%m-%d ', time.localtime(entry.timestamp))
+      boldness = BOLD if entry.type in ('ERR', 'ERROR') else NORMAL
+      subwindow.addstr(2, y, (date + entry.display_message)[:subwindow.width - 4], colors.get(entry.type, WHITE), boldness)
+
+    subwindow.box()
+
+    if not loaded:
+      subwindow.addstr(2, 1, 'No results found, press any key...', YELLOW, BOLD)
+
+    result_count = '%i%s result%s' % (len(loaded), '' if is_complete[0] else '+', '' if len(loaded) == 1 else 's')
+    subwindow.addstr(0, 0, 'Log Search (%s): %s' % (query, result_count), HIGHLIGHT)
+
+  with nyx.curses.CURSES_LOCK:
+    _load(2 * height)
+    nyx.curses.draw(_render, top = _top(), height = height)
+
+    while True:
+      key = nyx.curses.key_input()
+
+      if not key.is_scroll():
+        return
+
+      _load(scroller.location() + 3 * height)  # read ahead of where we might scroll to
+
+      if scroller.handle_key(key, len(loaded), height - 2):
+        _load(scroller.location() + 2 * height)
+        nyx.curses.draw(_render, top = _top(), height = height)
+
+
 def _descriptor_text(fingerprint):
   """
   Provides the descriptors for a relay.
@@ -239,7 +239,8 @@ def _set_process_name():
 
 def _shutdown_daemons(controller):
   """
-  Stops and joins on worker threads.
+  Stops and joins on worker threads. Panels write out anything they've
+  buffered (such as our log file) as they stop.
   """
 
   halt_threads = [nyx.tracker.stop_trackers()]
@@ -17,7 +17,8 @@ Background tasks for gathering information about the tor process.
     |- ConnectionTracker - periodically checks the connections established by tor
     |  |- get_custom_resolver - provide the custom conntion resolver we're using
     |  |- set_custom_resolver - overwrites automatic resolver selecion with a custom resolver
-    |  +- get_value - provides our latest connection results
+    |  |- get_value - provides our latest connection results
+    |  +- get_counts - provides the number of connections by category
     |
     |- ResourceTracker - periodically checks the resource usage of tor
     |  +- get_value - provides our latest resource usage results
@@ -48,6 +49,14 @@ Background tasks for gathering information about the tor process.
   :var int memory_bytes: memory usage of the process in bytes
   :var float memory_percent: percentage of our memory used by this process
   :var float timestamp: unix timestamp for when this information was fetched
+
+.. data:: ConnectionCounts
+
+  Number of connections tor presently has by their category.
+
+  :var int inbound: connections to our ORPort or DirPort
+  :var int outbound: connections we've established to others
+  :var int control: connections to our ControlPort
 """
 
 import collections
@@ -103,6 +112,12 @@ Resources = collections.namedtuple('Resources', [
   'timestamp',
 ])
 
+ConnectionCounts = collections.namedtuple('ConnectionCounts', [
+  'inbound',
+  'outbound',
+  'control',
+])
+
 Process = collections.namedtuple('Process', [
   'pid',
   'name',
@@ -499,6 +514,12 @@ class ConnectionTracker(Daemon):
     self._connections = []
     self._start_times = {}  # connection => (unix_timestamp, is_legacy)
     self._custom_resolver = None
+
+    # Connection counts by category. These are adjusted as connections open
+    # and close so callers can check them without iterating over everything.
+
+    self._counts = ConnectionCounts(0, 0, 0)
+    self._counted_ports = None  # (inbound ports, control ports) our counts are based on
     self._is_first_run = True
 
     # Number of times in a row we've either failed with our current resolver or
@@ -558,8 +579,15 @@ class ConnectionTracker(Daemon):
         new_start_times[conn] = (conn_start_time, is_legacy)
         new_connections.append(Connection(conn_start_time, is_legacy, *conn))
 
+      # resolvers can list a connection more than once, so count each just once
+
+      opened = [conn for conn in new_start_times if conn not in self._start_times]
+      closed = set(self._start_times).difference(new_start_times)
+      counts = self._update_counts(opened, closed, new_start_times)
+
       self._connections = new_connections
       self._start_times = new_start_times
+      self._counts = counts
       self._is_first_run = False
 
       runtime = time.time() - start_time
@@ -604,6 +632,40 @@ class ConnectionTracker(Daemon):
 
       return False
 
+  def _update_counts(self, opened, closed, connections):
+    """
+    Adjusts our connection counts for the connections that have opened or
+    closed. If tor's ports have changed then we recount everything.
+
+    :param list opened: connections that are new since our last run
+    :param list closed: connections that have gone away since our last run
+    :param dict connections: all of our current connections
+
+    :returns: :data:`~nyx.tracker.ConnectionCounts` for our connections
+    """
+
+    controller = tor_controller()
+    inbound_ports = set(controller.get_ports(stem.control.Listener.OR, []))
+    inbound_ports.update(controller.get_ports(stem.control.Listener.DIR, []))
+    control_ports = set(controller.get_ports(stem.control.Listener.CONTROL, []))
+
+    if self._counted_ports != (inbound_ports, control_ports):
+      self._counted_ports = (inbound_ports, control_ports)
+      counts, opened, closed = dict.fromkeys(ConnectionCounts._fields, 0), connections, []
+    else:
+      counts = self._counts._asdict()
+
+    for conns, change in ((opened, 1), (closed, -1)):
+      for conn in conns:
+        if conn.local_port in inbound_ports:
+          counts['inbound'] += change
+        elif conn.local_port in control_ports:
+          counts['control'] += change
+        else:
+          counts['outbound'] += change
+
+    return ConnectionCounts(**counts)
+
   def get_custom_resolver(self):
     """
     Provides the custom resolver the user has selected. This is **None** if
@@ -637,6 +699,21 @@ class ConnectionTracker(Daemon):
     else:
       return list(self._connections)
 
+  def get_counts(self):
+    """
+    Provides the number of connections tor has by their category. Unlike
+    :func:`~nyx.tracker.ConnectionTracker.get_value` this is constant time, so
+    it's cheap to call frequently.
+
+    :returns: :data:`~nyx.tracker.ConnectionCounts` for our latest
+      connections, these are all zero if our tracker's been stopped
+    """
+
+    if self._halt:
+      return ConnectionCounts(0, 0, 0)
+    else:
+      return self._counts
+
 
 class ResourceTracker(Daemon):
   """
@@ -0,0 +1,414 @@
+#!/usr/bin/env python
+# Copyright 2020, Damian Johnson and The Tor Project
+# See LICENSE for licensing information
+
+"""
+Benchmarks for nyx's performance sensitive code. By default this runs all of
+them, or you can provide the names of those you want...
+
+  % python run_benchmarks.py log_group
+"""
+
+import collections
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import nyx
+
+BENCHMARKS = collections.OrderedDict()
+
+# Typical DEBUG messages of a relay. Some of these match our common log
+# messages, and others don't.
+
+DEBUG_MESSAGES = [
+  'connection_handle_write(): After TLS write of %i: 0 read, 586 written',
+  'flush_chunk_tls(): flushed %i bytes, 0 ready to flush, 0 remain.',
+  'conn_read_callback(): socket %i wants to read.',
+  'conn_write_callback(): socket %i wants to write.',
+  'connection_buf_read_from_socket(): %i: starting, inbuf_datalen 0 (0 pending in tls object). at_most 16448.',
+  'connection_or_process_cells_from_inbuf(): %i: starting, inbuf_datalen 514 (0 pending in tls object).',
+  'circuit_receive_relay_cell(): Passing on unrecognized cell.',
+  'append_cell_to_circuit_queue(): Made a circuit active.',
+  'relay_send_command_from_edge_(): delivering %i cell forward.',
+  'circuit_package_relay_cell(): encrypting a layer of the relay cell.',
+  'channel_tls_handle_cell(): Received a cell with command 3 on channel 0x55d (global ID %i)',
+  'update_channel_estimates(): estimated that channel 5 has %i queued cells',
+]
+
+
+def benchmark(func):
+  """
+  Registers a function as a benchmark. These print their own results.
+  """
+
+  BENCHMARKS[func.__name__] = func
+  return func
+
+
+def _in_terminal(func):
+  """
+  Runs a function with curses in a pseudo-terminal.
+
+  :param function func: function to run once curses has started, which
+    provides a json serializable result
+
+  :returns: **tuple** of the form (output_size, result) with the bytes written
+    to the terminal and the result of the function
+
+  :raises: **ImportError** if pseudo-terminals are unavailable
+  """
+
+  import json
+  import pty
+
+  import nyx.curses
+
+  read_fd, write_fd = os.pipe()
+  pid, pty_fd = pty.fork()
+
+  if pid == 0:
+    try:
+      os.close(read_fd)
+      os.environ.update({'TERM': 'xterm', 'LINES': '40', 'COLUMNS': '120'})
+      result = []
+
+      nyx.curses.start(lambda: result.append(func()), transparent_background = True, cursor = False)
+      os.write(write_fd, json.dumps(result[0]).encode('utf-8'))
+    finally:
+      os._exit(0)  # never return into our caller
+
+  os.close(write_fd)
+  output_size = 0
+
+  while True:
+    try:
+      output = os.read(pty_fd, 65536)
+    except OSError:
+      break  # child has exited
+
+    if not output:
+      break
+
+    output_size += len(output)
+
+  with os.fdopen(read_fd) as result_file:
+    result = json.loads(result_file.read())
+
+  os.waitpid(pid, 0)
+  return output_size, result
+
+
+def _rate(func, count):
+  """
+  Provides the number of times per second we can call the given function,
+  which is provided its iteration.
+  """
+
+  start_time = time.time()
+
+  for i in range(count):
+    func(i)
+
+  return count / max(0.000001, time.time() - start_time)
+
+
+@benchmark
+def log_group():
+  """
+  Log events per second we can sustain when the log is full, and each addition
+  evicts our oldest entry. Duplicates are all the same message.
+  """
+
+  from nyx.log import LogGroup, LogEntry
+
+  event_count = 100000
+
+  for max_size in (1000, 10000, 100000):
+    group = LogGroup(max_size)
+
+    for i in range(max_size):
+      group.add(LogEntry(i, 'DEBUG', 'initial message %i' % i))
+
+    for label, message in (('unique', 'new message %i'), ('duplicates', 'new message')):
+      messages = [message.replace('%i', str(i)) for i in range(event_count)]
+      rate = _rate(lambda i: group.add(LogEntry(max_size + i, 'DEBUG', messages[i])), event_count)
+
+      print('  max_log_size %-7i %-11s %10i events/sec' % (max_size, label, rate))
+
+
+@benchmark
+def dedup_key():
+  """
+  Deduplication keys per second we can determine for typical DEBUG messages.
+  """
+
+  from nyx.log import LogEntry
+
+  entries = [LogEntry(0, 'DEBUG', msg.replace('%i', '14')) for msg in DEBUG_MESSAGES]
+  rate = _rate(lambda i: entries[i % len(entries)]._message_dedup_key(), 500000)
+
+  print('  %i keys/sec' % rate)
+
+
+@benchmark
+def log_entry_memory():
+  """
+  Memory used by each entry of a full log, including its message. Entries are
+  first added to the log, then displayed.
+  """
+
+  try:
+    import tracemalloc
+  except ImportError:
+    print('  requires python 3.4 or later')
+    return
+
+  from nyx.log import LogGroup, LogEntry
+
+  entry_count = 100000
+
+  for compact in (False, True):
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    group = LogGroup(entry_count, compact)
+
+    for i in range(entry_count):
+      message = DEBUG_MESSAGES[i % len(DEBUG_MESSAGES)].replace('%i', str(i))
+      group.add(LogEntry(1333738410 + i, 'DEBUG', message))
+
+    added = (tracemalloc.get_traced_memory()[0] - baseline) / entry_count
+
+    for entry in group:
+      entry.display_message
+
+    displayed = (tracemalloc.get_traced_memory()[0] - baseline) / entry_count
+    tracemalloc.stop()
+
+    label = 'compact' if compact else 'default'
+    print('  %-8s %4i bytes/entry when added, %4i when displayed' % (label, added, displayed))
+
+
+@benchmark
+def tor_log():
+  """
+  Rate we read a 1 GB tor log, both for the newest 100k entries (as we do
+  when prepopulating the log panel) and all of it.
+  """
+
+  from nyx.log import read_tor_log
+
+  log_size = 1024 * 1024 * 1024
+  lines = []
+
+  for i in range(10000):
+    message = DEBUG_MESSAGES[i % len(DEBUG_MESSAGES)].replace('%i', str(i))
+    lines.append('Jul %02i %02i:%02i:%02i.%03i [debug] %s\n' % (1 + i // 1000, i // 3600 % 24, i // 60 % 60, i % 60, i % 1000, message))
+
+  block = ''.join(lines).encode('utf-8')
+  log_fd, log_path = tempfile.mkstemp()
+
+  try:
+    with os.fdopen(log_fd, 'wb') as log_file:
+      for i in range(log_size // len(block) + 1):
+        log_file.write(block)
+
+    for read_limit in (100000, None):
+      start_time, count = time.time(), 0
+
+      for entry in read_tor_log(log_path, read_limit):
+        count += 1
+
+      runtime = time.time() - start_time
+      label = 'newest %i' % read_limit if read_limit else 'whole log'
+      print('  %-13s %9i entries in %6.2fs (%i entries/sec)' % (label, count, runtime, count / runtime))
+  finally:
+    os.remove(log_path)
+
+
+@benchmark
+def log_panel_startup():
+  """
+  Time for the log panel to start, and for it to then finish prepopulating
+  from a tor log of 100k entries.
+  """
+
+  try:
+    from unittest.mock import Mock, patch
+  except ImportError:
+    from mock import Mock, patch
+
+  import nyx.panel.log
+
+  entry_count = 100000
+  log_fd, log_path = tempfile.mkstemp()
+
+  try:
+    with os.fdopen(log_fd, 'w') as log_file:
+      for i in range(entry_count):
+        message = DEBUG_MESSAGES[i % len(DEBUG_MESSAGES)].replace('%i', str(i))
+        log_file.write('Jul 15 %02i:%02i:%02i.%03i [debug] %s\n' % (i // 3600 % 24, i // 60 % 60, i % 60, i % 1000, message))
+
+    controller = Mock()
+    controller.get_info.return_value = 'DEBUG INFO NOTICE WARN ERR'
+
+    with patch.dict(nyx.panel.log.CONFIG, {'prepopulate_read_limit': entry_count, 'max_log_size': entry_count, 'logged_events': 'DEBUG'}):
+      with patch('nyx.tor_controller', Mock(return_value = controller)), patch('nyx.panel.log.tor_controller', Mock(return_value = controller)):
+        with patch('nyx.log.log_file_path', Mock(return_value = log_path)):
+          start_time = time.time()
+          panel = nyx.panel.log.LogPanel()
+          started = time.time() - start_time
+
+          while panel._prepopulated is not None:
+            time.sleep(0.01)
+
+          prepopulated = time.time() - start_time
+
+    print('  started in %0.3fs, prepopulated %i entries in %0.3fs' % (started, len(panel._event_log), prepopulated))
+  finally:
+    os.remove(log_path)
+
+
+@benchmark
+def log_export():
+  """
+  Rate we save a snapshot of a 500k entry log in each format, and the longest
+  we block additions to the log while doing so.
+  """
+
+  from nyx.log import LogGroup, LogEntry, LogExport
+
+  entry_count = 500000
+  group = LogGroup(entry_count)
+
+  for i in range(entry_count):
+    message = DEBUG_MESSAGES[i % len(DEBUG_MESSAGES)].replace('%i', str(i))
+    group.add(LogEntry(1333738410 + i, 'DEBUG', message))
+
+  tmp_dir = tempfile.mkdtemp()
+
+  try:
+    for filename in ('snapshot.log', 'snapshot.jsonl', 'snapshot.log.gz'):
+      start_time, longest_add = time.time(), 0
+      export = LogExport(os.path.join(tmp_dir, filename), group.stream(), len(group))
+
+      while not export.is_done:
+        add_start = time.time()
+        group.add(LogEntry(0, 'DEBUG', 'added while saving'))
+        longest_add = max(longest_add, time.time() - add_start)
+        time.sleep(0.001)
+
+      runtime = time.time() - start_time
+      print('  %-16s %7i entries/sec, longest addition %0.1f ms' % (filename, export.written / runtime, longest_add * 1000))
+  finally:
+    shutil.rmtree(tmp_dir)
+
+
+@benchmark
+def terminal_output():
+  """
+  Bytes we send to the terminal as content is redrawn, as this matters on slow
+  connections (such as ssh sessions with a relay). Each frame redraws all of
+  its content, but only part of it changes.
+  """
+
+  import nyx.curses
+
+  frame_count = 200
+
+  def _static_line(subwindow, y):
+    subwindow.addstr(0, y, DEBUG_MESSAGES[y % len(DEBUG_MESSAGES)].replace('%i', str(y)), nyx.curses.GREEN)
+
+  def _single_field(i, subwindow):
+    for y in range(subwindow.height):
+      _static_line(subwindow, y)
+
+    subwindow.addstr(0, 0, 'cpu: %i%%' % (i % 100), nyx.curses.BOLD)
+
+  def _scrolling_log(i, subwindow):
+    subwindow.addstr(0, 0, 'Events (DEBUG-ERR):', nyx.curses.HIGHLIGHT)
+
+    for y in range(1, subwindow.height):
+      subwindow.addstr(0, y, DEBUG_MESSAGES[(i - y) % len(DEBUG_MESSAGES)].replace('%i', str(i - y)))
+
+  scenarios = (
+    ('header field', _single_field, {'height': 5}),
+    ('full screen', _single_field, {}),
+    ('scrolling log', _scrolling_log, {'top': 5}),
+  )
+
+  for label, draw_func, draw_args in scenarios:
+    def _draw_frames():
+      for i in range(frame_count):
+        nyx.curses.draw(lambda subwindow: draw_func(i, subwindow), **draw_args)
+
+    try:
+      output_size, _ = _in_terminal(_draw_frames)
+    except ImportError:
+      print('  requires a pseudo-terminal')
+      return
+
+    per_frame = output_size / frame_count
+    print('  %-14s %6i bytes/frame, %7i bytes/sec at %i fps' % (label, per_frame, per_frame * nyx.curses.CONFIG['max_fps'], nyx.curses.CONFIG['max_fps']))
+
+
+@benchmark
+def curses_attr():
+  """
+  Text attributes per second we can encode for curses, and time to draw a
+  frame of log entries with several attributes on each line.
+  """
+
+  import nyx.curses
+
+  from nyx.curses import GREEN, YELLOW, WHITE, BOLD, HIGHLIGHT
+
+  frame_count = 500
+
+  def _draw_entries(subwindow):
+    for y in range(subwindow.height):
+      x = subwindow.addstr(0, y, '12:%02i:%02i ' % (y, y), WHITE)
+      x = subwindow.addstr(x, y, '[DEBUG] ', GREEN, BOLD)
+      x = subwindow.addstr(x, y, DEBUG_MESSAGES[y % len(DEBUG_MESSAGES)].replace('%i', str(y)), GREEN)
+      subwindow.addstr(x, y, ' [3 duplicates hidden]', YELLOW, BOLD)
+
+  def _measure():
+    attributes = ((WHITE,), (GREEN, BOLD), (YELLOW, BOLD), (HIGHLIGHT,))
+    rate = _rate(lambda i: nyx.curses.curses_attr(*attributes[i % len(attributes)]), 500000)
+
+    start_time = time.time()
+
+    for i in range(frame_count):
+      nyx.curses.draw(_draw_entries)
+
+    return rate, (time.time() - start_time) / frame_count
+
+  try:
+    _, (rate, frame_time) = _in_terminal(_measure)
+  except ImportError:
+    print('  requires a pseudo-terminal')
+    return
+
+  print('  %i encodings/sec, %0.2f ms/frame' % (rate, frame_time * 1000))
+
+
+@nyx.uses_settings
+def main():
+  names = sys.argv[1:] if len(sys.argv) > 1 else list(BENCHMARKS.keys())
+
+  for name in names:
+    if name not in BENCHMARKS:
+      print("'%s' isn't a benchmark, options are: %s" % (name, ', '.join(BENCHMARKS.keys())))
+      sys.exit(1)
+
+  for name in names:
+    print('%s:' % name)
+    BENCHMARKS[name]()
+    print('')
+
+
+if __name__ == '__main__':
+  main()
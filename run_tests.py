@@ -22,6 +22,7 @@ SRC_PATHS = [os.path.join(test.NYX_BASE, path) for path in (
   'nyx',
   'test',
   'run_tests.py',
+  'run_benchmarks.py',
   'setup.py',
   'run_nyx',
 )]
@@ -36,6 +36,7 @@ include LICENSE
 include MANIFEST.in
 include nyx.1
 include run_nyx
+include run_benchmarks.py
 include run_tests.py
 graft test
 graft web
@@ -0,0 +1,139 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from nyx.log import LogArchive, LogEntry
+
+try:
+  # added in python 3.3
+  from unittest.mock import patch
+except ImportError:
+  from mock import patch
+
+
+class TestLogArchive(unittest.TestCase):
+  def setUp(self):
+    self.tmp_dir = tempfile.mkdtemp()
+    self.path = os.path.join(self.tmp_dir, 'log_archive.sqlite')
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir)
+
+  def test_search(self):
+    archive = LogArchive(self.path)
+    archive.add(LogEntry(1333738410, 'NOTICE', 'Bootstrapped 72%: Loading relay descriptors.'))
+    archive.add(LogEntry(1333738420, 'WARN', 'Problem bootstrapping. Stuck at 72%: Loading relay descriptors.'))
+    archive.add(LogEntry(1333738430, 'NOTICE', 'Bootstrapped 100%: Done'))
+
+    self.assertEqual([1333738420, 1333738410], [entry.timestamp for entry in archive.search('relay descriptors')])
+    self.assertEqual(['Problem bootstrapping. Stuck at 72%: Loading relay descriptors.'], [entry.message for entry in archive.search('type:WARN')])
+    self.assertEqual([], list(archive.search('circuit')))
+
+    # entries persist
+
+    archive = LogArchive(self.path)
+    self.assertEqual(3, len(list(archive.search('type:NOTICE OR type:WARN'))))
+
+  def test_search_pages_results(self):
+    archive = LogArchive(self.path)
+
+    for i in range(25):
+      archive.add(LogEntry(1333738410 + i, 'INFO', 'circuit %i built' % i))
+
+    with patch('nyx.log.ARCHIVE_PAGE_SIZE', 10):
+      with patch.object(archive, '_search', wraps = archive._search) as search_mock:
+        results = archive.search('circuit')
+        self.assertEqual(1, search_mock.call_count)
+
+        self.assertEqual([1333738434, 1333738433], [next(results).timestamp for i in range(2)])
+        self.assertEqual(1, search_mock.call_count)
+
+        self.assertEqual(list(range(1333738432, 1333738409, -1)), [entry.timestamp for entry in results])
+        self.assertEqual(3, search_mock.call_count)
+
+  def test_entries(self):
+    archive = LogArchive(self.path)
+
+    for i in range(25):
+      archive.add(LogEntry(1333738410 + i, 'INFO', 'circuit %i built' % i))
+
+    with patch('nyx.log.ARCHIVE_PAGE_SIZE', 10):
+      count, entries = archive.entries()
+
+      self.assertEqual(25, count)
+      self.assertEqual(list(range(1333738410, 1333738435)), [entry.timestamp for entry in entries])
+
+  def test_malformed_search(self):
+    archive = LogArchive(self.path)
+    self.assertRaises(ValueError, archive.search, 'relay AND')
+
+  def test_retention(self):
+    archive = LogArchive(self.path, max_entries = 5)
+
+    for i in range(8):
+      archive.add(LogEntry(1333738410 + i, 'INFO', 'circuit %i built' % i))
+
+    archive.flush()
+    archive._prune()
+    self.assertEqual(list(range(1333738417, 1333738412, -1)), [entry.timestamp for entry in archive.search('circuit')])
+
+    archive = LogArchive(self.path, max_age = 1)
+    archive.add(LogEntry(int(time.time()), 'INFO', 'circuit 8 built'))
+    archive.flush()
+    archive._prune()
+    self.assertEqual(['circuit 8 built'], [entry.message for entry in archive.search('circuit')])
+
+  def test_retention_when_all_expired(self):
+    archive = LogArchive(self.path, max_age = 1)
+
+    for i in range(3):
+      archive.add(LogEntry(1333738410 + i, 'INFO', 'circuit %i built' % i))
+
+    archive.flush()
+    archive._prune()
+    self.assertEqual([], list(archive.search('circuit')))
+
+  def test_retention_across_pages(self):
+    archive = LogArchive(self.path, max_age = 1)
+    now = int(time.time())
+
+    for i in range(250):
+      archive.add(LogEntry(now - 2 * 86400 + i * 1000, 'INFO', 'circuit %i built' % i))
+
+    archive.flush()
+    archive._last_pruned = 0
+    archive.prune()
+
+    with patch('nyx.log.ARCHIVE_PAGE_SIZE', 10):
+      count, entries = archive.entries()
+
+      self.assertEqual(163, count)  # entries from the last 86400 seconds
+      self.assertEqual(['circuit %i built' % i for i in range(87, 250)], [entry.message for entry in entries])
+
+    # pruning is rate limited
+
+    archive.add(LogEntry(now - 2 * 86400, 'INFO', 'expired circuit'))
+    archive.flush()
+    archive.prune()
+
+    self.assertEqual(['expired circuit'], [entry.message for entry in archive.search('expired')])
+
+  def test_batches_writes(self):
+    archive = LogArchive(self.path)
+
+    with patch('nyx.log.ARCHIVE_BATCH_SIZE', 3):
+      archive.add(LogEntry(1333738410, 'INFO', 'circuit 1 built'))
+      archive.add(LogEntry(1333738420, 'INFO', 'circuit 2 built'))
+      self.assertEqual(0, len(list(LogArchive(self.path).search('circuit'))))
+
+      archive.add(LogEntry(1333738430, 'INFO', 'circuit 3 built'))
+      self.assertEqual(3, len(list(LogArchive(self.path).search('circuit'))))
+
+    archive.add(LogEntry(1333738440, 'INFO', 'circuit 4 built'))
+    archive.flush(max_wait = 60)
+    self.assertEqual(3, len(list(LogArchive(self.path).search('circuit'))))
+
+    archive.flush()
+    self.assertEqual(4, len(list(LogArchive(self.path).search('circuit'))))
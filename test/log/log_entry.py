@@ -27,3 +27,59 @@ class TestLogEntry(unittest.TestCase):
 
     entry = LogEntry(1333738434, 'NOTICE', 'Bootstrapped 72%: Loading relay descriptors.')
     self.assertEqual('NOTICE:*Loading relay descriptors.', entry.dedup_key)
+
+  def test_dedup_matcher_order(self):
+    # when several common messages match we use the first listed
+
+    matcher = nyx.log._DedupMatcher(['conn_read', '*pending in tls', 'conn_read_callback(): socket', 'conn'])
+    self.assertEqual('conn_read', matcher.match('conn_read_callback(): socket 14 (0 pending in tls object)'))
+    self.assertEqual('*pending in tls', matcher.match('conn_write_callback(): socket 14 (0 pending in tls object)'))
+    self.assertEqual('conn', matcher.match('conn_write_callback(): socket 14 wants to write.'))
+    self.assertEqual(None, matcher.match('circuit_receive_relay_cell(): Passing on unrecognized cell.'))
+    self.assertEqual(None, matcher.match('con'))
+
+    self.assertEqual(None, nyx.log._DedupMatcher([]).match('conn_read_callback(): socket 14'))
+
+  def test_lazy_attributes(self):
+    entry = LogEntry(1333738434, 'INFO', 'tor_lockfile_lock(): Locking "/home/atagar/.tor/lock"')
+    self.assertEqual(None, entry._display_message)
+    self.assertEqual(None, entry._dedup_key)
+
+    display_message = entry.display_message
+    self.assertTrue(display_message.endswith('[INFO] tor_lockfile_lock(): Locking "/home/atagar/.tor/lock"'))
+    self.assertTrue(display_message is entry.display_message)
+
+    # clones retain what we've already formatted
+
+    self.assertTrue(display_message is entry.clone().display_message)
+    self.assertRaises(AttributeError, setattr, entry, 'unexpected_attribute', True)
+
+  def test_compact(self):
+    message = 'channel_tls_handle_cell(): Received a cell with command 3 on channel 0x55d (global ID 1123) from 5C3A4D9E2A2F8B6E4D1C0B9A8F7E6D5C4B3A2918'
+    entry = LogEntry(1333738434, 'DEBUG', message)
+    display_message = entry.display_message
+
+    entry.compact()
+    self.assertEqual(message, entry.message)
+    self.assertEqual(display_message, entry.display_message)
+    self.assertEqual(entry.message, entry.clone().message)
+
+    # messages with the same template share it
+
+    other_entry = LogEntry(1333738434, 'DEBUG', message.replace('1123', '5812'))
+    other_entry.compact()
+    self.assertTrue(entry._template is other_entry._template)
+    self.assertNotEqual(entry.dedup_key, other_entry.dedup_key)
+
+    # compacting messages that lack parameters, or with common messages
+
+    for message in ('Tor has successfully opened a circuit.', 'Bootstrapped 72%: Loading relay descriptors.', ''):
+      entry = LogEntry(1333738434, 'NOTICE', message)
+      dedup_key = entry.dedup_key
+
+      entry = LogEntry(1333738434, 'NOTICE', message)
+      entry.compact()
+      self.assertEqual(message, entry.message)
+
+      if message.startswith('Bootstrapped'):
+        self.assertEqual(dedup_key, entry.dedup_key)
@@ -0,0 +1,74 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from nyx.log import LogGroup, LogEntry, LogExport, LogFilters
+
+try:
+  # added in python 3.3
+  from unittest.mock import patch
+except ImportError:
+  from mock import patch
+
+
+class TestLogExport(unittest.TestCase):
+  def setUp(self):
+    self.tmp_dir = tempfile.mkdtemp()
+
+    self.group = LogGroup(10)
+    self.group.add(LogEntry(1333738410, 'NOTICE', 'Bootstrapped 72%: Loading relay descriptors.'))
+    self.group.add(LogEntry(1333738420, 'WARN', 'Problem bootstrapping. Stuck at 72%: Loading relay descriptors.'))
+    self.group.add(LogEntry(1333738430, 'NOTICE', 'Bootstrapped 75%: Loading relay descriptors.'))
+    self.group.add(LogEntry(1333738440, 'NOTICE', 'Bootstrapped 100%: Done'))
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir)
+
+  def _export(self, filename, *args, **kwargs):
+    export = LogExport(os.path.join(self.tmp_dir, filename), self.group.stream(), len(self.group), *args, **kwargs)
+    export.join()
+
+    self.assertTrue(export.is_done)
+    self.assertEqual(None, export.error)
+    self.assertEqual(1.0, export.progress())
+
+    return export
+
+  def test_text(self):
+    log_filter = LogFilters()
+    log_filter.select('Bootstrapped')
+
+    export = self._export('nested/snapshot.log', log_filter)
+    self.assertEqual(3, export.written)
+
+    with open(export.path) as snapshot_file:
+      self.assertEqual([entry.display_message for entry in reversed(list(self.group)) if entry.type == 'NOTICE'], snapshot_file.read().splitlines())
+
+  def test_jsonl(self):
+    export = self._export('snapshot.jsonl', show_duplicates = False)
+
+    with open(export.path) as snapshot_file:
+      entries = [json.loads(line) for line in snapshot_file]
+
+    self.assertEqual([
+      {'timestamp': 1333738420, 'runlevel': 'WARN', 'message': 'Problem bootstrapping. Stuck at 72%: Loading relay descriptors.', 'duplicates': 0},
+      {'timestamp': 1333738430, 'runlevel': 'NOTICE', 'message': 'Bootstrapped 75%: Loading relay descriptors.', 'duplicates': 1},
+      {'timestamp': 1333738440, 'runlevel': 'NOTICE', 'message': 'Bootstrapped 100%: Done', 'duplicates': 0},
+    ], entries)
+
+  @patch('nyx.log.EXPORT_BATCH_SIZE', 2)
+  def test_gzip(self):
+    export = self._export('snapshot.jsonl.gz')
+    self.assertEqual(4, export.written)
+
+    with gzip.open(export.path, 'rb') as snapshot_file:
+      self.assertEqual([1333738410, 1333738420, 1333738430, 1333738440], [json.loads(line)['timestamp'] for line in snapshot_file.read().decode('utf-8').splitlines()])
+
+  def test_unwritable_path(self):
+    dir_path = os.path.join(self.tmp_dir, 'directory')
+    os.mkdir(dir_path)
+
+    self.assertRaises(IOError, LogExport, dir_path, self.group.stream())
@@ -0,0 +1,107 @@
+import gzip
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from nyx.log import LogFileOutput
+
+try:
+  # added in python 3.3
+  from unittest.mock import patch
+except ImportError:
+  from mock import patch
+
+
+class TestLogFileOutput(unittest.TestCase):
+  def setUp(self):
+    self.tmp_dir = tempfile.mkdtemp()
+    self.path = os.path.join(self.tmp_dir, 'nyx.log')
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir)
+
+  def _contents(self, path = None):
+    with open(path if path else self.path) as log_file:
+      return log_file.read()
+
+  def test_close_writes_messages(self):
+    output = LogFileOutput(self.path)
+    output.write('Bootstrapped 72%: Loading relay descriptors.')
+    output.write('Bootstrapped 100%: Done')
+    output.close()
+
+    self.assertEqual('Bootstrapped 72%: Loading relay descriptors.\nBootstrapped 100%: Done\n', self._contents())
+
+    output.write('written after we closed')
+    self.assertEqual('Bootstrapped 72%: Loading relay descriptors.\nBootstrapped 100%: Done\n', self._contents())
+
+  @patch('nyx.log.LOG_FILE_BATCH_SIZE', 3)
+  @patch('nyx.log.LOG_FILE_FLUSH_RATE', 10)
+  def test_writes_in_batches(self):
+    output = LogFileOutput(self.path)
+
+    for i in range(2):
+      output.write('message %i' % i)
+
+    time.sleep(0.05)
+    self.assertEqual('', self._contents())
+
+    output.write('message 2')
+    time.sleep(0.05)
+    self.assertEqual('message 0\nmessage 1\nmessage 2\n', self._contents())
+
+    output.close()
+
+  @patch('nyx.log.LOG_FILE_FLUSH_RATE', 0.01)
+  def test_periodically_writes(self):
+    output = LogFileOutput(self.path)
+    output.write('message')
+    time.sleep(0.05)
+
+    self.assertEqual('message\n', self._contents())
+    output.close()
+
+  @patch('nyx.log.LOG_FILE_QUEUE_SIZE', 5)
+  @patch('nyx.log.LOG_FILE_FLUSH_RATE', 10)
+  def test_drops_messages_when_full(self):
+    output = LogFileOutput(self.path)
+
+    for i in range(8):
+      output.write('message %i' % i)
+
+    self.assertEqual(3, output.dropped)
+    output.close()
+
+    self.assertEqual(''.join(['message %i\n' % i for i in range(5)]), self._contents())
+
+  @patch('nyx.log.LOG_FILE_BACKUPS', 2)
+  @patch('nyx.log.LOG_FILE_BATCH_SIZE', 1)
+  def test_rotation(self):
+    for compress in (False, True):
+      output = LogFileOutput(self.path, max_size = 10, compress = compress)
+
+      for i in range(4):
+        output.write('message %i' % i)
+        time.sleep(0.05)
+
+      output.close()
+
+      if compress:
+        def contents(path):
+          with gzip.open(path, 'rt') as log_file:
+            return log_file.read()
+
+        self.assertEqual(['nyx.log', 'nyx.log.1.gz', 'nyx.log.2.gz'], sorted(os.listdir(self.tmp_dir)))
+        self.assertEqual('message 3\n', contents(self.path + '.1.gz'))
+        self.assertEqual('message 2\n', contents(self.path + '.2.gz'))
+      else:
+        self.assertEqual(['nyx.log', 'nyx.log.1', 'nyx.log.2'], sorted(os.listdir(self.tmp_dir)))
+        self.assertEqual('message 3\n', self._contents(self.path + '.1'))
+        self.assertEqual('message 2\n', self._contents(self.path + '.2'))
+
+      self.assertEqual('', self._contents())
+
+      for name in os.listdir(self.tmp_dir):
+        os.remove(os.path.join(self.tmp_dir, name))
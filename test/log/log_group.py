@@ -45,6 +45,49 @@ class TestLogGroup(unittest.TestCase):
     self.assertEqual([1333738570, 1333738560, 1333738550, 1333738540, 1333738530], [e.timestamp for e in group])
     self.assertEqual(5, len(group))
 
+  def test_stream(self):
+    group = LogGroup(5)
+
+    for i in range(5):
+      group.add(LogEntry(1333738410 + i, 'INFO', 'message %i' % i))
+
+    entries = group.stream(batch_size = 2)
+    self.assertEqual([1333738410, 1333738411], [next(entries).timestamp for i in range(2)])
+
+    # additions are skipped, as are entries evicted before we reach them
+
+    group.add(LogEntry(1333738415, 'INFO', 'message 5'))
+    group.add(LogEntry(1333738416, 'INFO', 'message 6'))
+    group.add(LogEntry(1333738417, 'INFO', 'message 7'))
+
+    self.assertEqual([1333738413, 1333738414], [entry.timestamp for entry in entries])
+
+    # merges change the position of entries, so we can't continue
+
+    entries = group.stream(batch_size = 2)
+    next(entries)
+
+    group.merge([LogEntry(1333738400, 'INFO', 'older message')])
+    self.assertRaises(ValueError, list, entries)
+
+  def test_merge(self):
+    group = LogGroup(5)
+    group.add(LogEntry(1333738430, 'NOTICE', 'Bootstrapped 72%: Loading relay descriptors.'))
+    group.add(LogEntry(1333738450, 'INFO', 'New control connection opened from 127.0.0.1.'))
+
+    group.merge([
+      LogEntry(1333738410, 'INFO', 'New control connection opened from 127.0.0.1.'),
+      LogEntry(1333738420, 'NOTICE', 'Bootstrapped 45%: Asking for relay descriptors.'),
+      LogEntry(1333738440, 'NOTICE', 'Bootstrapped 75%: Loading relay descriptors.'),
+      LogEntry(1333738445, 'NOTICE', 'Bootstrapped 78%: Loading relay descriptors.'),
+    ])
+
+    # interleaved by timestamp, with the oldest dropped so we fit our size
+
+    self.assertEqual([1333738450, 1333738445, 1333738440, 1333738430, 1333738420], [entry.timestamp for entry in group])
+    self.assertEqual([False, False, True, True, False], [entry.is_duplicate for entry in group])
+    self.assertEqual(3, list(group)[1].duplicates.count)
+
   def test_deduplication(self):
     group = LogGroup(5)
     group.add(LogEntry(1333738410, 'NOTICE', 'Bootstrapped 72%: Loading relay descriptors.'))
@@ -62,7 +105,7 @@ class TestLogGroup(unittest.TestCase):
     ]
 
     group_items = list(group)
-    self.assertEqual(bootstrap_messages, [e.message for e in group_items[0].duplicates])
+    self.assertEqual(bootstrap_messages, [e.message for e in group_items[0].duplicates.recent])
     self.assertEqual([False, True, False, True, True], [e.is_duplicate for e in group_items])
 
     # add another duplicate message that pops the last
@@ -77,7 +120,7 @@ class TestLogGroup(unittest.TestCase):
     ]
 
     group_items = list(group)
-    self.assertEqual(bootstrap_messages, [e.message for e in group_items[0].duplicates])
+    self.assertEqual(bootstrap_messages, [e.message for e in group_items[0].duplicates.recent])
     self.assertEqual([False, True, True, False, True], [e.is_duplicate for e in group_items])
 
     # add another non-duplicate message that pops the last
@@ -92,9 +135,47 @@ class TestLogGroup(unittest.TestCase):
 
     group_items = list(group)
     self.assertEqual(None, group_items[0].duplicates)
-    self.assertEqual(bootstrap_messages, [e.message for e in group_items[1].duplicates])
+    self.assertEqual(bootstrap_messages, [e.message for e in group_items[1].duplicates.recent])
     self.assertEqual([False, False, True, True, False], [e.is_duplicate for e in group_items])
 
+  def test_duplicate_group_is_bounded(self):
+    group = LogGroup(50)
+
+    for i in range(30):
+      group.add(LogEntry(1333738410 + i, 'NOTICE', 'Bootstrapped %i%%: Loading relay descriptors.' % i))
+
+    duplicates = list(group)[0].duplicates
+    self.assertEqual(30, duplicates.count)
+    self.assertEqual(1333738410, duplicates.first_timestamp)
+    self.assertEqual(1333738439, duplicates.last_timestamp)
+    self.assertEqual(nyx.log.RECENT_DUPLICATES, len(duplicates.recent))
+    self.assertEqual(1333738439, duplicates.recent[0].timestamp)
+
+    # evicting our oldest entries shrinks the group
+
+    for i in range(25):
+      group.add(LogEntry(1333738500 + i, 'INFO', 'unique message %i' % i))
+
+    self.assertEqual(25, duplicates.count)
+    self.assertEqual(1333738415, duplicates.first_timestamp)
+    self.assertEqual(1333738439, duplicates.last_timestamp)
+    self.assertEqual(nyx.log.RECENT_DUPLICATES, len(duplicates.recent))
+
+    for i in range(20):
+      group.add(LogEntry(1333738600 + i, 'INFO', 'another unique message %i' % i))
+
+    self.assertEqual(5, duplicates.count)
+    self.assertEqual(1333738435, duplicates.first_timestamp)
+    self.assertEqual([1333738439, 1333738438, 1333738437, 1333738436, 1333738435], [e.timestamp for e in duplicates.recent])
+
+    # clones have their own group
+
+    clone_items = list(group.clone())
+    self.assertEqual(5, clone_items[45].duplicates.count)
+    self.assertEqual(1333738435, clone_items[45].duplicates.first_timestamp)
+    self.assertTrue(clone_items[45].duplicates is not duplicates)
+    self.assertTrue(clone_items[45].duplicates is clone_items[49].duplicates)
+
   def test_deduplication_with_daybreaks(self):
     nyx.log.GROUP_BY_DAY = True
     group = LogGroup(100)
@@ -128,12 +209,12 @@ class TestLogGroup(unittest.TestCase):
     # First day
 
     self.assertEqual('New control connection opened from 127.0.0.1.', group_items[0].message)
-    self.assertEqual(5, len(group_items[0].duplicates))
+    self.assertEqual(5, group_items[0].duplicates.count)
     self.assertFalse(group_items[0].is_duplicate)
 
     for entry in group_items[1:5]:
       self.assertEqual('New control connection opened from 127.0.0.1.', entry.message)
-      self.assertEqual(5, len(entry.duplicates))
+      self.assertEqual(5, entry.duplicates.count)
       self.assertTrue(entry.is_duplicate)
 
     self.assertEqual("Heartbeat: Tor's uptime is 18:00 hours, with 0 circuits open. I've sent 862 kB and received 9.05 MB.", group_items[5].message)
@@ -143,13 +224,35 @@ class TestLogGroup(unittest.TestCase):
     # Second day
 
     self.assertEqual("Heartbeat: Tor's uptime is 12:00 hours, with 1 circuits open. I've sent 794 kB and received 7.32 MB.", group_items[6].message)
-    self.assertEqual(2, len(group_items[6].duplicates))
+    self.assertEqual(2, group_items[6].duplicates.count)
     self.assertFalse(group_items[6].is_duplicate)
 
     self.assertEqual('New control connection opened from 127.0.0.1.', group_items[8].message)
-    self.assertEqual(4, len(group_items[8].duplicates))
+    self.assertEqual(4, group_items[8].duplicates.count)
     self.assertTrue(group_items[8].is_duplicate)
 
     self.assertEqual("Heartbeat: Tor's uptime is 6:00 hours, with 0 circuits open. I've sent 539 kB and received 4.25 MB.", group_items[10].message)
-    self.assertEqual(2, len(group_items[10].duplicates))
+    self.assertEqual(2, group_items[10].duplicates.count)
     self.assertTrue(group_items[10].is_duplicate)
+
+  def test_compact(self):
+    group = LogGroup(5, compact = True)
+
+    group.add(LogEntry(1333738410, 'INFO', 'tor_lockfile_lock(): Locking "/home/atagar/.tor/lock"'))
+    group.add(LogEntry(1333738420, 'NOTICE', 'Bootstrapped 72%: Loading relay descriptors.'))
+    group.add(LogEntry(1333738430, 'DEBUG', 'conn_write_callback(): socket 14 wants to write.'))
+    group.add(LogEntry(1333738440, 'DEBUG', 'conn_write_callback(): socket 14 wants to write.'))
+    group.add(LogEntry(1333738450, 'NOTICE', 'Bootstrapped 75%: Loading relay descriptors.'))
+
+    self.assertEqual([
+      'Bootstrapped 75%: Loading relay descriptors.',
+      'conn_write_callback(): socket 14 wants to write.',
+      'conn_write_callback(): socket 14 wants to write.',
+      'Bootstrapped 72%: Loading relay descriptors.',
+      'tor_lockfile_lock(): Locking "/home/atagar/.tor/lock"',
+    ], [e.message for e in group])
+
+    self.assertEqual([False, False, True, True, False], [e.is_duplicate for e in group])
+    self.assertEqual(2, list(group)[0].duplicates.count)
+    self.assertEqual(2, list(group)[1].duplicates.count)
+    self.assertEqual(['Bootstrapped 75%: Loading relay descriptors.'], [e.message for e in group.clone()][:1])
@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+
+from nyx.log import Overflow, LogQueue, LogEntry
+
+
+def entry(msg):
+  return LogEntry(1333738410, 'DEBUG', msg)
+
+
+class TestLogQueue(unittest.TestCase):
+  def test_get(self):
+    queue = LogQueue(10)
+    queue.put(entry('conn_read_callback(): socket 14 wants to read.'))
+    queue.put(entry('conn_write_callback(): socket 14 wants to write.'))
+
+    self.assertEqual(2, len(queue))
+    self.assertEqual(['conn_read_callback(): socket 14 wants to read.', 'conn_write_callback(): socket 14 wants to write.'], [e.message for e in queue.get()])
+    self.assertEqual(0, len(queue))
+
+    # entries are discarded once we're closed
+
+    queue.close()
+    queue.put(entry('circuit_receive_relay_cell(): Passing on unrecognized cell.'))
+
+    self.assertEqual([], queue.get())
+    self.assertEqual(1, queue.dropped)
+
+  def test_drop_oldest(self):
+    queue = LogQueue(3, Overflow.DROP_OLDEST)
+
+    for i in range(5):
+      queue.put(entry('message %i' % i))
+
+    self.assertEqual(2, queue.dropped)
+    self.assertEqual(['message 2', 'message 3', 'message 4'], [e.message for e in queue.get()])
+
+  def test_sample(self):
+    queue = LogQueue(3, Overflow.SAMPLE, 4)
+
+    for i in range(3):
+      queue.put(entry('initial message %i' % i))
+
+    # while full we keep one of every four entries with each dedup key
+
+    for i in range(8):
+      queue.put(entry('conn_read_callback(): socket %i wants to read.' % i))
+
+    queue.put(entry('append_cell_to_circuit_queue(): Made a circuit active.'))
+
+    self.assertEqual(9, queue.dropped)
+    self.assertEqual([
+      'conn_read_callback(): socket 0 wants to read.',
+      'conn_read_callback(): socket 4 wants to read.',
+      'append_cell_to_circuit_queue(): Made a circuit active.',
+    ], [e.message for e in queue.get()])
+
+  def test_block(self):
+    queue = LogQueue(2, Overflow.BLOCK)
+    queue.put(entry('message 0'))
+    queue.put(entry('message 1'))
+
+    put_thread = threading.Thread(target = queue.put, args = (entry('message 2'),))
+    put_thread.start()
+    time.sleep(0.05)
+
+    self.assertTrue(put_thread.is_alive())
+    self.assertEqual(['message 0', 'message 1'], [e.message for e in queue.get()])
+
+    put_thread.join()
+    self.assertEqual(['message 2'], [e.message for e in queue.get()])
+    self.assertEqual(0, queue.dropped)
+
+  def test_close_releases_waiters(self):
+    queue = LogQueue(1, Overflow.BLOCK)
+    queue.put(entry('message 0'))
+
+    put_thread = threading.Thread(target = queue.put, args = (entry('message 1'),))
+    put_thread.start()
+
+    queue.close()
+    put_thread.join()
+
+    self.assertEqual(['message 0'], [e.message for e in queue.get()])
+    self.assertEqual([], queue.get())
+    self.assertEqual(1, queue.dropped)
@@ -0,0 +1,90 @@
+import unittest
+
+from nyx.log import LogGroup, LogEntry, LogStats
+
+try:
+  # added in python 3.3
+  from unittest.mock import patch
+except ImportError:
+  from mock import patch
+
+NOW = 1333738410
+
+
+class TestLogStats(unittest.TestCase):
+  @patch('time.time', lambda: NOW - 3600)
+  def test_rates(self):
+    stats = LogStats()
+
+    # an event per second for the last hour, and some notices a few minutes ago
+
+    for i in range(3600):
+      stats.add(LogEntry(NOW - 3600 + i, 'DEBUG', 'conn_read_callback(): socket %i wants to read.' % i))
+
+      if 3100 <= i < 3130:
+        stats.add(LogEntry(NOW - 3600 + i, 'NOTICE', 'Bootstrapped 100%: Done'))
+
+    rates = stats.rates(NOW)
+
+    self.assertEqual([60.0, 60.0, 60.0], [round(rate) for rate in rates['DEBUG']])
+    self.assertEqual([0.0, 3.1, 0.5], [round(rate, 1) for rate in rates['NOTICE']])
+    self.assertEqual(3630, stats.total)
+
+    # counts roll out of our windows as time passes
+
+    rates = stats.rates(NOW + 1800)
+    self.assertEqual([0.0, 0.0, 30.0], [round(rate) for rate in rates['DEBUG']])
+    self.assertEqual([0.0, 0.0, 0.5], [round(rate, 1) for rate in rates['NOTICE']])
+
+    self.assertEqual({}, stats.rates(NOW + 7200))
+
+  def test_rates_before_a_full_window(self):
+    with patch('time.time', lambda: NOW - 120):
+      stats = LogStats()
+
+    for i in range(120):
+      stats.add(LogEntry(NOW - 120 + i, 'INFO', 'message %i' % i))
+
+    self.assertEqual([60.0, 60.0, 60.0], [round(rate) for rate in stats.rates(NOW)['INFO']])
+
+  @patch('nyx.log.STATS_TOP_SIZE', 3)
+  def test_top(self):
+    stats = LogStats()
+
+    for i in range(10):
+      stats.add(LogEntry(0, 'DEBUG', 'conn_read_callback(): socket %i wants to read.' % i))
+
+    for i in range(5):
+      stats.add(LogEntry(0, 'NOTICE', 'Bootstrapped 100%: Done'))
+
+    stats.add(LogEntry(0, 'WARN', 'first warning'))
+    stats.add(LogEntry(0, 'WARN', 'second warning'))  # takes the place of the first
+
+    self.assertEqual([
+      ('DEBUG', 'conn_read_callback(): socket', 10, 0),
+      ('NOTICE', 'Bootstrapped 100%: Done', 5, 0),
+      ('WARN', 'second warning', 2, 1),
+    ], stats.top(5))
+
+    self.assertEqual([('DEBUG', 'conn_read_callback(): socket', 10, 0)], stats.top(1))
+
+  def test_top_with_templates(self):
+    stats = LogStats()
+
+    for i in range(3):
+      entry = LogEntry(0, 'INFO', 'circuit %i has %i streams' % (i, i * 2))
+      entry.compact()
+      stats.add(entry)
+
+    self.assertEqual([('INFO', 'circuit * has * streams', 3, 0)], stats.top(5))
+
+  def test_log_group_stats(self):
+    group = LogGroup(100)
+    group.add(LogEntry(NOW, 'NOTICE', 'Bootstrapped 100%: Done'))
+
+    # older entries we merge aren't part of our rates
+
+    group.merge([LogEntry(NOW - 60, 'NOTICE', 'Bootstrapped 72%: Loading relay descriptors.')])
+
+    self.assertEqual(1, group.stats().total)
+    self.assertEqual(['NOTICE'], list(group.stats().rates().keys()))
@@ -0,0 +1,195 @@
+import re
+import unittest
+
+import nyx.log
+
+from nyx.log import LogGroup, LogEntry, LogFilters, LogView
+
+try:
+  # added in python 3.3
+  from unittest.mock import patch
+except ImportError:
+  from mock import patch
+
+RE_COMPILE = re.compile
+
+
+class CountingRegex(object):
+  """
+  Compiled regex that counts its searches.
+  """
+
+  def __init__(self, regex):
+    self.searches = 0
+    self._regex = RE_COMPILE(regex)
+
+  def search(self, message):
+    self.searches += 1
+    return self._regex.search(message)
+
+
+class TestLogView(unittest.TestCase):
+  def setUp(self):
+    nyx.log.GROUP_BY_DAY = False
+
+  def tearDown(self):
+    nyx.log.GROUP_BY_DAY = True
+
+  def test_filtering(self):
+    group, view, log_filter = LogGroup(5), LogView(), LogFilters()
+
+    group.add(LogEntry(1333738410, 'INFO', 'tor_lockfile_lock(): Locking "/home/atagar/.tor/lock"'))
+    group.add(LogEntry(1333738420, 'NOTICE', 'Bootstrapped 72%: Loading relay descriptors.'))
+    group.add(LogEntry(1333738430, 'NOTICE', 'Bootstrapped 75%: Loading relay descriptors.'))
+
+    self.assertEqual([1333738430, 1333738420, 1333738410], [e.timestamp for e in view.entries(group, log_filter, True)])
+    self.assertEqual([1333738430, 1333738410], [e.timestamp for e in view.entries(group, log_filter, False)])
+
+    log_filter.select('Bootstrapped')
+    self.assertEqual([1333738430, 1333738420], [e.timestamp for e in view.entries(group, log_filter, True)])
+
+    # new entries are filtered as they arrive, and evicted ones are dropped
+
+    group.add(LogEntry(1333738440, 'NOTICE', 'Bootstrapped 78%: Loading relay descriptors.'))
+    group.add(LogEntry(1333738450, 'INFO', 'tor_lockfile_lock(): Locking "/home/atagar/.tor/lock"'))
+    group.add(LogEntry(1333738460, 'NOTICE', 'Bootstrapped 80%: Loading relay descriptors.'))
+
+    self.assertEqual([1333738460, 1333738440, 1333738430, 1333738420], [e.timestamp for e in view.entries(group, log_filter, True)])
+
+    group.add(LogEntry(1333738470, 'INFO', 'New control connection opened from 127.0.0.1.'))
+    group.add(LogEntry(1333738480, 'INFO', 'New control connection opened from 127.0.0.1.'))
+    group.add(LogEntry(1333738490, 'INFO', 'New control connection opened from 127.0.0.1.'))
+
+    self.assertEqual([1333738460], [e.timestamp for e in view.entries(group, log_filter, True)])
+
+    # entries that become duplicates are no longer shown
+
+    group.add(LogEntry(1333738500, 'NOTICE', 'Bootstrapped 85%: Loading relay descriptors.'))
+    self.assertEqual([1333738500], [e.timestamp for e in view.entries(group, log_filter, False)])
+
+  def test_only_filters_new_entries(self):
+    group, view, log_filter = LogGroup(100), LogView(), LogFilters()
+
+    with patch('re.compile', CountingRegex):
+      log_filter.select('wants to read')
+      log_filter.select('socket')
+
+    def searches():
+      return sum([regex.searches for regex, _ in log_filter._past_filters.values()])
+
+    for i in range(10):
+      group.add(LogEntry(1333738410 + i, 'DEBUG', 'conn_read_callback(): socket %i wants to read.' % i))
+
+    # each entry is checked against both of our filters once
+
+    self.assertEqual(10, len(list(view.entries(group, log_filter, True))))
+    self.assertEqual(20, searches())
+
+    group.add(LogEntry(1333738420, 'DEBUG', 'conn_write_callback(): socket 10 wants to write.'))
+    self.assertEqual(11, len(list(view.entries(group, log_filter, True))))
+    self.assertEqual(22, searches())
+
+    # changing our selection, or the log group, doesn't match them again
+
+    log_filter.select('wants to read')
+    self.assertEqual(10, len(list(view.entries(group, log_filter, True))))
+    self.assertEqual(10, len(list(view.entries(group.clone(), log_filter, True))))
+    self.assertEqual(22, searches())
+
+  def test_retains_recent_filters(self):
+    group, view, log_filter = LogGroup(100), LogView(), LogFilters(['socket'])
+
+    for i in range(10):
+      group.add(LogEntry(1333738410 + i, 'DEBUG', 'conn_read_callback(): socket %i wants to read.' % i))
+
+    self.assertEqual(10, len(list(view.entries(group, log_filter, True))))
+
+    log_filter.select('socket')
+    self.assertEqual(10, len(list(view.entries(group, log_filter, True))))
+
+    # switching back to a prior filter only considers new entries
+
+    group.add(LogEntry(1333738420, 'NOTICE', 'Bootstrapped 100%: Done'))
+    log_filter.select(None)
+
+    with patch.object(log_filter, 'match_entry', wraps = log_filter.match_entry) as match_mock:
+      self.assertEqual(11, len(list(view.entries(group, log_filter, True))))
+      self.assertEqual(1, match_mock.call_count)
+
+  def test_days(self):
+    group, view, log_filter = LogGroup(6), LogView(), LogFilters()
+    first_day = nyx.log.day_count(1333738410)
+
+    for timestamp in (1333738410, 1333738420, 1333738410 + 86400, 1333738410 + 2 * 86400, 1333738420 + 2 * 86400):
+      group.add(LogEntry(timestamp, 'INFO', 'message at %i' % timestamp))
+
+    days = [(day - first_day, [e.timestamp for e in entries]) for day, entries in view.days(group, log_filter, True)]
+
+    self.assertEqual([
+      (2, [1333738420 + 2 * 86400, 1333738410 + 2 * 86400]),
+      (1, [1333738410 + 86400]),
+      (0, [1333738420, 1333738410]),
+    ], days)
+
+    # evicting a day's entries drops it, and new entries go to the current day
+
+    for timestamp in (1333738430 + 2 * 86400, 1333738440 + 2 * 86400, 1333738450 + 2 * 86400):
+      group.add(LogEntry(timestamp, 'INFO', 'message at %i' % timestamp))
+
+    days = [(day - first_day, len(list(entries))) for day, entries in view.days(group, log_filter, True)]
+    self.assertEqual([(2, 5), (1, 1)], days)
+
+  def test_layout(self):
+    group, view, log_filter = LogGroup(100), LogView(), LogFilters()
+    measured = []
+
+    def height_func(entry):
+      measured.append(entry.timestamp)
+      return entry.timestamp % 3 + 1
+
+    for i in range(600):
+      group.add(LogEntry(1333738410 + i, 'INFO', 'message %i' % i))
+
+    layout = view.layout(group, log_filter, False, 80, height_func)
+    heights = [i % 3 + 1 for i in range(1333738410 + 500, 1333738410 + 600)]
+
+    self.assertEqual([(nyx.log.day_count(1333738410), 0, 100, sum(heights))], layout)
+    self.assertEqual(100, len(measured))
+
+    # entries within a number of lines, counting back from the newest
+
+    self.assertEqual((97, sum(heights[-3:])), view.seek(0, 100, sum(heights[-3:]) + 1))
+    self.assertEqual('message 597', view.entry(97).message)
+
+    # heights are cached until their key changes
+
+    view.layout(group, log_filter, False, 80, height_func)
+    self.assertEqual(100, len(measured))
+
+    view.layout(group, log_filter, False, 100, height_func)
+    self.assertEqual(200, len(measured))
+
+    # entries hidden as duplicates no longer take any space
+
+    group.add(LogEntry(1333738410 + 600, 'INFO', 'message 599'))
+    layout = view.layout(group, log_filter, False, 100, height_func)
+
+    self.assertEqual([(nyx.log.day_count(1333738410), 1, 101, sum(heights[1:-1]) + (1333738410 + 600) % 3 + 1)], layout)
+
+  def test_layout_when_duplicates_are_evicted(self):
+    group, view, log_filter = LogGroup(4), LogView(), LogFilters()
+
+    def height_func(entry):
+      return entry.duplicates.count if entry.duplicates else 1
+
+    for i in range(3):
+      group.add(LogEntry(1333738410 + i, 'NOTICE', 'Bootstrapped %i%%: Loading relay descriptors.' % (70 + i)))
+
+    group.add(LogEntry(1333738413, 'INFO', 'New control connection opened from 127.0.0.1.'))
+    self.assertEqual(4, view.layout(group, log_filter, False, 80, height_func)[0][3])
+
+    # dropping the oldest duplicate changes the height of the one we show
+
+    group.add(LogEntry(1333738414, 'INFO', 'Circuit built.'))
+    self.assertEqual(2, list(group)[2].duplicates.count)
+    self.assertEqual(4, view.layout(group, log_filter, False, 80, height_func)[0][3])
@@ -3,6 +3,12 @@ import unittest
 
 from nyx.log import read_tor_log
 
+try:
+  # added in python 3.3
+  from unittest.mock import patch
+except ImportError:
+  from mock import patch
+
 
 def data_path(filename):
   return os.path.join(os.path.dirname(__file__), 'data', filename)
@@ -30,6 +36,12 @@ class TestReadTorLog(unittest.TestCase):
     self.assertEqual('Interrupt: exiting cleanly.', entries[0].message)
     self.assertEqual('Bootstrapped 90%: Establishing a Tor circuit', entries[-1].message)
 
+  def test_with_small_chunks(self):
+    expected = [(entry.timestamp, entry.type, entry.message) for entry in read_tor_log(data_path('tor_log'))]
+
+    with patch('nyx.log.TOR_LOG_CHUNK_SIZE', 10):
+      self.assertEqual(expected, [(entry.timestamp, entry.type, entry.message) for entry in read_tor_log(data_path('tor_log'))])
+
   def test_with_empty_file(self):
     entries = list(read_tor_log(data_path('empty_file')))
     self.assertEqual(0, len(entries))
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from nyx.log import TorLogFollower, read_tor_log
+
+
+class TestTorLogFollower(unittest.TestCase):
+  def setUp(self):
+    self.tmp_dir = tempfile.mkdtemp()
+    self.path = os.path.join(self.tmp_dir, 'tor.log')
+    self.entries = []
+
+    with open(self.path, 'w') as log_file:
+      log_file.write('Jul 15 18:29:48.806 [notice] Parsing GEOIP file.\n')
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir)
+
+  def _append(self, content, path = None):
+    with open(path if path else self.path, 'a') as log_file:
+      log_file.write(content)
+
+    time.sleep(0.05)
+
+  def _messages(self):
+    return [(entry.type, entry.message) for entry in self.entries]
+
+  def test_appended_lines(self):
+    follower = TorLogFollower(self.path, self.entries.append, 0.01)
+
+    try:
+      self._append('Jul 15 18:29:49.113 [info] circuit_build_failed(): Our circuit died.\n')
+      self.assertEqual([('INFO', 'circuit_build_failed(): Our circuit died.')], self._messages())
+
+      # lines are provided once they're complete
+
+      self._append('Jul 15 18:29:50.002 [debug] conn_read_callback(): ')
+      self.assertEqual(1, len(self.entries))
+
+      self._append('socket 14 wants to read.\nmalformed line\n')
+      self.assertEqual(('DEBUG', 'conn_read_callback(): socket 14 wants to read.'), self._messages()[-1])
+      self.assertEqual(2, len(self.entries))
+    finally:
+      follower.stop()
+
+  def test_rotation(self):
+    follower = TorLogFollower(self.path, self.entries.append, 0.01)
+
+    try:
+      os.rename(self.path, self.path + '.1')
+      self._append('Jul 15 18:29:49.113 [info] appended before reopening\n', self.path + '.1')
+      self._append('Jul 15 18:29:50.002 [notice] opening new log file\n')
+
+      self.assertEqual([('INFO', 'appended before reopening'), ('NOTICE', 'opening new log file')], self._messages())
+
+      with open(self.path, 'w') as log_file:
+        log_file.write('')  # truncate
+
+      self._append('Jul 15 18:29:51.002 [info] after truncation\n')
+      self.assertEqual(('INFO', 'after truncation'), self._messages()[-1])
+    finally:
+      follower.stop()
+
+  def test_offset(self):
+    self._append('Jul 15 18:29:49.113 [info] circuit_build_failed(): ')  # still being written
+    follower = TorLogFollower(self.path, self.entries.append, 0.01)
+
+    try:
+      self._append('Our circuit died.\n')
+      self._append('Jul 15 18:29:50.002 [notice] appended after we started\n')
+
+      # prepopulation reads up to our offset, and we provide everything after
+
+      self.assertEqual([('NOTICE', 'Parsing GEOIP file.')], [(entry.type, entry.message) for entry in read_tor_log(self.path, end = follower.offset)])
+      self.assertEqual([('INFO', 'circuit_build_failed(): Our circuit died.'), ('NOTICE', 'appended after we started')], self._messages())
+    finally:
+      follower.stop()
@@ -5,7 +5,9 @@ Unit tests for nyx.panel.graph.
 import datetime
 import unittest
 
+import stem
 import stem.control
+import stem.util
 
 import nyx.curses
 import nyx.panel.graph
@@ -15,9 +17,9 @@ from test import require_curses
 
 try:
   # added in python 3.3
-  from unittest.mock import patch
+  from unittest.mock import Mock, patch
 except ImportError:
-  from mock import patch
+  from mock import Mock, patch
 
 EXPECTED_BLANK_GRAPH = """
 Download:
@@ -96,6 +98,101 @@ class TestGraphPanel(unittest.TestCase):
 
     self.assertEqual({2: '0', 11: '0'}, nyx.panel.graph._y_axis_labels(12, data.primary, 0, 0))
 
+  @patch('nyx.panel.graph.tor_controller')
+  def test_header_stats(self, tor_controller_mock):
+    tor_controller_mock().get_info.return_value = None
+    data = nyx.panel.graph.BandwidthStats()
+    self.assertEqual('Download:', data.primary.header(80))
+
+    # stats are formatted when drawn, and only once per tick
+
+    data.bandwidth_event(Mock(read = 1024, written = 2048))
+
+    with patch.object(data, '_header_stats', wraps = data._header_stats) as header_stats_mock:
+      self.assertTrue(data.primary.header(80).startswith('Download (1.0 KB/sec'))
+      self.assertTrue(data.primary.header(80).startswith('Download (1.0 KB/sec'))
+      self.assertTrue(data.secondary.header(80).startswith('Upload (2.0 KB/sec'))
+      self.assertEqual(2, header_stats_mock.call_count)
+
+      data.bandwidth_event(Mock(read = 3072, written = 2048))
+      self.assertTrue(data.primary.header(80).startswith('Download (3.0 KB/sec'))
+      self.assertEqual(3, header_stats_mock.call_count)
+
+  def test_build_time_histogram(self):
+    histogram = nyx.panel.graph._Histogram()
+    self.assertEqual(None, histogram.quantile(0.5))
+
+    for build_time in [0.3] * 80 + [1.5] * 15 + [40] * 5:
+      histogram.add(build_time)
+
+    self.assertEqual(100, histogram.count)
+    self.assertAlmostEqual(0.3, histogram.quantile(0.5), delta = 0.03)
+    self.assertAlmostEqual(1.5, histogram.quantile(0.9), delta = 0.15)
+    self.assertAlmostEqual(40, histogram.quantile(0.99), delta = 4)
+
+    # values beyond our range land in our first and last buckets
+
+    histogram.add(0.001)
+    histogram.add(500)
+    self.assertEqual(0.01, histogram.quantile(0))
+    self.assertTrue(100 < histogram.quantile(1))
+
+    histogram.clear()
+    self.assertEqual(0, histogram.count)
+    self.assertEqual(None, histogram.quantile(0.5))
+
+  @patch('nyx.panel.graph.tor_controller')
+  def test_circuit_stats(self, tor_controller_mock):
+    data = nyx.panel.graph.CircuitStats()
+    created = datetime.datetime(2016, 1, 1)
+    arrived_at = stem.util.datetime_to_unix(created)
+
+    for build_time in (0.5, 0.5, 2.0):
+      data.circuit_event(Mock(status = stem.CircStatus.BUILT, created = created, arrived_at = arrived_at + build_time))
+
+    data.circuit_event(Mock(status = stem.CircStatus.FAILED))
+    data.circuit_event(Mock(status = stem.CircStatus.EXTENDED))
+    data.build_timeout_event(Mock(set_type = stem.TimeoutSetType.COMPUTED, timeout = 1500))
+    data.bandwidth_event(None)
+
+    self.assertEqual(3, data.primary.latest_value)
+    self.assertEqual(1, data.secondary.latest_value)
+    self.assertEqual('Circuit Builds (p50: 503 ms, p90: 2.2s, timeout: 1.5s):', data.title(80))
+    self.assertEqual('Built (3/sec, avg: 3.0/sec, total: 3):', data.primary.header(80))
+
+    # counts are reset each tick, and tor discarding its build times clears ours
+
+    data.build_timeout_event(Mock(set_type = stem.TimeoutSetType.DISCARD, timeout = 60000))
+    data.bandwidth_event(None)
+
+    self.assertEqual(0, data.primary.latest_value)
+    self.assertEqual(1, data.secondary.total)
+    self.assertEqual('Circuit Builds (timeout: 60.0s):', data.title(80))
+
+  def test_export_lines(self):
+    data = nyx.panel.graph.ResourceStats()
+
+    for cpu, memory in ((5, 100), (15, 200), (10, 300)):
+      data.primary.update(cpu)
+      data.secondary.update(memory)
+
+    data.primary.last_updated = 1000.6
+
+    self.assertEqual([
+      'timestamp,cpu,memory\n',
+      '998,5.0,100.0\n',
+      '999,15.0,200.0\n',
+      '1000,10.0,300.0\n',
+    ], list(nyx.panel.graph.export_lines(data, nyx.panel.graph.Interval.EACH_SECOND)))
+
+    jsonl_lines = list(nyx.panel.graph.export_lines(data, nyx.panel.graph.Interval.EACH_SECOND, nyx.panel.graph.ExportFormat.JSONL))
+    self.assertEqual(3, len(jsonl_lines))
+    self.assertEqual('{"timestamp": 1000, "cpu": 10.0, "memory": 300.0}\n', jsonl_lines[-1])
+
+    # intervals without a full sampling have nothing to export
+
+    self.assertEqual(['timestamp,cpu,memory\n'], list(nyx.panel.graph.export_lines(data, nyx.panel.graph.Interval.FIVE_SECONDS)))
+
   @require_curses
   @patch('nyx.panel.graph.tor_controller')
   def test_draw_subgraph_blank(self, tor_controller_mock):
@@ -114,6 +211,34 @@ class TestGraphPanel(unittest.TestCase):
     rendered = test.render(nyx.panel.graph._draw_subgraph, data.primary, 0, 30, 7, nyx.panel.graph.Bounds.LOCAL_MAX, nyx.panel.graph.Interval.EACH_SECOND, nyx.curses.Color.CYAN, '*')
     self.assertEqual(EXPECTED_GRAPH, rendered.content)
 
+  @require_curses
+  @patch('nyx.panel.graph.tor_controller')
+  def test_draw_subgraph_incrementally(self, tor_controller_mock):
+    tor_controller_mock().get_info.return_value = '5430,5430 4210,4210 5510,5510 7100,7100 2000,2000 1750,1750 1880,1880 2500,2500 3770,3770'
+    data = nyx.panel.graph.BandwidthStats()
+    cache = nyx.panel.graph._SubgraphCache()
+    draw_args = (0, 30, 7, nyx.panel.graph.Bounds.LOCAL_MAX, nyx.panel.graph.Interval.EACH_SECOND, nyx.curses.Color.CYAN, '*')
+
+    test.render(nyx.panel.graph._draw_subgraph, data.primary, *draw_args, cache = cache)
+    canvas = cache._canvas
+
+    # new columns that don't change our bounds should shift the prior content
+
+    data.bandwidth_event(Mock(read = 6000, written = 6000))
+    data.bandwidth_event(Mock(read = 1000, written = 1000))
+
+    rendered = test.render(nyx.panel.graph._draw_subgraph, data.primary, *draw_args, cache = cache)
+    self.assertTrue(canvas is cache._canvas)
+    self.assertEqual(test.render(nyx.panel.graph._draw_subgraph, data.primary, *draw_args).content, rendered.content)
+
+    # a new maximum changes our bounds, so everything is redrawn
+
+    data.bandwidth_event(Mock(read = 9000, written = 9000))
+
+    rendered = test.render(nyx.panel.graph._draw_subgraph, data.primary, *draw_args, cache = cache)
+    self.assertFalse(canvas is cache._canvas)
+    self.assertEqual(test.render(nyx.panel.graph._draw_subgraph, data.primary, *draw_args).content, rendered.content)
+
   @require_curses
   @patch('nyx.panel.graph.tor_controller')
   def test_draw_accounting_stats(self, tor_controller_mock):
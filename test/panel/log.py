@@ -5,10 +5,11 @@ Unit tests for nyx.panel.log.
 import time
 import unittest
 
+import nyx.log
 import nyx.panel.log
 import test
 
-from nyx.log import LogEntry, LogFilters
+from nyx.log import LogGroup, LogEntry, LogFilters, LogView
 from test import require_curses
 
 try:
@@ -72,6 +73,16 @@ def entries():
   ]
 
 
+def draw_entries(subwindow, y):
+  log_group, event_view = LogGroup(100), LogView()
+
+  for entry in reversed(entries()):
+    log_group.add(entry)
+
+  event_layout = nyx.panel.log._layout(event_view, log_group, LogFilters(), True, subwindow.width, 0)
+  return nyx.panel.log._draw_entries(subwindow, 0, y, event_view, event_layout, True)
+
+
 class TestLogPanel(unittest.TestCase):
   @require_curses
   def test_draw_title(self):
@@ -92,6 +103,21 @@ class TestLogPanel(unittest.TestCase):
     rendered = test.render(nyx.panel.log._draw_title, ['NOTICE', 'WARN', 'ERR'], log_filter)
     self.assertEqual('Events (NOTICE-ERR, filter: stuff*):', rendered.content)
 
+  @require_curses
+  def test_draw_title_when_prepopulating(self):
+    rendered = test.render(nyx.panel.log._draw_title, ['NOTICE', 'WARN', 'ERR'], LogFilters(), 2000)
+    self.assertEqual('Events (NOTICE-ERR, reading log: 2000/5000):', rendered.content)
+
+  @require_curses
+  def test_draw_title_with_queued_events(self):
+    rendered = test.render(nyx.panel.log._draw_title, ['NOTICE', 'WARN', 'ERR'], LogFilters(), None, 150, 20)
+    self.assertEqual('Events (NOTICE-ERR, queued: 150, dropped: 20):', rendered.content)
+
+  @require_curses
+  def test_draw_title_when_saving(self):
+    rendered = test.render(nyx.panel.log._draw_title, ['NOTICE', 'WARN', 'ERR'], LogFilters(), None, 0, 0, 0.456)
+    self.assertEqual('Events (NOTICE-ERR, saving snapshot: 45%):', rendered.content)
+
   @require_curses
   @patch('time.localtime', Mock(return_value = TIME_STRUCT))
   def test_draw_entry(self):
@@ -110,14 +136,14 @@ class TestLogPanel(unittest.TestCase):
   @patch('time.localtime', Mock(return_value = TIME_STRUCT))
   def test_draw_entry_with_duplicates(self):
     entry = LogEntry(NOW, 'NOTICE', 'feeding sulfur to baby dragons is just mean...')
-    entry.duplicates = [1, 2]  # only care about the count, not the content
+    entry.duplicates = Mock(count = 2)  # only care about the count, not the content
     rendered = test.render(nyx.panel.log._draw_entry, 0, 0, 80, entry, True)
     self.assertEqual('16:41:37 [NOTICE] feeding sulfur to baby dragons is just mean...', rendered.content)
 
     rendered = test.render(nyx.panel.log._draw_entry, 0, 0, 80, entry, False)
     self.assertEqual('16:41:37 [NOTICE] feeding sulfur to baby dragons is just mean... [1 duplicate\n  hidden]', rendered.content)
 
-    entry.duplicates = [1, 2, 3, 4, 5, 6]
+    entry.duplicates = Mock(count = 6)
     rendered = test.render(nyx.panel.log._draw_entry, 0, 0, 80, entry, False)
     self.assertEqual('16:41:37 [NOTICE] feeding sulfur to baby dragons is just mean... [5 duplicates\n  hidden]', rendered.content)
 
@@ -125,12 +151,19 @@ class TestLogPanel(unittest.TestCase):
   @patch('time.localtime', Mock(return_value = TIME_STRUCT))
   @patch('nyx.log.day_count', Mock(return_value = 5))
   def test_draw_entries(self):
-    rendered = test.render(nyx.panel.log._draw_entries, 0, 0, entries(), True)
+    rendered = test.render(draw_entries, 0)
     self.assertEqual(EXPECTED_ENTRIES, rendered.content)
 
+  @require_curses
+  @patch('time.localtime', Mock(return_value = TIME_STRUCT))
+  @patch('nyx.log.day_count', Mock(return_value = 5))
+  def test_draw_entries_when_scrolled(self):
+    rendered = test.render(draw_entries, -3)
+    self.assertEqual('\n'.join(EXPECTED_ENTRIES.splitlines()[3:]), rendered.content)
+
   @require_curses
   @patch('time.localtime', Mock(return_value = TIME_STRUCT))
   @patch('time.strftime', Mock(return_value = 'October 26, 2011'))
   def test_draw_entries_day_dividers(self):
-    rendered = test.render(nyx.panel.log._draw_entries, 0, 0, entries(), True)
+    rendered = test.render(draw_entries, 0)
     self.assertEqual(EXPECTED_ENTRIES_WITH_BORDER, rendered.content)
@@ -3,6 +3,7 @@ Unit tests for nyx.popups.
 """
 
 import curses
+import time
 import unittest
 
 import nyx
@@ -11,6 +12,7 @@ import nyx.panel
 import nyx.popups
 import test
 
+from nyx.log import LogEntry
 from test import require_curses, mock_keybindings
 
 try:
@@ -19,6 +21,27 @@ try:
 except ImportError:
   from mock import Mock, patch
 
+EXPECTED_LOG_SEARCH = """
+Log Search (relay descriptors): 2 results--------------------------------------+
+| 1984-10-26 16:41:37 [WARN] Problem bootstrapping. Stuck at 72%: Loading rela |
+| 1984-10-26 16:41:37 [NOTICE] Bootstrapped 72%: Loading relay descriptors.    |
+""".strip()
+
+EXPECTED_LOG_STATS = """
+Log Statistics (events per minute):--------------------------------------------+
+| Runlevel            1m       10m        1h                                   |
+| DEBUG           1200.0     980.5     830.2                                   |
+| NOTICE             2.0       0.5       0.1                                   |
+|                                                                              |
+| Most Frequent:                                                               |
+|  58% DEBUG       conn_read_callback(): socket * wants to read.               |
+|  23% DEBUG       circuit_receive_relay_cell(): Passing on unrecognized cell. |
+|   0% NOTICE      Bootstrapped *%: Done                                       |
+|                                                                              |
+| Press any key...                                                             |
++------------------------------------------------------------------------------+
+""".strip()
+
 EXPECTED_HELP_POPUP = """
 Page 1 Commands:---------------------------------------------------------------+
 | arrows: scroll up and down             a: save snapshot of the log           |
@@ -445,6 +468,35 @@ class TestPopups(unittest.TestCase):
     self.assertEqual(EXPECTED_SAVE_TORRC_CONFIRMATION, rendered.content)
     self.assertEqual(True, rendered.return_value)
 
+  @require_curses
+  @patch('nyx.popups._top', Mock(return_value = 0))
+  @patch('time.localtime', Mock(return_value = time.gmtime(467656897)))
+  def test_log_search(self):
+    entries = iter([
+      LogEntry(467656897, 'WARN', 'Problem bootstrapping. Stuck at 72%: Loading relay descriptors.'),
+      LogEntry(467656897, 'NOTICE', 'Bootstrapped 72%: Loading relay descriptors.'),
+    ])
+
+    rendered = test.render(nyx.popups.show_log_search, 'relay descriptors', entries, {})
+    self.assertEqual(EXPECTED_LOG_SEARCH, '\n'.join(rendered.content.splitlines()[:3]))
+
+  @require_curses
+  @patch('nyx.popups._top', Mock(return_value = 0))
+  def test_log_stats(self):
+    rates = {
+      'NOTICE': [2.0, 0.5, 0.1],
+      'DEBUG': [1200.0, 980.5, 830.25],
+    }
+
+    top = [
+      ('DEBUG', 'conn_read_callback(): socket * wants to read.', 5300, 0),
+      ('DEBUG', 'circuit_receive_relay_cell(): Passing on unrecognized cell.', 2100, 12),
+      ('NOTICE', 'Bootstrapped *%: Done', 1, 0),
+    ]
+
+    rendered = test.render(nyx.popups.show_log_stats, rates, top, 9000, {})
+    self.assertEqual(EXPECTED_LOG_STATS, rendered.content)
+
   @require_curses
   @patch('nyx.popups._top', Mock(return_value = 0))
   def test_descriptor_without_fingerprint(self):
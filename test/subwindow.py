@@ -3,6 +3,8 @@ Unit tests for nyx.curses. Not entirely sure why this file can't be called
 'curses.py' but doing so causes the unittest module to fail internally.
 """
 
+import threading
+import time
 import unittest
 
 import curses
@@ -16,9 +18,9 @@ from nyx.curses import Color, Attr
 
 try:
   # added in python 3.3
-  from unittest.mock import call, Mock
+  from unittest.mock import call, patch, Mock
 except ImportError:
-  from mock import call, Mock
+  from mock import call, patch, Mock
 
 EXPECTED_ADDSTR_WRAP = """
 0123456789 0123456789
@@ -241,3 +243,107 @@ class TestCurses(unittest.TestCase):
 
     self.assertEqual(None, backlog._handler(no_op_handler, textbox, curses.KEY_DOWN))
     self.assertEqual(call(0, 0, 'hello'), textbox.win.addstr.call_args)
+
+  @patch('nyx.curses._draw_frame')
+  def test_renderer_coalesces_requests(self, draw_frame_mock):
+    renderer = nyx.curses._Renderer(5)
+    first_func, second_func = Mock(), Mock()
+
+    renderer.invalidate(first_func)
+    renderer.invalidate(second_func)
+    renderer.invalidate(first_func)
+    renderer.start()
+
+    try:
+      time.sleep(0.05)
+      self.assertEqual([[first_func, second_func]], [args[0] for args, _ in draw_frame_mock.call_args_list])
+
+      # requests wait until we're due for another frame
+
+      renderer.invalidate(second_func)
+      time.sleep(0.05)
+      self.assertEqual(1, draw_frame_mock.call_count)
+
+      time.sleep(0.25)
+      self.assertEqual([second_func], draw_frame_mock.call_args[0][0])
+      self.assertEqual(2, renderer.frames)
+    finally:
+      renderer.stop()
+
+  @patch('nyx.curses._draw_frame')
+  def test_invalidate_from_input_thread(self, draw_frame_mock):
+    renderer = nyx.curses._Renderer(5)
+    first_func, second_func = Mock(), Mock()
+
+    with patch('nyx.curses._RENDERER', renderer):
+      other_thread = threading.Thread(target = nyx.curses.invalidate, args = (first_func,))
+      other_thread.start()
+      other_thread.join()
+
+      self.assertFalse(draw_frame_mock.called)
+
+      # our input thread draws right away, along with what's pending
+
+      nyx.curses.invalidate(second_func)
+      self.assertEqual([[first_func, second_func]], [args[0] for args, _ in draw_frame_mock.call_args_list])
+
+  @patch('nyx.curses._draw_frame')
+  def test_batch(self, draw_frame_mock):
+    renderer = nyx.curses._Renderer(5)
+    first_func, second_func = Mock(), Mock()
+
+    with patch('nyx.curses._RENDERER', renderer):
+      with nyx.curses.batch():
+        nyx.curses.invalidate(first_func)
+
+        with nyx.curses.batch():
+          nyx.curses.invalidate(second_func)
+
+        self.assertFalse(draw_frame_mock.called)
+
+      self.assertEqual([[first_func, second_func]], [args[0] for args, _ in draw_frame_mock.call_args_list])
+
+  @patch('curses.doupdate', Mock())
+  @patch('stem.util.log.error')
+  def test_renderer_retries_failed_draws(self, log_mock):
+    renderer = nyx.curses._Renderer(1000)
+    working_func, failing_func = Mock(), Mock(side_effect = ValueError('boom'))
+    renderer.start()
+
+    try:
+      for i in range(3):
+        renderer.invalidate(failing_func)
+        renderer.invalidate(working_func)
+        time.sleep(0.02)
+    finally:
+      renderer.stop()
+
+    self.assertEqual(3, working_func.call_count)
+    self.assertEqual(3, failing_func.call_count)
+    self.assertEqual(1, log_mock.call_count)
+
+    # draws on the input thread raise their exceptions
+
+    renderer.invalidate(failing_func)
+    self.assertRaises(ValueError, renderer.render)
+
+  @patch('nyx.curses._color_attr', Mock(return_value = {Color.RED: 1 << 8, Color.GREEN: 2 << 8}))
+  def test_curses_attr_cache(self):
+    nyx.curses.ENCODED_ATTR.clear()
+
+    try:
+      self.assertEqual(1 << 8, nyx.curses.curses_attr(Color.RED))
+      self.assertEqual((2 << 8) | curses.A_BOLD, nyx.curses.curses_attr(Color.GREEN, Attr.BOLD))
+      self.assertEqual(2, len(nyx.curses.ENCODED_ATTR))
+      self.assertRaises(ValueError, nyx.curses.curses_attr, 'Purple')
+
+      # encodings change with our color override
+
+      nyx.curses.set_color_override(Color.GREEN)
+      self.assertEqual(2 << 8, nyx.curses.curses_attr(Color.RED))
+
+      nyx.curses.set_color_override(None)
+      self.assertEqual(1 << 8, nyx.curses.curses_attr(Color.RED))
+    finally:
+      nyx.curses.set_color_override(None)
+      nyx.curses.ENCODED_ATTR.clear()
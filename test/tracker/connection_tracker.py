@@ -1,8 +1,9 @@
 import time
 import unittest
 
-from nyx.tracker import ConnectionTracker
+from nyx.tracker import ConnectionTracker, ConnectionCounts
 
+from stem.control import Listener
 from stem.util import connection
 
 try:
@@ -120,3 +121,53 @@ class TestConnectionTracker(unittest.TestCase):
       self.assertEqual(STEM_CONNECTIONS[1].remote_address, connections[1].remote_address)
       self.assertTrue(second_start_time < connections[1].start_time < time.time())
       self.assertFalse(connections[1].is_legacy)
+
+  @patch('nyx.tracker.tor_controller')
+  @patch('nyx.tracker.connection.get_connections')
+  @patch('nyx.tracker.system', Mock(return_value = Mock()))
+  @patch('stem.util.proc.is_available', Mock(return_value = False))
+  @patch('nyx.tracker.connection.system_resolvers', Mock(return_value = [connection.Resolver.NETSTAT]))
+  def test_connection_counts(self, get_value_mock, tor_controller_mock):
+    tor_controller_mock().get_pid.return_value = 12345
+    tor_controller_mock().get_conf.return_value = '0'
+    tor_controller_mock().get_ports.side_effect = lambda listener, default: {Listener.OR: [3531], Listener.CONTROL: [1059]}.get(listener, [])
+    get_value_mock.return_value = STEM_CONNECTIONS
+
+    with ConnectionTracker(0.04) as daemon:
+      time.sleep(0.01)
+      self.assertEqual(ConnectionCounts(1, 1, 1), daemon.get_counts())
+
+      get_value_mock.return_value = STEM_CONNECTIONS[:2]  # control connection closed
+      time.sleep(0.05)
+      self.assertEqual(ConnectionCounts(1, 1, 0), daemon.get_counts())
+
+      # changing our ports recounts our connections
+
+      tor_controller_mock().get_ports.side_effect = lambda listener, default: {Listener.OR: [3531, 1766]}.get(listener, [])
+      time.sleep(0.05)
+      self.assertEqual(ConnectionCounts(2, 0, 0), daemon.get_counts())
+
+    self.assertEqual(ConnectionCounts(0, 0, 0), daemon.get_counts())
+
+  @patch('nyx.tracker.tor_controller')
+  @patch('nyx.tracker.connection.get_connections')
+  @patch('nyx.tracker.system', Mock(return_value = Mock()))
+  @patch('stem.util.proc.is_available', Mock(return_value = False))
+  @patch('nyx.tracker.connection.system_resolvers', Mock(return_value = [connection.Resolver.NETSTAT]))
+  def test_connection_counts_with_duplicates(self, get_value_mock, tor_controller_mock):
+    tor_controller_mock().get_pid.return_value = 12345
+    tor_controller_mock().get_conf.return_value = '0'
+    tor_controller_mock().get_ports.side_effect = lambda listener, default: {Listener.OR: [3531], Listener.CONTROL: [1059]}.get(listener, [])
+    get_value_mock.return_value = STEM_CONNECTIONS[1:]
+
+    with ConnectionTracker(0.04) as daemon:
+      time.sleep(0.01)
+      self.assertEqual(ConnectionCounts(0, 1, 1), daemon.get_counts())
+
+      get_value_mock.return_value = STEM_CONNECTIONS + STEM_CONNECTIONS[:1]  # resolver lists a new connection twice
+      time.sleep(0.05)
+      self.assertEqual(ConnectionCounts(1, 1, 1), daemon.get_counts())
+
+      get_value_mock.return_value = STEM_CONNECTIONS[1:]
+      time.sleep(0.05)
+      self.assertEqual(ConnectionCounts(0, 1, 1), daemon.get_counts())